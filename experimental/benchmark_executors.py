@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer
+sys.path.append('../')
+from meaningless import JSONDownloader, json_file_interface
+from meaningless.utilities import common
+from meaningless.utilities.stand_in_server import StandInServer
+
+# The resource module is only available on Unix platforms
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss():
+    """
+    Gets the peak resident set size of this process and of the largest child process that has finished.
+
+    :return: Peak RSS of this process and of the largest child process in MiB, or None for both if the platform
+             doesn't support measuring it
+    :rtype: tuple
+    """
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def run_download(executor, concurrency, book, base_url, directory):
+    """
+    Downloads a book with a single executor and prints the measurements as JSON.
+    This is run in a separate process for each executor, so that the memory used by one executor doesn't affect the
+    measurements of the others.
+
+    :param executor: Name of the executor
+    :type executor: str
+    :param concurrency: Concurrency level of the executor. 0 uses the default.
+    :type concurrency: int
+    :param book: Name of the book
+    :type book: str
+    :param base_url: Base URL of the stand-in server
+    :type base_url: str
+    :param directory: Directory to write the downloaded file to
+    :type directory: str
+    """
+    with JSONDownloader(default_directory=directory, base_url=base_url, executor=executor,
+                        concurrency=concurrency or None) as downloader:
+        start_time = default_timer()
+        downloader.download_book(book)
+        elapsed_time = default_timer() - start_time
+    rss, child_rss = get_peak_rss()
+    print(json.dumps({'seconds': elapsed_time, 'rss': rss, 'child_rss': child_rss}))
+
+
+def read_passages(file_path, book):
+    """
+    Reads the passages of a downloaded book, ignoring the file information that changes between downloads.
+
+    :param file_path: Path of the downloaded file
+    :type file_path: str
+    :param book: Name of the book
+    :type book: str
+    :return: Passages keyed on chapter and passage number
+    :rtype: dict
+    """
+    return json_file_interface.read(file_path)[book.title()]
+
+
+if __name__ == "__main__":
+    # Run this section when run as a standalone script. Don't run this part when being imported.
+    if len(sys.argv) > 1:
+        run_download(sys.argv[1], int(sys.argv[2]), sys.argv[3], sys.argv[4], sys.argv[5])
+        sys.exit()
+
+    book_name = input('Enter the book to download (default Psalm): ') or 'Psalm'
+    latency = float(input('Enter the number of seconds the stand-in server waits before each response '
+                          '(default 0.05): ') or 0.05)
+    concurrency_level = int(input('Enter the concurrency level (leave blank for the default of each executor): ')
+                            or 0)
+    chapter_count = common.get_chapter_count(book_name, 'NIV')
+    results = {}
+    with StandInServer(latency=latency) as server, tempfile.TemporaryDirectory() as output_directory:
+        for executor_name in ['serial', 'thread', 'process', 'async']:
+            executor_directory = os.path.join(output_directory, executor_name)
+            output = subprocess.run([sys.executable, __file__, executor_name, str(concurrency_level), book_name,
+                                     server.base_url, executor_directory],
+                                    capture_output=True, text=True, check=True).stdout
+            results[executor_name] = json.loads(output.strip().splitlines()[-1])
+            results[executor_name]['passages'] = read_passages(
+                os.path.join(executor_directory, f'{book_name.title()}.json'), book_name)
+        print(f'Downloaded {book_name} ({chapter_count} chapters) with a latency of {latency}s per request\n')
+        print(f'{"Executor":<10}{"Seconds":>10}{"Chapters/s":>12}{"Peak RSS (MiB)":>16}{"Worker RSS (MiB)":>18}')
+        for executor_name, result in results.items():
+            rss = f'{result["rss"]:.1f}' if result['rss'] is not None else 'n/a'
+            child_rss = f'{result["child_rss"]:.1f}' if result['child_rss'] else 'n/a'
+            print(f'{executor_name:<10}{result["seconds"]:>10.2f}{chapter_count / result["seconds"]:>12.1f}'
+                  f'{rss:>16}{child_rss:>18}')
+        is_identical = all(result['passages'] == results['serial']['passages'] for result in results.values())
+        print(f'\nAll executors produced identical passages: {is_identical}')
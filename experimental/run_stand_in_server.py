@@ -0,0 +1,25 @@
+import sys
+sys.path.append('../')
+from meaningless.utilities.fixture_store import FixtureStore
+from meaningless.utilities.stand_in_server import StandInServer
+
+
+if __name__ == "__main__":
+    # Run this section when run as a standalone script. Don't run this part when being imported.
+    port = int(input('Enter the port to listen on (0 uses any free port): ') or 0)
+    latency = float(input('Enter the number of seconds to wait before each response (default 0): ') or 0)
+    error_rate = float(input('Enter the fraction of requests that fail, from 0 to 1 (default 0): ') or 0)
+    max_requests_per_second = input('Enter the maximum number of requests per second (leave blank for no limit): ')
+    fixture_path = input('Enter the path of a fixture store with recorded pages (leave blank to only use '
+                         'synthetic pages): ')
+    server = StandInServer(port=port, latency=latency, error_rate=error_rate,
+                           max_requests_per_second=int(max_requests_per_second) if max_requests_per_second else None,
+                           fixture_store=FixtureStore(fixture_path) if fixture_path else None)
+    print(f'Serving Bible Gateway search pages at {server.base_url} (use this as the base_url). Press Ctrl+C to stop.')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f'Request statistics: {server.get_stats()}')
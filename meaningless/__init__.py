@@ -12,13 +12,17 @@ from meaningless.bible_xml_downloader import XMLDownloader
 from meaningless.bible_xml_extractor import XMLExtractor
 from meaningless.bible_csv_downloader import CSVDownloader
 from meaningless.bible_csv_extractor import CSVExtractor
-from meaningless.bible_web_extractor import WebExtractor
+from meaningless.bible_web_extractor import WebExtractor, PassageItem, parse_passage_html
+from meaningless.bible_async_web_extractor import AsyncWebExtractor
 # Ignore the base error class, but include all the other exception types
 from meaningless.utilities.exceptions import (
     UnsupportedTranslationError,
     InvalidPassageError,
     InvalidSearchError,
-    TranslationMismatchError
+    TranslationMismatchError,
+    OperationCancelledError,
+    DeadlineExceededError,
+    MissingFixtureError
 )
 # Include the file interfaces, mainly as an out-of-the-box mechanism for reading downloaded files
 # as well as writing output using the information obtained from the extractors.
@@ -0,0 +1,531 @@
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from meaningless.bible_web_extractor import WebExtractor, parse_passage_html
+from meaningless.utilities import common
+from meaningless.utilities.cancellation import CancellationToken
+
+
+class AsyncWebExtractor(WebExtractor):
+    """
+    An extractor object that retrieves Bible passages from the Bible Gateway site using asyncio.
+
+    This provides the same methods as the Web Extractor, except that retrieving passages is done using coroutines.
+    Web requests are sent from a dedicated set of threads so that the event loop is never blocked, and the number of
+    requests that can be in progress at the same time is limited.
+
+    Cancelling a coroutine (such as when it times out using asyncio.wait_for) also interrupts the web requests that
+    it has in progress, so that the threads sending them are freed up straight away.
+    """
+
+    def __init__(self, translation='NIV', show_passage_numbers=True, output_as_list=False,
+                 strip_excess_whitespace_from_list=False, use_ascii_punctuation=False, add_minimal_copyright=False,
+                 connection_pool=None, response_cache=None, passage_cache_size=0, max_chapters_per_request=10,
+                 max_passages_per_request=250, max_concurrent_requests=10, parser=None, engine='soup',
+                 parse_executor=None, rate_limiter=None, hedging_policy=None, base_url=None, single_flight=None):
+        """
+        :param translation: Translation code for the particular passage. For example, 'NIV', 'ESV', 'NLT'
+        :type translation: str
+        :param show_passage_numbers: If True, any present passage numbers are preserved. Defaults to True.
+        :type show_passage_numbers: bool
+        :param output_as_list: When True, returns the passage data as a list of strings. Defaults to False.
+        :type output_as_list: bool
+        :param strip_excess_whitespace_from_list: When True and output_as_list is also True, leading and trailing
+                                                  whitespace characters are removed for each string element in the list.
+                                                  Defaults to False.
+        :type strip_excess_whitespace_from_list: bool
+        :param use_ascii_punctuation: When True, converts all Unicode punctuation characters into their ASCII
+                                      counterparts. This also applies to passage separators. Defaults to False.
+        :type use_ascii_punctuation: bool
+        :param add_minimal_copyright: If True, includes additional text that follows recommendations from the Bible
+                                      Gateway Terms of Use Agreement when quoting passages for non-commercial use.
+                                      When output_as_list is also True, the minimal copyright text is included as a
+                                      separate string at the end of the list.
+                                      Defaults to False.
+        :type add_minimal_copyright: bool
+        :param connection_pool: Pool of persistent connections used to send web requests. Note that the number of
+                                requests in progress is also limited by the number of connections allowed per host.
+                                Defaults to None, which uses the default pool shared by the current process.
+        :type connection_pool: ConnectionPool
+        :param response_cache: Persistent cache of downloaded pages, which avoids sending web requests for passages
+                               that have been retrieved before. Defaults to None, which doesn't cache any pages.
+        :type response_cache: ResponseCache
+        :param passage_cache_size: Maximum number of search results to keep in memory, so that repeated searches for
+                                   the same passage with the same output options are returned without sending a web
+                                   request or processing the page again. Defaults to 0, which disables this cache.
+        :type passage_cache_size: int
+        :param max_chapters_per_request: Maximum number of chapters retrieved by a single web request when getting
+                                         passages across multiple chapters. Consecutive chapters are combined into as
+                                         few requests as possible, which are then split back into chapters.
+                                         Defaults to 10. Set this to 1 to retrieve each chapter separately.
+        :type max_chapters_per_request: int
+        :param max_passages_per_request: Maximum number of passages that chapters are combined into, which should stay
+                                         under the number of passages that Bible Gateway returns for a single search.
+                                         Whole chapters are estimated to have as many passages as an average chapter.
+                                         Chapters left out of a page that was cut off anyway are retrieved using
+                                         further requests. Defaults to 250.
+        :type max_passages_per_request: int
+        :param max_concurrent_requests: Maximum number of web requests that can be in progress at the same time.
+                                        Defaults to 10.
+        :type max_concurrent_requests: int
+        :param parser: Name of the HTML parser used by Beautiful Soup to process downloaded pages, such as 'lxml',
+                       'html.parser' or 'html5lib'. The selected parser must be installed separately if it isn't
+                       built into Python. Defaults to None, which uses lxml if it is installed and falls back to
+                       html.parser otherwise. This is ignored when using the 'stream' engine.
+        :type parser: str
+        :param engine: Method used to extract the passage contents from downloaded pages. 'soup' parses each page
+                       into a document tree using Beautiful Soup before cleaning it up. 'stream' cleans up the passage
+                       contents as the page is being read, without building a document tree, which uses less CPU time
+                       and memory when retrieving many passages. The 'stream' engine reads pages in the same way
+                       as the html.parser parser, so its passage contents can differ from those of the 'soup' engine
+                       when another parser is used, including the default lxml parser. Defaults to 'soup'.
+        :type engine: str
+        :param parse_executor: Executor used to extract passages from downloaded pages, which is the CPU intensive
+                               part of a search. For example, a ProcessPoolExecutor can be used to process pages on
+                               multiple CPU cores. Defaults to None, which uses the default executor of the event loop.
+        :type parse_executor: concurrent.futures.Executor
+        :param rate_limiter: Limits the number of web requests sent per second, and pauses requests when the web
+                             server asks for them to be slowed down. Requests waiting for the rate limiter still count
+                             towards the maximum number of concurrent requests. Defaults to None, which doesn't limit
+                             requests.
+        :type rate_limiter: RateLimiter
+        :param hedging_policy: When specified, a duplicate web request is sent if a request is taking much longer than
+                               usual, and whichever request completes first is used. Duplicate requests are sent from
+                               a separate thread, so they don't count towards the maximum number of concurrent
+                               requests. Defaults to None, which doesn't send any duplicate requests.
+        :type hedging_policy: HedgingPolicy
+        :param base_url: Base URL of the web server that search requests are sent to, such as a local stand-in server
+                         used for testing. Defaults to None, which uses the Bible Gateway site.
+        :type base_url: str
+        :param single_flight: When specified, a search made while an identical search (for the same page with the same
+                              output options) is already in progress in the same event loop waits for that search to
+                              finish and uses its result, instead of sending another web request. Cancelling a search
+                              doesn't affect the other searches waiting for it. Defaults to None, which runs every
+                              search separately.
+        :type single_flight: SingleFlight
+        """
+        super().__init__(translation, show_passage_numbers, output_as_list, strip_excess_whitespace_from_list,
+                         use_ascii_punctuation, add_minimal_copyright, connection_pool, response_cache,
+                         passage_cache_size, max_chapters_per_request, max_passages_per_request,
+                         max_concurrent_requests, parser, engine, rate_limiter, hedging_policy, base_url, single_flight)
+        self.parse_executor = parse_executor
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the objects used to send web requests, which are specific to each process.
+        """
+        self.__request_executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests,
+                                                     thread_name_prefix='meaningless-request')
+        # Semaphores can only be used by the event loop they were first used in, so one is created for each loop
+        self.__request_limits = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        """
+        Sends the extractor options to another process, such as when pages are processed by a process pool.
+        """
+        state = dict(self.__dict__)
+        [state.pop(attribute) for attribute in ['parse_executor', '_AsyncWebExtractor__request_executor',
+                                                '_AsyncWebExtractor__request_limits']]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the extractor options received from another process.
+        """
+        self.__dict__.update(state)
+        self.parse_executor = None
+        self.__initialise_state()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stops the threads used to send web requests. The extractor should not be used after this is called.
+        """
+        self.__request_executor.shutdown(wait=False)
+
+    async def get_passage(self, book, chapter, passage):
+        """
+        Gets a single passage from the Bible Gateway site.
+
+        The chapter and passage parameters will be automatically adjusted to the respective chapter and passage
+        boundaries of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter: Chapter number
+        :type chapter: int
+        :param passage: Passage number
+        :type passage: int
+        :return: The specified passage. Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        return await self.get_passage_range(book, chapter, passage, chapter, passage)
+
+    async def get_passages(self, book, chapter, passage_from, passage_to):
+        """
+        Gets a range of passages of the same chapter from the Bible Gateway site.
+
+        Chapter and passage parameters will be automatically adjusted to the respective chapter and passage boundaries
+        of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter: Chapter number
+        :type chapter: int
+        :param passage_from: First passage number to get
+        :type passage_from: int
+        :param passage_to: Last passage number to get
+        :type passage_to: int
+        :return: The passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        return await self.get_passage_range(book, chapter, passage_from, chapter, passage_to)
+
+    async def get_chapter(self, book, chapter):
+        """
+        Gets a single chapter from the Bible Gateway site.
+
+        The chapter parameter will be automatically adjusted to the chapter boundaries of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter: Chapter number
+        :type chapter: int
+        :return: All passages in the chapter. Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        return await self.get_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter())
+
+    async def get_chapters(self, book, chapter_from, chapter_to):
+        """
+        Gets a range of passages from a specified chapters selection from the Bible Gateway site.
+
+        The chapter parameters will be automatically adjusted to the chapter boundaries of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :return: All passages between the specified chapters (inclusive). Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        return await self.get_passage_range(book, chapter_from, 1, chapter_to, common.get_end_of_chapter())
+
+    async def get_book(self, book):
+        """
+        Gets all chapters for a specific book from the Bible Gateway site.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :return: All passages in the specified book. Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        return await self.get_passage_range(book, 1, 1, common.get_chapter_count(book, self.translation),
+                                            common.get_end_of_chapter())
+
+    async def get_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to):
+        """
+        Gets a range of passages from one specific passage to another passage from the Bible Gateway site.
+        Consecutive chapters are combined into as few web requests as possible, which are sent concurrently.
+
+        Chapter and passage parameters will be automatically adjusted to the respective chapter and passage boundaries
+        of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :return: All passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        # The options are read once, so that the searches and the combined result all use the same options even if
+        # the output options of this extractor are changed while waiting for the web requests
+        options = self._get_parse_options()
+        chapter_results = await self._get_chapter_results_async(book, chapter_from, passage_from, chapter_to,
+                                                                passage_to, options)
+        return self._combine_chapters(chapter_results, options)
+
+    async def _get_chapter_results_async(self, book, chapter_from, passage_from, chapter_to, passage_to, options=None):
+        """
+        A helper function to get a range of passages, with the passages of each chapter as a separate result.
+        Consecutive chapters are combined into as few web requests as possible, which are sent concurrently.
+        This is named differently to the _get_chapter_results helper of the Web Extractor, so that inherited
+        methods which use that helper aren't given a coroutine instead.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param options: Output options used for these searches only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Search results for each chapter in the range, in order
+        :rtype: list
+        """
+        options = options if options is not None else self._get_parse_options()
+        chapter_requests = self._plan_chapter_requests(book, chapter_from, passage_from, chapter_to, passage_to)
+        # Results are gathered in the same order as the requests, regardless of which request finishes first
+        results = await asyncio.gather(*[self.__get_chapter_request_results(book, chapter_ranges, options)
+                                         for chapter_ranges in chapter_requests])
+        return [chapter for result in results for chapter in result]
+
+    async def __get_chapter_request_results(self, book, chapter_ranges, options=None):
+        """
+        A helper function to get the search results of each chapter covered by a single web request.
+        If the page was cut off before the end of the last chapter, the chapters from where the page was cut off are
+        retrieved using further requests.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_ranges: Chapters covered by the request, as planned by _plan_chapter_requests
+        :type chapter_ranges: list
+        :param options: Output options used for these searches only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Search results for each chapter, in order
+        :rtype: list
+        """
+        search = self._get_chapter_request_search(book, chapter_ranges)
+        if len(chapter_ranges) == 1:
+            return [await self.__search(search, False, options)]
+        chapters = await self.__search(search, True, options)
+        complete_chapters = self._get_complete_chapters(chapters, chapter_ranges)
+        if complete_chapters is None:
+            return await asyncio.gather(*[self.__search(self._get_chapter_request_search(book, [chapter_range]),
+                                                        False, options)
+                                          for chapter_range in chapter_ranges])
+        if not complete_chapters:
+            # The page was cut off within the first chapter, which is retrieved on its own to make progress
+            complete_chapters = [await self.__search(self._get_chapter_request_search(book, chapter_ranges[:1]),
+                                                     False, options)]
+        remaining_ranges = chapter_ranges[len(complete_chapters):]
+        if not remaining_ranges:
+            return complete_chapters
+        return complete_chapters + await self.__get_chapter_request_results(book, remaining_ranges, options)
+
+    def iter_chapters(self, book, chapter_from, chapter_to, in_order=True):
+        """
+        Yields the passages of a range of chapters from the Bible Gateway site, as each chapter is retrieved.
+        This is used as an asynchronous iterator.
+
+        The chapter parameters will be automatically adjusted to the chapter boundaries of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the range.
+                         Defaults to True.
+        :type in_order: bool
+        :return: Asynchronous generator of the passages between the specified chapters (inclusive)
+        :rtype: collections.abc.AsyncIterator[PassageItem]
+        """
+        return self.iter_passages(book, chapter_from, 1, chapter_to, common.get_end_of_chapter(), in_order)
+
+    def iter_book(self, book, in_order=True):
+        """
+        Yields the passages of a specific book from the Bible Gateway site, as each chapter is retrieved.
+        This is used as an asynchronous iterator.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the book.
+                         Defaults to True.
+        :type in_order: bool
+        :return: Asynchronous generator of the passages in the specified book
+        :rtype: collections.abc.AsyncIterator[PassageItem]
+        """
+        return self.iter_passages(book, 1, 1, common.get_chapter_count(book, self.translation),
+                                  common.get_end_of_chapter(), in_order)
+
+    async def iter_passages(self, book, chapter_from, passage_from, chapter_to, passage_to, in_order=True):
+        """
+        Yields a range of passages from one specific passage to another passage from the Bible Gateway site, as each
+        chapter is retrieved. This is used as an asynchronous iterator, and works in the same way as the iter_passages
+        method of the Web Extractor. Stopping the iteration early cancels the web requests that are still in progress.
+
+        Chapter and passage parameters will be automatically adjusted to the respective chapter and passage boundaries
+        of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the range.
+                         Defaults to True.
+        :type in_order: bool
+        :return: Asynchronous generator of the passages between the specified passages (inclusive)
+        :rtype: collections.abc.AsyncIterator[PassageItem]
+        """
+        chapter_requests = self._plan_chapter_requests(book, chapter_from, passage_from, chapter_to, passage_to)
+        first_chapter = chapter_requests[0][0][0]
+        first_passage = common.get_capped_integer(passage_from, max_value=common.get_end_of_chapter())
+        options = self._get_item_parse_options()
+        # Requests are started as earlier ones finish, so that only a limited number of results are held at once
+        tasks = {}
+        next_request = 0
+        try:
+            while tasks or next_request < len(chapter_requests):
+                while next_request < len(chapter_requests) and len(tasks) < self.max_concurrent_requests:
+                    task = asyncio.ensure_future(self.__get_chapter_request_results(book,
+                                                                                    chapter_requests[next_request],
+                                                                                    options))
+                    tasks[task] = next_request
+                    next_request += 1
+                if in_order:
+                    task = min(tasks, key=tasks.get)
+                    await asyncio.wait([task])
+                else:
+                    task = next(iter((await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED))[0]))
+                request_index = tasks.pop(task)
+                for (chapter, _, _), passages in zip(chapter_requests[request_index], task.result()):
+                    for item in self._get_passage_items(book, chapter,
+                                                        first_passage if chapter == first_chapter else 1, passages,
+                                                        chapter - first_chapter):
+                        yield item
+        finally:
+            [task.cancel() for task in tasks]
+
+    async def search_multiple(self, passage_names):
+        """
+        Retrieves a set of passages directly from the Bible Gateway site. Passages can be from different books.
+        The language used for the search text is independent of the translation.
+        Note that the output is subject to the Bible Gateway implicit passage limit when sending the web request.
+
+        :param passage_names: List of Bible passages that are valid when used on www.biblegateway.com
+        :type passage_names: list
+        :return: Bible passages with newline separators for each set of passages
+        :rtype: str or list
+        """
+        return await self.search(';'.join(passage_names))
+
+    async def search(self, passage_name):
+        """
+        Retrieves a specific passage directly from the Bible Gateway site.
+        The language used for the search text is independent of the translation.
+        Note that the output is subject to the Bible Gateway implicit passage limit when sending the web request.
+
+        :param passage_name: Name of the Bible passage which is valid when used on www.biblegateway.com
+        :type passage_name: str
+        :return: Bible passage with preserved line breaks
+        :rtype: str or list
+        """
+        return await self.__search(passage_name, False)
+
+    async def __search(self, passage_name, split_chapters, options=None):
+        """
+        A helper function that retrieves a specific passage directly from the Bible Gateway site.
+
+        :param passage_name: Name of the Bible passage which is valid when used on www.biblegateway.com
+        :type passage_name: str
+        :param split_chapters: If True, the result is split into chapters
+        :type split_chapters: bool
+        :param options: Output options used for this search only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Bible passage with preserved line breaks, or a list of these for each chapter if split_chapters
+                 is True
+        :rtype: str or list
+        """
+        translation = self._get_supported_translation()
+        options = options if options is not None else self._get_parse_options()
+        cache_key = self._get_passage_cache_key(translation, passage_name, split_chapters, options)
+        result = self._get_cached_search_result(cache_key)
+        if result is not None:
+            return result
+
+        source_site = self._get_search_url(passage_name)
+        get_search_result = partial(self.__get_search_result, source_site, split_chapters, options)
+        if self.single_flight is None:
+            result = await get_search_result()
+        else:
+            # The result is shared with the other searches waiting for it, so each search gets its own copy
+            result = self._copy_search_result(
+                await self.single_flight.run_async(self._get_single_flight_key(source_site, split_chapters, options),
+                                                   get_search_result))
+        self._cache_search_result(cache_key, result)
+        return result
+
+    async def __get_search_result(self, source_site, split_chapters, options):
+        """
+        A helper function that downloads a search results page and extracts its passages.
+
+        :param source_site: URL of the search results page
+        :type source_site: str
+        :param split_chapters: If True, the result is split into chapters
+        :type split_chapters: bool
+        :param options: Output options, in the form returned by _get_parse_options
+        :type options: dict
+        :return: Bible passage with preserved line breaks, or a list of these for each chapter if split_chapters
+                 is True
+        :rtype: str or list
+        """
+        loop = asyncio.get_running_loop()
+        # Cancelling a future doesn't stop a function that is already running in another thread, so the web request
+        # is interrupted using a cancellation token instead
+        cancellation_token = CancellationToken()
+        async with self.__get_request_limit(loop):
+            try:
+                page = await loop.run_in_executor(self.__request_executor,
+                                                  partial(common.get_page, source_site,
+                                                          connection_pool=self.connection_pool,
+                                                          response_cache=self.response_cache,
+                                                          rate_limiter=self.rate_limiter,
+                                                          cancellation_token=cancellation_token,
+                                                          hedging_policy=self.hedging_policy))
+            except asyncio.CancelledError:
+                cancellation_token.cancel()
+                raise
+        # Processing the page is done outside the request limit, so that other requests can start in the meantime
+        # Only the page and the output options are sent to the executor, which keeps the cost of sending each page to
+        # another process low
+        return await loop.run_in_executor(self.parse_executor,
+                                          partial(parse_passage_html, page, **options,
+                                                  split_chapters=split_chapters, source_site=source_site))
+
+    def __get_request_limit(self, loop):
+        """
+        A helper function to get the semaphore that limits the number of web requests in progress for an event loop.
+
+        :param loop: The running event loop
+        :type loop: asyncio.AbstractEventLoop
+        :return: Semaphore for the event loop
+        :rtype: asyncio.Semaphore
+        """
+        request_limit = self.__request_limits.get(loop)
+        if request_limit is None:
+            request_limit = asyncio.Semaphore(self.max_concurrent_requests)
+            self.__request_limits[loop] = request_limit
+        return request_limit
@@ -1,9 +1,19 @@
 import os
-import multiprocessing
+import queue
+import asyncio
 import datetime
+import weakref
+from contextlib import closing
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.error import HTTPError, URLError
 from meaningless.bible_web_extractor import WebExtractor
+from meaningless.bible_async_web_extractor import AsyncWebExtractor
 from meaningless.utilities import common
-from meaningless.utilities.exceptions import UnsupportedTranslationError, InvalidPassageError
+from meaningless.utilities.worker_pool import WorkerPool
+from meaningless.utilities.checkpoint_journal import get_download_key
+from meaningless.utilities.exceptions import UnsupportedTranslationError, InvalidPassageError, OperationCancelledError
+from meaningless.utilities.cancellation import CancellationToken, get_operation_token
 
 
 class BaseDownloader:
@@ -11,6 +21,12 @@ class BaseDownloader:
     An downloader object that stores Bible passages into a local file
     """
 
+    # Methods of retrieving the chapters of a download, which can be selected using the executor parameter
+    __executors = ['serial', 'thread', 'process', 'async']
+
+    # Testaments that a whole translation download can be limited to, mapped to their Bible data set
+    __testaments = {'OT': 2, 'NT': 1}
+
     __translations_with_omitted_passages = {
         'ASV': ['Matthew 17:21', 'Matthew 18:11', 'Matthew 23:14',
                 'Mark 7:16', 'Mark 9:44', 'Mark 9:46', 'Mark 11:26', 'Mark 15:28',
@@ -96,7 +112,10 @@ class BaseDownloader:
 
     def __init__(self, file_writing_function, translation='NIV', show_passage_numbers=True,
                  default_directory=os.getcwd(), strip_excess_whitespace=False, enable_multiprocessing=True,
-                 use_ascii_punctuation=False, file_extension='', write_key_as_string=False):
+                 use_ascii_punctuation=False, file_extension='', write_key_as_string=False, connection_pool=None,
+                 response_cache=None, parser=None, engine='soup', rate_limiter=None, hedging_policy=None,
+                 base_url=None, worker_pool=None, executor=None, concurrency=None, checkpoint_journal=None,
+                 file_reading_function=None, max_chapters_per_request=10):
         """
         :param file_writing_function: Function definition used to specify how to write to a given file.
                                       The function should only take 2 arguments, which are the file path to write to
@@ -114,7 +133,8 @@ class BaseDownloader:
         :type strip_excess_whitespace: bool
         :param enable_multiprocessing: If True, downloads are performed using multiple daemon processes, resulting in
                                        lower download times by splitting computations among multiple CPU cores.
-                                       Defaults to True.
+                                       Otherwise, downloads are performed sequentially. This is ignored if the
+                                       executor parameter is specified. Defaults to True.
         :type enable_multiprocessing: bool
         :param use_ascii_punctuation: When True, converts all Unicode punctuation characters into their ASCII
                                       counterparts. Defaults to False.
@@ -124,7 +144,77 @@ class BaseDownloader:
         :param write_key_as_string: If True, specifies that all keys in the downloaded file are converted to strings.
                Defaults to False.
         :type write_key_as_string: bool
+        :param connection_pool: Pool of persistent connections used to send web requests. When multiprocessing,
+                                each process reuses its own set of connections across all the chapters it downloads.
+                                Defaults to None, which uses the default pool shared by each process.
+        :type connection_pool: ConnectionPool
+        :param response_cache: Persistent cache of downloaded pages, which avoids sending web requests for passages
+                               that have been downloaded before. The same cache can be safely used by all processes
+                               when multiprocessing. Defaults to None, which doesn't cache any pages.
+        :type response_cache: ResponseCache
+        :param parser: Name of the HTML parser used by Beautiful Soup to process downloaded pages, such as 'lxml',
+                       'html.parser' or 'html5lib'. Defaults to None, which uses lxml if it is installed and falls
+                       back to html.parser otherwise. This is ignored when using the 'stream' engine.
+        :type parser: str
+        :param engine: Method used to extract the passage contents from downloaded pages. 'soup' parses each page
+                       into a document tree using Beautiful Soup, while 'stream' cleans up the passage contents as
+                       the page is being read, which uses less CPU time and memory for large downloads.
+                       The 'stream' engine reads pages in the same way as the html.parser parser, so its passage
+                       contents can differ from those of the 'soup' engine when another parser is used, including
+                       the default lxml parser. Defaults to 'soup'.
+        :type engine: str
+        :param rate_limiter: Limits the number of web requests sent per second. When multiprocessing, all processes
+                             share the same limit, and all of them pause when the web server asks for requests to be
+                             slowed down. Defaults to None, which doesn't limit requests.
+        :type rate_limiter: RateLimiter
+        :param hedging_policy: When specified, a duplicate web request is sent if a request is taking much longer than
+                               usual, and whichever request completes first is used. When multiprocessing, each
+                               process tracks its own request times and limit of duplicate requests.
+                               Defaults to None, which doesn't send any duplicate requests.
+        :type hedging_policy: HedgingPolicy
+        :param base_url: Base URL of the web server that search requests are sent to, such as a local stand-in server
+                         used for load testing. Defaults to None, which uses the Bible Gateway site.
+        :type base_url: str
+        :param worker_pool: Pool of worker processes used when multiprocessing, which keeps running between
+                            downloads so that processes are only started once. The same pool can be shared by
+                            multiple downloaders, and must be closed separately. The worker processes of a shared
+                            pool keep running when a download is cancelled or fails, so the chapters already sent to
+                            them are still retrieved, without affecting other downloads using the pool.
+                            Defaults to None, which uses a pool of one process per CPU owned by this downloader,
+                            which is closed when this downloader is closed or garbage collected. Its worker processes
+                            are stopped when a download is cancelled or fails before all its chapters are retrieved.
+        :type worker_pool: WorkerPool
+        :param executor: Method used to retrieve the chapters of each download, which all produce the same file.
+                         'serial' sends one web request at a time. 'thread' sends web requests concurrently from a
+                         pool of threads. 'process' retrieves groups of chapters in the worker processes, which also
+                         spreads the processing of pages across multiple CPU cores. 'async' sends web requests
+                         concurrently from an event loop, using the Async Web Extractor. Defaults to None, which uses
+                         'process' if enable_multiprocessing is True, or 'serial' otherwise.
+        :type executor: str
+        :param concurrency: Maximum number of web requests in progress at the same time when using the 'thread' or
+                            'async' executor, or the number of worker processes when using the 'process' executor
+                            without specifying the worker_pool parameter. Defaults to None, which sends up to 4 web
+                            requests at the same time, or uses one worker process per CPU.
+        :type concurrency: int
+        :param checkpoint_journal: Journal that records the chapters of each download as soon as they are retrieved.
+                                   If a download fails or is stopped, downloading it again with the same parameters
+                                   only retrieves the chapters which weren't recorded. The recorded chapters are
+                                   removed once the file has been written. Defaults to None, which doesn't record any
+                                   chapters.
+        :type checkpoint_journal: CheckpointJournal
+        :param file_reading_function: Function definition used to read a file written by the file writing function,
+                                      which is needed to refresh existing files. The function should only take the
+                                      file path to read from, and return the in-memory object stored in the file.
+                                      Defaults to None, which means that files can't be refreshed.
+        :type file_reading_function: callable[[str], dict]
+        :param max_chapters_per_request: Maximum number of consecutive chapters retrieved by a single web request, in
+                                         the same way as the Web Extractor. When multiprocessing, each group of
+                                         chapters is retrieved as a single task. Defaults to 10. Set this to 1 to
+                                         retrieve each chapter separately.
+        :type max_chapters_per_request: int
         """
+        if executor is not None and executor not in self.__executors:
+            raise ValueError(f'{executor} is not a valid executor')
         self.translation = translation
         self.show_passage_numbers = show_passage_numbers
         self.default_directory = default_directory
@@ -134,8 +224,40 @@ class BaseDownloader:
         self.file_extension = file_extension
         self.file_writing_function = file_writing_function
         self.write_key_as_string = write_key_as_string
+        self.connection_pool = connection_pool
+        self.response_cache = response_cache
+        self.parser = parser
+        self.engine = engine
+        self.rate_limiter = rate_limiter
+        self.hedging_policy = hedging_policy
+        self.base_url = base_url
+        # The worker processes aren't started until they are needed, so creating a pool here is cheap
+        self.__is_worker_pool_owned = worker_pool is None
+        self.worker_pool = worker_pool if worker_pool is not None else WorkerPool(concurrency)
+        if self.__is_worker_pool_owned:
+            # Downloaders that are never closed still stop their worker processes once they are no longer used
+            weakref.finalize(self, self.worker_pool.close)
+        self.executor = executor
+        self.concurrency = max(1, concurrency) if concurrency is not None else None
+        self.checkpoint_journal = checkpoint_journal
+        self.file_reading_function = file_reading_function
+        self.max_chapters_per_request = max(1, max_chapters_per_request)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes used for multiprocessing, if they are owned by this downloader.
+        New worker processes are started if the downloader is used again.
+        """
+        if self.__is_worker_pool_owned:
+            self.worker_pool.close()
 
-    def download_passage(self, book, chapter, passage, file_path=''):
+    def download_passage(self, book, chapter, passage, file_path='', deadline=None, cancellation_token=None):
         """
         Downloads a single passage as a file.
 
@@ -153,12 +275,21 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
-        return self.download_passage_range(book, chapter, passage, chapter, passage, file_path)
+        return self.download_passage_range(book, chapter, passage, chapter, passage, file_path, deadline,
+                                           cancellation_token)
 
-    def download_passages(self, book, chapter, passage_from, passage_to, file_path=''):
+    def download_passages(self, book, chapter, passage_from, passage_to, file_path='', deadline=None,
+                          cancellation_token=None):
         """
         Downloads a range of passages of the same chapter as a file.
 
@@ -178,12 +309,20 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
-        return self.download_passage_range(book, chapter, passage_from, chapter, passage_to, file_path)
+        return self.download_passage_range(book, chapter, passage_from, chapter, passage_to, file_path, deadline,
+                                           cancellation_token)
 
-    def download_chapter(self, book, chapter, file_path=''):
+    def download_chapter(self, book, chapter, file_path='', deadline=None, cancellation_token=None):
         """
         Downloads a single chapter as a file.
 
@@ -198,12 +337,20 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
-        return self.download_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter(), file_path)
+        return self.download_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter(), file_path, deadline,
+                                           cancellation_token)
 
-    def download_chapters(self, book, chapter_from, chapter_to, file_path=''):
+    def download_chapters(self, book, chapter_from, chapter_to, file_path='', deadline=None, cancellation_token=None):
         """
         Downloads a range of passages from a specified chapter selection as a file.
 
@@ -220,12 +367,20 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
-        return self.download_passage_range(book, chapter_from, 1, chapter_to, common.get_end_of_chapter(), file_path)
+        return self.download_passage_range(book, chapter_from, 1, chapter_to, common.get_end_of_chapter(), file_path,
+                                           deadline, cancellation_token)
 
-    def download_book(self, book, file_path=''):
+    def download_book(self, book, file_path='', deadline=None, cancellation_token=None):
         """
         Downloads a specific book of the Bible and saves it as a file
 
@@ -236,13 +391,100 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
         return self.download_passage_range(book, 1, 1, common.get_chapter_count(book, self.translation),
-                                           common.get_end_of_chapter(), file_path)
+                                           common.get_end_of_chapter(), file_path, deadline, cancellation_token)
+
+    def download_translation(self, testament=None, deadline=None, cancellation_token=None):
+        """
+        Downloads every book of the translation as a separate file in the default directory.
+
+        The chapters of all the books are retrieved from a single queue of work, so the concurrency of the executor
+        and the rate limiter apply to the whole download rather than to each book. Each file is written as soon as
+        all the chapters of its book have been retrieved, so books that finish early are kept even if the download
+        fails or is stopped partway through.
+
+        :param testament: When specified, only downloads the books of the Old Testament ('OT') or the New Testament
+                          ('NT'). Defaults to None, which downloads all books of the translation.
+        :type testament: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no more files are written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write any more files. When using the 'process'
+                                   executor, stopping the download stops all the worker processes of the pool.
+                                   Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Number of files that were successfully written
+        :rtype: int
+        """
+        return self.__download_translation(testament, deadline, cancellation_token)[0]
+
+    def refresh_book(self, book, file_path='', deadline=None, cancellation_token=None):
+        """
+        Downloads a specific book of the Bible again, but only rewrites its file if the passages have changed.
+        The existing file is read back using the file reading function of the downloader.
+
+        :param book: Name of the book
+        :type book: str
+        :param file_path: When specified, refreshes the file at this location with a custom filename and extension.
+                          Using this parameter will take priority over the default_directory class property.
+                          Defaults to the default_directory path with the book as the file name with a default
+                          extension.
+        :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and the file is left as it is. Defaults to None, which doesn't limit
+                         the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and leaves the file as it is. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Chapter numbers that are different to the existing file, in ascending order. Every chapter is
+                 included if the file didn't exist or couldn't be read, and the list is empty if nothing has changed.
+        :rtype: list
+        """
+        if self.file_reading_function is None:
+            raise ValueError('A file reading function is needed to refresh files')
+        return self.__download_passage_range(book, 1, 1, common.get_chapter_count(book, self.translation),
+                                             common.get_end_of_chapter(), file_path, deadline, cancellation_token,
+                                             is_refresh=True)[1]
+
+    def refresh_translation(self, testament=None, deadline=None, cancellation_token=None):
+        """
+        Downloads every book of the translation again, in the same way as download_translation, but only rewrites the
+        files of books whose passages have changed.
+        The existing files are read back using the file reading function of the downloader.
 
-    def download_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, file_path=''):
+        :param testament: When specified, only refreshes the books of the Old Testament ('OT') or the New Testament
+                          ('NT'). Defaults to None, which refreshes all books of the translation.
+        :type testament: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no more files are refreshed. Defaults to None, which doesn't limit
+                         the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't refresh any more files. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Changed chapter numbers of each book that is different to its existing file, keyed on book name.
+                 Books that haven't changed are not included.
+        :rtype: dict
+        """
+        if self.file_reading_function is None:
+            raise ValueError('A file reading function is needed to refresh files')
+        return self.__download_translation(testament, deadline, cancellation_token, is_refresh=True)[1]
+
+    def download_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, file_path='',
+                               deadline=None, cancellation_token=None):
         """
         Downloads a range of passages from one specific passage to another passage as a file.
 
@@ -264,12 +506,103 @@ class BaseDownloader:
                           Defaults to the default_directory path with the book as the file name with a default
                           extension.
         :type file_path: str
+        :param deadline: Number of seconds that the download is allowed to take, after which it is stopped with a
+                         DeadlineExceededError and no file is written. Defaults to None, which doesn't limit the
+                         time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop the download from another thread, which raises an
+                                   OperationCancelledError and doesn't write the file. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: 1 if the download was successful. 0 if an error occurred.
         :rtype: int
         """
+        return self.__download_passage_range(book, chapter_from, passage_from, chapter_to, passage_to, file_path,
+                                             deadline, cancellation_token)[0]
+
+    def __download_translation(self, testament=None, deadline=None, cancellation_token=None, is_refresh=False):
+        """
+        A helper function that downloads every book of the translation, which is shared by download_translation and
+        refresh_translation. The parameters match those of download_translation.
+
+        :param is_refresh: If True, existing files are only rewritten if their passages have changed.
+                           Defaults to False.
+        :type is_refresh: bool
+        :return: Number of files that were successfully written (or left unchanged when refreshing), and the changed
+                 chapter numbers of each book that has changed
+        :rtype: tuple
+        """
+        translation = self.translation.upper()
+        if common.is_unsupported_translation(translation):
+            raise UnsupportedTranslationError(translation)
+        if testament is not None and testament.upper() not in self.__testaments:
+            raise ValueError(f'{testament} is not a valid testament')
+        operation_token = get_operation_token(deadline, cancellation_token)
+
+        # Books of the language that aren't part of the translation (such as the Old Testament of translations that
+        # only contain the New Testament) are skipped
+        mode = self.__testaments[testament.upper()] if testament is not None else 0
+        books = [book for book in common.get_bible_data_for_language(common.get_translation_language(translation),
+                                                                     mode)['Books']
+                 if common.get_chapter_count(book, translation) > 0]
+
+        executor = self._get_executor()
+        extractor_options = self.__get_extractor_options(translation, executor)
+        online_bible = WebExtractor(**extractor_options)
+
+        book_downloads = {}
+        chapter_groups = []
+        for book_name in books:
+            chapter_ranges = [(chapter, 1, common.get_end_of_chapter())
+                              for chapter in range(1, common.get_chapter_count(book_name, translation) + 1)]
+            download_key, chapters = self.__restore_checkpoint(translation, book_name, chapter_ranges)
+            book_groups = self.__get_chapter_groups(online_bible, book_name, chapter_ranges, chapters)
+            book_downloads[book_name] = {'key': download_key, 'chapters': chapters, 'remaining': len(book_groups)}
+            chapter_groups.extend(book_groups)
+
+        file_count = 0
+        changes = {}
+        # Books that were fully retrieved by an earlier download are written straight away
+        for book_name, book_download in book_downloads.items():
+            if book_download['remaining'] <= 0:
+                is_written, changes[book_name] = self.__write_book(translation, book_name, book_download['chapters'],
+                                                                   is_refresh=is_refresh)
+                file_count += is_written
+        with closing(self.__iter_chapter_groups(executor, extractor_options, online_bible, chapter_groups,
+                                                operation_token)) as completed_groups:
+            for index, chapters in completed_groups:
+                book_name = chapter_groups[index][0]
+                book_download = book_downloads[book_name]
+                self.__record_checkpoint(book_download['key'], chapters)
+                book_download['chapters'].update(chapters)
+                book_download['remaining'] -= 1
+                if book_download['remaining'] <= 0:
+                    is_written, changes[book_name] = self.__write_book(translation, book_name,
+                                                                       book_download['chapters'],
+                                                                       is_refresh=is_refresh)
+                    file_count += is_written
+        # Recorded chapters are kept until the whole translation has been written, so that downloading the
+        # translation again after a failure doesn't retrieve the books which were already written
+        if self.checkpoint_journal is not None:
+            for book_download in book_downloads.values():
+                self.checkpoint_journal.remove(book_download['key'])
+        return file_count, {book_name: chapters for book_name, chapters in changes.items() if chapters}
+
+    def __download_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, file_path='',
+                                 deadline=None, cancellation_token=None, is_refresh=False):
+        """
+        A helper function that downloads a range of passages as a file, which is shared by download_passage_range
+        and refresh_book. The parameters match those of download_passage_range.
+
+        :param is_refresh: If True, an existing file is only rewritten if its passages have changed.
+                           Defaults to False.
+        :type is_refresh: bool
+        :return: 1 if the download was successful, otherwise 0, and the changed chapter numbers
+        :rtype: tuple
+        """
         translation = self.translation.upper()
         if common.is_unsupported_translation(translation):
             raise UnsupportedTranslationError(translation)
+        operation_token = get_operation_token(deadline, cancellation_token)
         # Standardise letter casing with minimal impact to the resulting file
         book_name = book.title()
 
@@ -283,15 +616,143 @@ class BaseDownloader:
                                                       max_value=common.get_chapter_count(book_name, translation))
         capped_passage_to = common.get_capped_integer(passage_to)
 
-        online_bible = WebExtractor(translation=translation, show_passage_numbers=self.show_passage_numbers,
-                                    output_as_list=True, strip_excess_whitespace_from_list=self.strip_excess_whitespace,
-                                    use_ascii_punctuation=self.use_ascii_punctuation)
+        executor = self._get_executor()
+        extractor_options = self.__get_extractor_options(translation, executor)
+        online_bible = WebExtractor(**extractor_options)
+
+        # Range is extended by 1 to include chapter_to in the loop iteration
+        chapter_ranges = []
+        for chapter in range(capped_chapter_from, capped_chapter_to + 1):
+            passage_initial = 1
+            passage_final = common.get_end_of_chapter()
+            # Exclude a certain first half of the initial chapter based on where the passage start should be
+            if chapter == capped_chapter_from:
+                passage_initial = capped_passage_from
+            # Exclude a certain last half of the last chapter based on where the passage end should be
+            if chapter == capped_chapter_to:
+                passage_final = capped_passage_to
+            chapter_ranges.append((chapter, passage_initial, passage_final))
+
+        download_key, chapters = self.__restore_checkpoint(translation, book_name, chapter_ranges)
+        chapter_groups = self.__get_chapter_groups(online_bible, book_name, chapter_ranges, chapters)
+        with closing(self.__iter_chapter_groups(executor, extractor_options, online_bible, chapter_groups,
+                                                operation_token)) as completed_groups:
+            for _, group_chapters in completed_groups:
+                self.__record_checkpoint(download_key, group_chapters)
+                chapters.update(group_chapters)
+
+        is_written, changed_chapters = self.__write_book(translation, book_name, chapters, file_path, is_refresh)
+        if is_written and self.checkpoint_journal is not None:
+            self.checkpoint_journal.remove(download_key)
+        return is_written, changed_chapters
+
+    def _get_chapters_dict(self, online_bible, book, chapter_ranges, cancellation_token=None):
+        """
+        A helper function that obtains passages across a range of consecutive chapters and organises them as a
+        dictionary for output. Not to be exposed as a usable method, as this function mostly exists so that passage
+        retrieval can be done in a multi-processed way.
+
+        :param online_bible: Instance of WebExtractor to use to download the passages
+        :type online_bible: WebExtractor
+        :param book: Name of the book
+        :type book: str
+        :param chapter_ranges: Consecutive chapters to get, in order. Each chapter is a tuple containing the chapter
+                               number, the first passage number to get and the last passage number to get.
+        :type chapter_ranges: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Dictionary of chapters, keyed on chapter number
+        :rtype: dict
+        """
+        first_chapter, first_passage, _ = chapter_ranges[0]
+        last_chapter, _, last_passage = chapter_ranges[-1]
+        options = {**online_bible._get_parse_options(), 'output_as_list': True}
+        chapter_results = online_bible._get_chapter_results(book, first_chapter, first_passage, last_chapter,
+                                                            last_passage, cancellation_token, options)
+        return {self.__key_cast(chapter): self.__organise_passages(online_bible.translation, book, chapter,
+                                                                   passage_from, passage_list)
+                for (chapter, passage_from, _), passage_list in zip(chapter_ranges, chapter_results)}
+
+    def _get_chapters_dict_in_process(self, online_bible, book, chapter_ranges, cancellation_token=None):
+        """
+        A helper function that runs _get_chapters_dict in a worker process. The parameters match those of
+        _get_chapters_dict.
+
+        :return: Dictionary of chapters, keyed on chapter number
+        :rtype: dict
+        """
+        try:
+            return self._get_chapters_dict(online_bible, book, chapter_ranges, cancellation_token)
+        except HTTPError as exception:
+            # HTTPError can't be sent back from a worker process, which would leave the download waiting forever for
+            # the group to finish, so the error is raised as a more general URLError instead
+            raise URLError(f'HTTP Error {exception.code}: {exception.reason} ({exception.url})') from None
+
+    async def __get_chapters_dict_async(self, online_bible, book, chapter_ranges):
+        """
+        A helper function that obtains passages across a range of consecutive chapters using the Async Web Extractor,
+        and organises them as a dictionary for output.
+
+        :param online_bible: Instance of AsyncWebExtractor to use to download the passages
+        :type online_bible: AsyncWebExtractor
+        :param book: Name of the book
+        :type book: str
+        :param chapter_ranges: Consecutive chapters to get, in order. Each chapter is a tuple containing the chapter
+                               number, the first passage number to get and the last passage number to get.
+        :type chapter_ranges: list
+        :return: Dictionary of chapters, keyed on chapter number
+        :rtype: dict
+        """
+        first_chapter, first_passage, _ = chapter_ranges[0]
+        last_chapter, _, last_passage = chapter_ranges[-1]
+        options = {**online_bible._get_parse_options(), 'output_as_list': True}
+        chapter_results = await online_bible._get_chapter_results_async(book, first_chapter, first_passage,
+                                                                        last_chapter, last_passage, options)
+        return {self.__key_cast(chapter): self.__organise_passages(online_bible.translation, book, chapter,
+                                                                   passage_from, passage_list)
+                for (chapter, passage_from, _), passage_list in zip(chapter_ranges, chapter_results)}
+
+    def __get_extractor_options(self, translation, executor):
+        """
+        A helper function to get the options of the Web Extractor used to retrieve the chapters of a download.
+
+        :param translation: Translation code of the download
+        :type translation: str
+        :param executor: Name of the executor used to retrieve the chapters
+        :type executor: str
+        :return: Keyword arguments of the Web Extractor
+        :rtype: dict
+        """
+        extractor_options = {
+            'translation': translation, 'show_passage_numbers': self.show_passage_numbers, 'output_as_list': True,
+            'strip_excess_whitespace_from_list': self.strip_excess_whitespace,
+            'use_ascii_punctuation': self.use_ascii_punctuation, 'connection_pool': self.connection_pool,
+            'response_cache': self.response_cache, 'parser': self.parser, 'engine': self.engine,
+            'rate_limiter': self.rate_limiter, 'hedging_policy': self.hedging_policy, 'base_url': self.base_url,
+            'max_chapters_per_request': self.max_chapters_per_request
+        }
+        if executor == 'serial':
+            extractor_options['max_concurrent_requests'] = 1
+        elif executor != 'process' and self.concurrency is not None:
+            extractor_options['max_concurrent_requests'] = self.concurrency
+        return extractor_options
+
+    @staticmethod
+    def __get_document(translation, book_name):
+        """
+        A helper function to set up the base document of a downloaded file, without any passages.
 
-        # Set up the base document with the root-level keys
+        :param translation: Translation code of the download
+        :type translation: str
+        :param book_name: Name of the book
+        :type book_name: str
+        :return: Document containing the root-level keys
+        :rtype: dict
+        """
         # Upon downloading a file, the top-level keys might be ordered differently to when they were inserted.
         # This is likely due to Python not sorting dictionary keys internally, but could be due to something else.
         # This does not affect the information contained in the downloaded file, but could affect file comparisons.
-        document = {
+        return {
             'Info': {
                 'Language': common.get_translation_language(translation),
                 'Translation': translation,
@@ -302,94 +763,356 @@ class BaseDownloader:
             book_name: {}
         }
 
-        # Don't initialise the thread pool unless the extractor has been set to use multiprocessing.
-        # This logic could be already running in a daemon process, and initialising the pool will cause an error.
-        process_pool = None
-        if self.enable_multiprocessing:
-            process_pool = multiprocessing.Pool()
-        process_results = []
+    def __get_file_location(self, book_name, file_path=''):
+        """
+        A helper function to get the location of a downloaded file.
 
-        # Range is extended by 1 to include chapter_to in the loop iteration
-        chapter_range = range(capped_chapter_from, capped_chapter_to + 1)
-        for chapter in chapter_range:
-            passage_initial = 1
-            passage_final = common.get_end_of_chapter()
-            # Exclude a certain first half of the initial chapter based on where the passage start should be
-            if chapter == capped_chapter_from:
-                passage_initial = capped_passage_from
-            # Exclude a certain last half of the last chapter based on where the passage end should be
-            if chapter == capped_chapter_to:
-                passage_final = capped_passage_to
+        :param book_name: Name of the book
+        :type book_name: str
+        :param file_path: Custom location of the file. Defaults to the default_directory path with the book as the file
+                          name with a default extension.
+        :type file_path: str
+        :return: Path of the file
+        :rtype: str
+        """
+        if len(file_path) <= 0:
+            return os.path.join(self.default_directory, f'{book_name}{self.file_extension}')
+        return file_path
 
-            if self.enable_multiprocessing:
-                # Asynchronously obtain each set of passages to reduce overall download time.
-                # These are daemon processes, so these shouldn't block the program from exiting and should be
-                # expected to be garbage collected if the main process is stopped.
-                process = process_pool.apply_async(self._get_passages_dict, (online_bible, book_name, chapter,
-                                                                             passage_initial, passage_final),
-                                                   error_callback=self.__handle_exception_from_process)
-                # Add the process result to the list and extract the value later to prioritise doing more work
-                process_results.append(process)
-            else:
-                document[book_name][self.__key_cast(chapter)] = self._get_passages_dict(online_bible, book_name,
-                                                                                        chapter, passage_initial,
-                                                                                        passage_final)
-
-        if self.enable_multiprocessing:
-            # Close the pool manually, as the garbage collector might not dispose of this automatically
-            process_pool.close()
-            # Explicitly wait for the processes to finish up in case some processes have heavy workloads
-            process_pool.join()
-            # When multiprocessing, all process results should be retrieved as a batch operation to minimise
-            # the total time cost associated with the "get" method for each result.
-            document[book_name] = {self.__key_cast(chapter): process_results.pop(0).get() for chapter in chapter_range}
+    def __restore_checkpoint(self, translation, book_name, chapter_ranges):
+        """
+        A helper function to get the chapters of a download that were recorded in the checkpoint journal by an earlier
+        download with the same parameters.
 
-        if len(file_path) <= 0:
-            file_location = os.path.join(self.default_directory, f'{book_name}{self.file_extension}')
-        else:
-            file_location = file_path
-        return self.file_writing_function(file_location, document)
+        :param translation: Translation code of the download
+        :type translation: str
+        :param book_name: Name of the book
+        :type book_name: str
+        :param chapter_ranges: Chapters of the download. Each chapter is a tuple containing the chapter number, the
+                               first passage number to get and the last passage number to get.
+        :type chapter_ranges: list
+        :return: Download key in the checkpoint journal, and the dictionary of recorded chapters keyed on chapter
+                 number. The key is None and no chapters are returned if the downloader has no checkpoint journal.
+        :rtype: tuple
+        """
+        if self.checkpoint_journal is None:
+            return None, {}
+        # Every parameter that affects the contents of the chapters is part of the key, so that chapters are never
+        # mixed between different downloads
+        download_key = get_download_key({
+            'translation': translation, 'book': book_name, 'chapters': chapter_ranges,
+            'show_passage_numbers': self.show_passage_numbers, 'strip_excess_whitespace': self.strip_excess_whitespace,
+            'use_ascii_punctuation': self.use_ascii_punctuation, 'write_key_as_string': self.write_key_as_string,
+            'base_url': self.base_url
+        })
+        return download_key, {self.__key_cast(chapter): passages
+                              for chapter, passages in self.checkpoint_journal.get_chapters(download_key).items()}
+
+    def __record_checkpoint(self, download_key, chapters):
+        """
+        A helper function to record retrieved chapters in the checkpoint journal, if the downloader has one.
+
+        :param download_key: Download key in the checkpoint journal
+        :type download_key: str
+        :param chapters: Dictionary of chapters, keyed on chapter number
+        :type chapters: dict
+        """
+        if self.checkpoint_journal is not None:
+            self.checkpoint_journal.record(download_key, chapters)
+
+    def __get_chapter_groups(self, online_bible, book_name, chapter_ranges, retrieved_chapters):
+        """
+        A helper function to split the chapters that still need to be retrieved into groups of consecutive chapters.
+        Consecutive chapters are retrieved together to reduce the number of web requests, with each group of
+        chapters matching what the Web Extractor is able to retrieve in a single request.
+
+        :param online_bible: Instance of WebExtractor used to download the passages
+        :type online_bible: WebExtractor
+        :param book_name: Name of the book
+        :type book_name: str
+        :param chapter_ranges: Chapters of the download, in order. Each chapter is a tuple containing the chapter
+                               number, the first passage number to get and the last passage number to get.
+        :type chapter_ranges: list
+        :param retrieved_chapters: Dictionary of chapters that have already been retrieved, keyed on chapter number
+        :type retrieved_chapters: dict
+        :return: Groups of chapters. Each group is a tuple containing the name of the book and its chapters.
+        :rtype: list
+        """
+        # A retrieved chapter splits the chapters around it, since each group must be consecutive
+        consecutive_ranges = []
+        remaining_ranges = []
+        for chapter_range in chapter_ranges:
+            if self.__key_cast(chapter_range[0]) in retrieved_chapters:
+                if remaining_ranges:
+                    consecutive_ranges.append(remaining_ranges)
+                    remaining_ranges = []
+                continue
+            remaining_ranges.append(chapter_range)
+        if remaining_ranges:
+            consecutive_ranges.append(remaining_ranges)
+        return [(book_name, group) for ranges in consecutive_ranges
+                for group in online_bible._get_chapter_chunks(book_name, ranges)]
+
+    def __write_book(self, translation, book_name, chapters, file_path='', is_refresh=False):
+        """
+        A helper function to write the retrieved chapters of a book to a file.
+
+        :param translation: Translation code of the download
+        :type translation: str
+        :param book_name: Name of the book
+        :type book_name: str
+        :param chapters: Dictionary of chapters, keyed on chapter number
+        :type chapters: dict
+        :param file_path: Custom location of the file. Defaults to the default_directory path with the book as the file
+                          name with a default extension.
+        :type file_path: str
+        :param is_refresh: If True, an existing file is only rewritten if its passages are different to the retrieved
+                           chapters. Defaults to False.
+        :type is_refresh: bool
+        :return: 1 if the file was written successfully (or didn't need to be rewritten), otherwise 0, and the
+                 chapter numbers that are different to the existing file
+        :rtype: tuple
+        """
+        document = self.__get_document(translation, book_name)
+        # Chapters are retrieved in any order, so they are put back in order
+        document[book_name] = {chapter: chapters[chapter] for chapter in sorted(chapters, key=int)}
+        file_location = self.__get_file_location(book_name, file_path)
+        changed_chapters = [int(chapter) for chapter in document[book_name]]
+        if is_refresh and os.path.exists(file_location):
+            try:
+                existing_chapters = self.file_reading_function(file_location).get(book_name, {})
+            except Exception:
+                # A file that can't be read back is replaced entirely
+                existing_chapters = None
+            if existing_chapters is not None:
+                changed_chapters = self.__get_changed_chapters(existing_chapters, document[book_name])
+                if not changed_chapters:
+                    return 1, changed_chapters
+        return self.file_writing_function(file_location, document), changed_chapters
 
     @staticmethod
-    def __handle_exception_from_process(exception):
+    def __get_changed_chapters(existing_chapters, chapters):
+        """
+        A helper function to compare the chapters of an existing file to the retrieved chapters of a book.
+        Chapter and passage keys are compared as strings, since some file formats don't keep integer keys.
+
+        :param existing_chapters: Dictionary of chapters read from the existing file, keyed on chapter number
+        :type existing_chapters: dict
+        :param chapters: Dictionary of retrieved chapters, keyed on chapter number
+        :type chapters: dict
+        :return: Chapter numbers that were added, removed or have different passages, in ascending order
+        :rtype: list
+        """
+        existing = {int(chapter): {str(passage): text for passage, text in (passages or {}).items()}
+                    for chapter, passages in existing_chapters.items()}
+        retrieved = {int(chapter): {str(passage): text for passage, text in passages.items()}
+                     for chapter, passages in chapters.items()}
+        return [chapter for chapter in sorted(existing.keys() | retrieved.keys())
+                if existing.get(chapter) != retrieved.get(chapter)]
+
+    def __iter_chapter_groups(self, executor, extractor_options, online_bible, chapter_groups,
+                              cancellation_token=None):
+        """
+        A helper function that retrieves groups of chapters using an executor.
+
+        :param executor: Name of the executor
+        :type executor: str
+        :param extractor_options: Keyword arguments of the Web Extractor
+        :type extractor_options: dict
+        :param online_bible: Instance of WebExtractor to use to download the passages
+        :type online_bible: WebExtractor
+        :param chapter_groups: Groups of consecutive chapters to get. Each group is a tuple containing the name of the
+                               book and the chapters to get, in the same format used by _get_chapters_dict.
+        :type chapter_groups: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Index of each group and its dictionary of chapters, in the order that the groups finish
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        if not chapter_groups:
+            return
+        if executor == 'process':
+            yield from self.__iter_chapter_groups_in_processes(online_bible, chapter_groups, cancellation_token)
+        elif executor == 'async':
+            yield from self.__iter_chapter_groups_async(AsyncWebExtractor(**extractor_options), chapter_groups,
+                                                        cancellation_token)
+        else:
+            yield from self.__iter_chapter_groups_in_threads(online_bible, chapter_groups, cancellation_token)
+
+    def __iter_chapter_groups_in_threads(self, online_bible, chapter_groups, cancellation_token=None):
         """
-        A helper function that gets run an exception is received when downloading passages.
-        This is not a top-level global function, as it is intended to be solely used within this class.
+        A helper function that retrieves groups of chapters from a pool of threads, with one thread for each web
+        request that the Web Extractor is allowed to have in progress.
 
-        :param exception: Exception object that is re-raised after this method completes.
-        :type exception: object
+        :param online_bible: Instance of WebExtractor to use to download the passages
+        :type online_bible: WebExtractor
+        :param chapter_groups: Groups of consecutive chapters to get. Each group is a tuple containing the name of the
+                               book and the chapters to get, in the same format used by _get_chapters_dict.
+        :type chapter_groups: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Index of each group and its dictionary of chapters, in the order that the groups finish
+        :rtype: collections.abc.Iterator[tuple]
         """
-        # Clear the arguments to prevent "stacking" of exception error messages.
-        # An empty tuple means the user has to search elsewhere in the stack trace to find the point of failure.
-        exception.args = ()
+        # Stops the groups that haven't finished yet if one of the groups fails
+        group_token = CancellationToken(parent=cancellation_token)
+        thread_pool = ThreadPoolExecutor(max_workers=online_bible.max_concurrent_requests,
+                                         thread_name_prefix='meaningless-download')
+        try:
+            futures = {thread_pool.submit(self._get_chapters_dict, online_bible, book_name, chapter_ranges,
+                                          group_token): index
+                       for index, (book_name, chapter_ranges) in enumerate(chapter_groups)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            group_token.cancel()
+            thread_pool.shutdown(wait=True, cancel_futures=True)
 
-    def _get_passages_dict(self, online_bible, book, chapter, passage_from, passage_to):
+    def __iter_chapter_groups_in_processes(self, online_bible, chapter_groups, cancellation_token=None):
         """
-        A helper function that obtains a range of passages and organises them as a dictionary for output.
-        Not to be exposed as a usable method, as this function mostly exists so that passage retrieval can be done
-        in a multi-processed way. Pre-pending the method name with double underscores causes referencing issues.
+        A helper function that retrieves groups of chapters in the worker processes.
+        If this downloader owns the worker pool, the worker processes are stopped if any groups are still being
+        retrieved when this finishes, such as when the download is cancelled, its deadline passes or one of the groups
+        fails. Otherwise, the remaining groups are left to finish in the shared pool without being waited for.
 
         :param online_bible: Instance of WebExtractor to use to download the passages
         :type online_bible: WebExtractor
+        :param chapter_groups: Groups of consecutive chapters to get. Each group is a tuple containing the name of the
+                               book and the chapters to get, in the same format used by _get_chapters_dict.
+        :type chapter_groups: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Index of each group and its dictionary of chapters, in the order that the groups finish
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        finished_groups = queue.SimpleQueue()
+        remaining_groups = len(chapter_groups)
+        terminations = self.worker_pool.get_stats()['terminations']
+        try:
+            for index, (book_name, chapter_ranges) in enumerate(chapter_groups):
+                # These are daemon processes, so these shouldn't block the program from exiting and should be
+                # expected to be garbage collected if the main process is stopped.
+                self.worker_pool.apply_async(
+                    self._get_chapters_dict_in_process, (online_bible, book_name, chapter_ranges, cancellation_token),
+                    callback=partial(self.__put_finished_group, finished_groups, index, is_successful=True),
+                    error_callback=partial(self.__put_finished_group, finished_groups, index, is_successful=False))
+            for _ in range(len(chapter_groups)):
+                while True:
+                    try:
+                        # The token is checked periodically, since cancelling it doesn't affect the copies in other
+                        # processes
+                        index, is_successful, result = finished_groups.get(
+                            timeout=cancellation_token.get_timeout(0.1) if cancellation_token is not None else 0.1)
+                        break
+                    except queue.Empty:
+                        if cancellation_token is not None:
+                            cancellation_token.raise_if_cancelled()
+                        # Groups that were in the worker processes when they were stopped never finish
+                        if self.worker_pool.get_stats()['terminations'] != terminations:
+                            raise OperationCancelledError('The worker processes were stopped before all the '
+                                                          'chapters were retrieved')
+                if not is_successful:
+                    raise result
+                remaining_groups -= 1
+                yield index, result
+        finally:
+            if remaining_groups > 0 and self.__is_worker_pool_owned:
+                # Stopping the worker processes interrupts the web requests they have in progress, so that the
+                # remaining groups don't hold up later downloads using the same pool. A shared pool is left running,
+                # since other downloads may still be using it.
+                self.worker_pool.terminate()
+
+    @staticmethod
+    def __put_finished_group(finished_groups, index, result, is_successful):
+        """
+        A helper function that gets run when a worker process has finished retrieving a group of chapters.
+
+        :param finished_groups: Queue of finished groups
+        :type finished_groups: queue.SimpleQueue
+        :param index: Index of the group
+        :type index: int
+        :param result: Dictionary of chapters of the group, or the exception raised when retrieving it
+        :type result: dict or Exception
+        :param is_successful: True if the group was retrieved, otherwise False
+        :type is_successful: bool
+        """
+        finished_groups.put((index, is_successful, result))
+
+    def __iter_chapter_groups_async(self, online_bible, chapter_groups, cancellation_token=None):
+        """
+        A helper function that retrieves groups of chapters using the Async Web Extractor, which runs in its own
+        event loop whenever the next finished group is waited for. The Async Web Extractor is closed afterwards.
+
+        :param online_bible: Instance of AsyncWebExtractor to use to download the passages
+        :type online_bible: AsyncWebExtractor
+        :param chapter_groups: Groups of consecutive chapters to get. Each group is a tuple containing the name of the
+                               book and the chapters to get, in the same format used by _get_chapters_dict.
+        :type chapter_groups: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Index of each group and its dictionary of chapters, in the order that the groups finish
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        # This runs its own event loop, so it can't be used from a coroutine that is already running in one
+        loop = asyncio.new_event_loop()
+        tasks = {}
+        try:
+            # The Async Web Extractor limits the number of web requests in progress across all the tasks
+            for index, (book_name, chapter_ranges) in enumerate(chapter_groups):
+                task = loop.create_task(self.__get_chapters_dict_async(online_bible, book_name, chapter_ranges))
+                tasks[task] = index
+            pending_tasks = set(tasks)
+            while pending_tasks:
+                # Cancelling the token doesn't wake up the event loop, so the token is checked periodically instead
+                finished_tasks, pending_tasks = loop.run_until_complete(asyncio.wait(
+                    pending_tasks, timeout=cancellation_token.get_timeout(0.1) if cancellation_token else None,
+                    return_when=asyncio.FIRST_COMPLETED))
+                for task in finished_tasks:
+                    yield tasks[task], task.result()
+                if cancellation_token is not None:
+                    cancellation_token.raise_if_cancelled()
+        finally:
+            # Cancelling the tasks interrupts the web requests in progress
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.wait(tasks))
+            loop.close()
+            online_bible.close()
+
+    def _get_executor(self):
+        """
+        A helper function to determine the method used to retrieve the chapters of a download.
+
+        :return: Name of the executor
+        :rtype: str
+        """
+        if self.executor is not None:
+            return self.executor
+        return 'process' if self.enable_multiprocessing else 'serial'
+
+    def __organise_passages(self, translation, book, chapter, passage_from, passage_list):
+        """
+        A helper function that organises the passages of a chapter as a dictionary for output.
+
+        :param translation: Translation code of the passages
+        :type translation: str
         :param book: Name of the book
         :type book: str
         :param chapter: Chapter number
         :type chapter: int
-        :param passage_from: First passage number to get
+        :param passage_from: First passage number in the list of passages
         :type passage_from: int
-        :param passage_to: Last passage number to get
-        :type passage_to: int
+        :param passage_list: Passages of the chapter, in order
+        :type passage_list: list
         :return: Dictionary of passages, keyed on passage number
         :rtype: dict
         """
-        online_bible.output_as_list = True
-        passage_list = online_bible.get_passages(book, chapter, passage_from, passage_to)
         # passage_num is the numerical representation of the Unicode passage number at the start of each passage
         passage_num = passage_from
-        # self.translation is not used, since getting this far means that the translation used in the
-        # earlier call to get_passages is guaranteed to be valid.
-        is_translation_with_omitted_passages = online_bible.translation in \
-            self.__translations_with_omitted_passages.keys()
+        # self.translation is not used, since getting this far means that the translation used to get the passages
+        # is guaranteed to be valid.
+        is_translation_with_omitted_passages = translation in self.__translations_with_omitted_passages.keys()
         passages = {}
         for passage in passage_list:
             if is_translation_with_omitted_passages:
@@ -399,7 +1122,7 @@ class BaseDownloader:
                 # This is to ensure the passage key matches the actual passage contents,
                 # regardless of translation.
                 passage_string = f'{book} {chapter}:{passage_num}'
-                if passage_string in self.__translations_with_omitted_passages[online_bible.translation]:
+                if passage_string in self.__translations_with_omitted_passages[translation]:
                     passages[self.__key_cast(passage_num)] = ''
                     # Since this passage isn't supposed to exist in the given translation but it is still registered
                     # in the file, the number is upped twice in this loop iteration - once for the omitted
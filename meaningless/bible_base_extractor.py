@@ -185,7 +185,35 @@ class BaseExtractor:
         :return: All passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        translation = self.translation.upper()
+        return self._get_passage_range(book, chapter_from, passage_from, chapter_to, passage_to, file_path)
+
+    def _get_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, file_path='', options=None):
+        """
+        A helper function to get a range of passages from a file using a fixed set of output options, which allows
+        callers to change the output options of a single call without changing the output options of this extractor.
+
+        :param book: Name of the book
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param file_path: When specified, reads the file from this location with a custom filename and extension.
+                          Defaults to the default_directory path with the book as the file name with a default
+                          extension.
+        :type file_path: str
+        :param options: Output options used for this call only, in the form returned by _get_output_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: All passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        options = options if options is not None else self._get_output_options()
+        translation = options['translation'].upper()
         if common.is_unsupported_translation(translation):
             raise UnsupportedTranslationError(translation)
         # Standardise letter casing to ensure key access errors are not caused by case sensitivity
@@ -234,26 +262,26 @@ class BaseExtractor:
             [passage_list.append(document[book_name][self.__key_cast(chapter)][self.__key_cast(passage)]) for passage in
              range(passage_initial, passage_final + 1)]
             # Start each chapter on a new line when outputting as a string.
-            if not self.output_as_list:
+            if not options['output_as_list']:
                 passage_list.append('\n')
 
         minimal_copyright_text = f' {common.get_minimal_copyright_text(translation)}'
-        if self.use_ascii_punctuation:
+        if options['use_ascii_punctuation']:
             passage_list = [common.unicode_to_ascii_punctuation(passage) for passage in passage_list]
-        if not self.show_passage_numbers:
+        if not options['show_passage_numbers']:
             # This assumes that all superscript numbers are indicative of the passage number
             passage_list = [common.remove_superscript_numbers_in_passage(passage) for passage in passage_list]
-        if self.output_as_list:
-            if self.add_minimal_copyright:
+        if options['output_as_list']:
+            if options['add_minimal_copyright']:
                 # Minimal copyright text is added here to apply any effects of strip_excess_whitespace_from_list
                 passage_list.append(minimal_copyright_text)
-            if self.strip_excess_whitespace_from_list:
+            if options['strip_excess_whitespace_from_list']:
                 return [passage.strip() for passage in passage_list]
             return passage_list
         # Convert the list of passages into a string, as strings are immutable and manually re-initialising a new string
         # in the loop can be costly to performance.
         all_text = ''.join([passage for passage in passage_list]).strip()
-        if self.add_minimal_copyright:
+        if options['add_minimal_copyright']:
             all_text += minimal_copyright_text
 
         return all_text.strip()
@@ -455,13 +483,12 @@ class BaseExtractor:
                  or none of the passages met the search criteria.
         :rtype: str or list
         """
-        # Temporarily force output as a list to process individual passages more easily
-        output_as_list = self.output_as_list
-        try:
-            self.output_as_list = True
-            passages = self.get_passage_range(book, chapter_from, passage_from, chapter_to, passage_to, file_path)
-        finally:
-            self.output_as_list = output_as_list
+        # Get the passages as a list to process individual passages more easily. This only applies to this call, so
+        # the output options of this extractor are left unchanged for any other threads using it.
+        options = self._get_output_options()
+        output_as_list = options['output_as_list']
+        passages = self._get_passage_range(book, chapter_from, passage_from, chapter_to, passage_to, file_path,
+                                           {**options, 'output_as_list': True})
 
         matching_passages = []
         if is_case_sensitive:
@@ -472,16 +499,30 @@ class BaseExtractor:
             if (not is_case_sensitive and search_text.casefold() in passage.casefold()) or \
                (is_case_sensitive and search_text in passage) or \
                (is_regex and re.search(keyword_regex, passage)):
-                if not self.output_as_list:
+                if not output_as_list:
                     # Strip whitespace on string output to match the same kind of returned data as get_passage_range
                     matching_passages.append(passage.strip())
                 else:
                     matching_passages.append(passage)
 
-        if self.output_as_list:
+        if output_as_list:
             return matching_passages
         return '\n'.join(matching_passages)
 
+    def _get_output_options(self):
+        """
+        A helper function to get the current output options of this extractor, so that a call can use the same options
+        throughout, even if they are changed by another thread in the meantime.
+
+        :return: Output options, keyed on the name of the class property
+        :rtype: dict
+        """
+        return {'translation': self.translation, 'show_passage_numbers': self.show_passage_numbers,
+                'output_as_list': self.output_as_list,
+                'strip_excess_whitespace_from_list': self.strip_excess_whitespace_from_list,
+                'use_ascii_punctuation': self.use_ascii_punctuation,
+                'add_minimal_copyright': self.add_minimal_copyright}
+
     def __key_cast(self, key):
         """
         A helper function to cast a dictionary key to a string or an integer.
@@ -9,7 +9,9 @@ class CSVDownloader(BaseDownloader):
     """
 
     def __init__(self, translation='NIV', show_passage_numbers=True, default_directory=os.getcwd(),
-                 strip_excess_whitespace=False, enable_multiprocessing=True, use_ascii_punctuation=False):
+                 strip_excess_whitespace=False, enable_multiprocessing=True, use_ascii_punctuation=False,
+                 **kwargs):
         super().__init__(csv_file_interface.write, translation, show_passage_numbers, default_directory,
                          strip_excess_whitespace, enable_multiprocessing, use_ascii_punctuation,
-                         file_extension='.csv', write_key_as_string=False)
+                         file_extension='.csv', write_key_as_string=False,
+                         file_reading_function=csv_file_interface.read, **kwargs)
@@ -1,10 +1,26 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 from urllib.parse import urlencode
 import re
 from meaningless.utilities import common
+from meaningless.utilities.lru_cache import LRUCache
+from meaningless.utilities.passage_parser import PassageContentParser
+from meaningless.utilities.cancellation import CancellationToken, get_operation_token
 from meaningless.utilities.exceptions import InvalidSearchError, UnsupportedTranslationError
 
 
+PassageItem = namedtuple('PassageItem', ['book', 'chapter', 'passage', 'text', 'sequence'])
+PassageItem.__doc__ = '''
+A single passage yielded by the iter_* methods of the Web Extractor.
+
+book = Name of the book, chapter = Chapter number, passage = Passage number, text = Passage text formatted using the
+output options of the extractor, sequence = Position of the chapter within the requested range, starting from 0, which
+can be used to put chapters back in order when they are yielded out of order.
+'''
+
+
 class WebExtractor:
     """
     An extractor object that retrieves Bible passages from the Bible Gateway site.
@@ -14,8 +30,92 @@ class WebExtractor:
     file extension, etc.).
     """
 
+    # A private use Unicode character, which marks where each chapter starts when splitting a page into chapters
+    __chapter_marker = '\ue000'
+
+    # Only the passage contents are used from a search results page, so the rest of the page is not parsed.
+    # A regex is used to match the class name, as tags can have multiple classes and these are not yet split into
+    # separate class names while the page is being parsed.
+    __passage_content_strainer = SoupStrainer('div', {'class': re.compile(r'(^|\s)passage-content(\s|$)')})
+    # These parsers always parse the whole page, and show a warning if asked to only parse part of it
+    __parsers_without_partial_parsing = ['html5lib']
+
+    # Rules used to clean up the parsed web page before collecting its text contents. Each rule is a tuple of:
+    #   - Tag names that the rule applies to
+    #   - Class names, where the tag needs to have at least one of them. None matches tags regardless of class.
+    #   - Translations that the rule applies to. None applies the rule to all translations.
+    #   - Interval of matching tags that the action is performed on. For example, 2 applies the action to every
+    #     second tag matching the rule (starting from the first one), with the other tags being kept as they are.
+    #   - Action to perform on each matching tag. None removes the tag and its contents. Otherwise, this is a
+    #     function that takes the text contents of the tag, its attributes and a dictionary of markers, and returns
+    #     the text that replaces the tag.
+    # Rules are applied in order, so a tag matching multiple rules is only processed by the first of these rules.
+    # Since each rule processes the results of the rules before it, the order of the rules MUST be preserved.
+    # These rules are shared by all extraction engines, so that each engine produces the same passage contents.
+    __cleanup_rules = [
+        # Ignore passage display, chapter headings, section headings and subsection headings (such as in Ezekiel 40)
+        (['h1', 'h2', 'h3', 'h4'], None, None, 1, None),
+        # Ignore the "Read Full Chapter" text, which is carefully embedded within the passage
+        (['a'], ['full-chap-link', 'bibleref'], None, 1, None),
+        # Ignore cross references and in-line footnotes
+        (['sup'], ['crossreference', 'footnote'], None, 1, None),
+        # Ignore the footer area, which is composed of several main tags
+        (['div'], ['footnotes', 'dropdowns', 'crossrefs', 'passage-other-trans'], None, 1, None),
+        # Ignore explicit translation notes in translations such as ESV
+        (['p'], ['translation-note'], None, 1, None),
+        # Ignore in-line references in translations such as WEB
+        (['crossref'], None, None, 1, None),
+        # Normally, paragraphs with the 'first-line-none' class would contain valid passage contents.
+        # In the GNV translation, this class name is specifically used for the blurb of notable chapter details.
+        (['p'], ['first-line-none'], ['GNV'], 1, None),
+        # Psalm interludes are to be preserved, as it would be the translation team's decision to omit these from
+        # the passage, as opposed to a code-level design decision. These are found as explicit interludes in
+        # translations such as NLT and CEB (span), NKJV (i) and HCSB (selah).
+        # Psalm interludes may or may not have a leading space, depending on the translation.
+        # In any case, always add one in so that the interlude doesn't meld into the passage contents.
+        # To account for double spaces, this relies on a regex replacement later on to convert down to a single space.
+        (['span'], ['selah'], None, 1, lambda text, attributes, markers: f' {text}'),
+        (['i'], ['selah'], None, 1, lambda text, attributes, markers: f' {text}'),
+        (['selah'], None, None, 1, lambda text, attributes, markers: f' {text}'),
+        # <br> tags will naturally be ignored when getting text
+        (['br'], None, None, 1, lambda text, attributes, markers: '\n'),
+        # The versenum tag appears in only a few translations such as NIVUK, and is difficult to handle because
+        # its child tags are usually decomposed before this point, but space padding seems to take its place.
+        # Interestingly, the tag itself has attributes that indicate what the actual passage number is, so this is
+        # extracted instead of the actual text content contained within the tag.
+        (['versenum'], None, ['NIVUK'], 1,
+         lambda text, attributes, markers: f'{markers["passage_separator"]}{common.superscript_numbers(attributes["id"])}'),
+        # Convert chapter numbers into new lines
+        (['span'], ['chapternum'], None, 1, lambda text, attributes, markers: markers['chapter_start']),
+        # Preserve superscript verse numbers by using their Unicode counterparts
+        # Add in the custom passage separator as well while access to the verse numbers is still available
+        (['sup'], ['versenum'], None, 1,
+         lambda text, attributes, markers: f'{markers["passage_separator"]}{common.superscript_numbers(text)}'),
+        # Some verses such as Nehemiah 7:30 - 42 store text in a <table> instead of <p>, which means
+        # spacing is not preserved when collecting the text. Therefore, a space is manually injected
+        # onto the end of the left cell's text to stop it from joining the right cell's text.
+        # TODO: If a verse with >2 columns is found, this WILL need to be updated to be more dynamic
+        (['td'], None, None, 2, lambda text, attributes, markers: f'{text} '),
+        # Preserve paragraph spacing by manually pre-pending a new line
+        # THIS MUST BE THE LAST RULE because doing this earlier interferes with other replacements
+        (['p'], None, None, 1, lambda text, attributes, markers: f'\n{text}'),
+    ]
+
+    # Rules used to correct the text contents of the parsed web page, for issues that can't be handled as part of the
+    # page clean up. Each rule is a tuple of the translations that the rule applies to, a regex pattern and its
+    # replacement.
+    __text_rules = [
+        # AMP has newlines directly follow the passage number & trailing space, particularly in Psalms.
+        # Bible Gateway support haven't specified a timeline for when this will be fixed, so it's handled here
+        # manually.
+        (['AMP'], '([⁰¹²³⁴⁵⁶⁷⁸⁹]+ +)\n', r'\1'),
+    ]
+
     def __init__(self, translation='NIV', show_passage_numbers=True, output_as_list=False,
-                 strip_excess_whitespace_from_list=False, use_ascii_punctuation=False, add_minimal_copyright=False):
+                 strip_excess_whitespace_from_list=False, use_ascii_punctuation=False, add_minimal_copyright=False,
+                 connection_pool=None, response_cache=None, passage_cache_size=0, max_chapters_per_request=10,
+                 max_passages_per_request=250, max_concurrent_requests=4, parser=None, engine='soup', rate_limiter=None,
+                 hedging_policy=None, base_url=None, single_flight=None, prefetch_policy=None):
         """
         :param translation: Translation code for the particular passage. For example, 'NIV', 'ESV', 'NLT'
         :type translation: str
@@ -36,15 +136,90 @@ class WebExtractor:
                                       separate string at the end of the list.
                                       Defaults to False.
         :type add_minimal_copyright: bool
+        :param connection_pool: Pool of persistent connections used to send web requests.
+                                Defaults to None, which uses the default pool shared by the current process.
+        :type connection_pool: ConnectionPool
+        :param response_cache: Persistent cache of downloaded pages, which avoids sending web requests for passages
+                               that have been retrieved before. Defaults to None, which doesn't cache any pages.
+        :type response_cache: ResponseCache
+        :param passage_cache_size: Maximum number of search results to keep in memory, so that repeated searches for
+                                   the same passage with the same output options are returned without sending a web
+                                   request or processing the page again. Defaults to 0, which disables this cache.
+        :type passage_cache_size: int
+        :param max_chapters_per_request: Maximum number of chapters retrieved by a single web request when getting
+                                         passages across multiple chapters. Consecutive chapters are combined into as
+                                         few requests as possible, which are then split back into chapters.
+                                         Defaults to 10. Set this to 1 to retrieve each chapter separately.
+        :type max_chapters_per_request: int
+        :param max_passages_per_request: Maximum number of passages that chapters are combined into, which should stay
+                                         under the number of passages that Bible Gateway returns for a single search.
+                                         Whole chapters are estimated to have as many passages as an average chapter.
+                                         Chapters left out of a page that was cut off anyway are retrieved using
+                                         further requests. Defaults to 250.
+        :type max_passages_per_request: int
+        :param max_concurrent_requests: Maximum number of web requests that can be in progress at the same time when
+                                        getting passages across multiple chapters. Defaults to 4.
+        :type max_concurrent_requests: int
+        :param parser: Name of the HTML parser used by Beautiful Soup to process downloaded pages, such as 'lxml',
+                       'html.parser' or 'html5lib'. The selected parser must be installed separately if it isn't
+                       built into Python. Defaults to None, which uses lxml if it is installed and falls back to
+                       html.parser otherwise. This is ignored when using the 'stream' engine.
+        :type parser: str
+        :param engine: Method used to extract the passage contents from downloaded pages. 'soup' parses each page
+                       into a document tree using Beautiful Soup before cleaning it up. 'stream' cleans up the passage
+                       contents as the page is being read, without building a document tree, which uses less CPU time
+                       and memory when retrieving many passages. The 'stream' engine reads pages in the same way
+                       as the html.parser parser, so its passage contents can differ from those of the 'soup' engine
+                       when another parser is used, including the default lxml parser. Defaults to 'soup'.
+        :type engine: str
+        :param rate_limiter: Limits the number of web requests sent per second, and pauses requests when the web
+                             server asks for them to be slowed down. Defaults to None, which doesn't limit requests.
+        :type rate_limiter: RateLimiter
+        :param hedging_policy: When specified, a duplicate web request is sent if a request is taking much longer than
+                               usual, and whichever request completes first is used. Defaults to None, which doesn't
+                               send any duplicate requests.
+        :type hedging_policy: HedgingPolicy
+        :param base_url: Base URL of the web server that search requests are sent to, such as a local stand-in server
+                         used for testing. Defaults to None, which uses the Bible Gateway site.
+        :type base_url: str
+        :param single_flight: When specified, a search made while an identical search (for the same page with the same
+                              output options) is already in progress in another thread waits for that search to
+                              finish and uses its result, instead of sending another web request. The same group can
+                              be shared by multiple extractors. Defaults to None, which runs every search separately.
+        :type single_flight: SingleFlight
+        :param prefetch_policy: When specified, the chapters next to each chapter retrieved using get_chapter are
+                                retrieved in the background and kept in the passage cache, so that reading through a
+                                book one chapter at a time doesn't wait for a web request on each chapter. The passage
+                                cache is enabled with enough room for these chapters if passage_cache_size is too
+                                small. Defaults to None, which doesn't retrieve any chapters in the background.
+        :type prefetch_policy: PrefetchPolicy
         """
+        if prefetch_policy is not None:
+            # Room is kept for the requested chapter and the chapters retrieved around it, including the chapters
+            # retrieved around the previously requested chapter
+            passage_cache_size = max(passage_cache_size,
+                                     2 * (prefetch_policy.next_chapters + prefetch_policy.previous_chapters + 1))
         self.translation = translation
         self.show_passage_numbers = show_passage_numbers
         self.output_as_list = output_as_list
         self.strip_excess_whitespace_from_list = strip_excess_whitespace_from_list
         self.use_ascii_punctuation = use_ascii_punctuation
         self.add_minimal_copyright = add_minimal_copyright
+        self.connection_pool = connection_pool
+        self.response_cache = response_cache
+        self.passage_cache = LRUCache(passage_cache_size) if passage_cache_size > 0 else None
+        self.max_chapters_per_request = max(1, max_chapters_per_request)
+        self.max_passages_per_request = max(1, max_passages_per_request)
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.parser = parser if parser else common.get_default_html_parser()
+        self.engine = engine
+        self.rate_limiter = rate_limiter
+        self.hedging_policy = hedging_policy
+        self.base_url = base_url if base_url else common.BIBLE_GATEWAY_URL
+        self.single_flight = single_flight
+        self.prefetch_policy = prefetch_policy
 
-    def get_passage(self, book, chapter, passage):
+    def get_passage(self, book, chapter, passage, deadline=None, cancellation_token=None):
         """
         Gets a single passage from the Bible Gateway site.
 
@@ -57,12 +232,18 @@ class WebExtractor:
         :type chapter: int
         :param passage: Passage number
         :type passage: int
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: The specified passage. Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        return self.get_passage_range(book, chapter, passage, chapter, passage)
+        return self.get_passage_range(book, chapter, passage, chapter, passage, deadline, cancellation_token)
 
-    def get_passages(self, book, chapter, passage_from, passage_to):
+    def get_passages(self, book, chapter, passage_from, passage_to, deadline=None, cancellation_token=None):
         """
         Gets a range of passages of the same chapter from the Bible Gateway site.
 
@@ -77,12 +258,18 @@ class WebExtractor:
         :type passage_from: int
         :param passage_to: Last passage number to get
         :type passage_to: int
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: The passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        return self.get_passage_range(book, chapter, passage_from, chapter, passage_to)
+        return self.get_passage_range(book, chapter, passage_from, chapter, passage_to, deadline, cancellation_token)
 
-    def get_chapter(self, book, chapter):
+    def get_chapter(self, book, chapter, deadline=None, cancellation_token=None):
         """
         Gets a single chapter from the Bible Gateway site.
 
@@ -92,12 +279,27 @@ class WebExtractor:
         :type book: str
         :param chapter: Chapter number
         :type chapter: int
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: All passages in the chapter. Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        return self.get_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter())
+        operation_token = get_operation_token(deadline, cancellation_token)
+        if self.prefetch_policy is None:
+            return self._get_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter(), operation_token)
+        options = self._get_parse_options()
+        # Waits for the chapter if it is still being retrieved in the background, after which it is in the cache
+        self.prefetch_policy.claim(self._get_chapter_cache_key(book, chapter, options), operation_token)
+        passages = self._get_passage_range(book, chapter, 1, chapter, common.get_end_of_chapter(), operation_token,
+                                           options)
+        self.__prefetch_adjacent_chapters(book, chapter, options)
+        return passages
 
-    def get_chapters(self, book, chapter_from, chapter_to):
+    def get_chapters(self, book, chapter_from, chapter_to, deadline=None, cancellation_token=None):
         """
         Gets a range of passages from a specified chapters selection from the Bible Gateway site.
 
@@ -109,24 +311,38 @@ class WebExtractor:
         :type chapter_from: int
         :param chapter_to: Last chapter number to get
         :type chapter_to: int
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: All passages between the specified chapters (inclusive). Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        return self.get_passage_range(book, chapter_from, 1, chapter_to, common.get_end_of_chapter())
+        return self.get_passage_range(book, chapter_from, 1, chapter_to, common.get_end_of_chapter(), deadline,
+                                      cancellation_token)
 
-    def get_book(self, book):
+    def get_book(self, book, deadline=None, cancellation_token=None):
         """
         Gets all chapters for a specific book from the Bible Gateway site.
 
         :param book: Name of the book (This must match the name used by the translation)
         :type book: str
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: All passages in the specified book. Empty string/list if the passage is invalid.
         :rtype: str or list
         """
         return self.get_passage_range(book, 1, 1, common.get_chapter_count(book, self.translation),
-                                      common.get_end_of_chapter())
+                                      common.get_end_of_chapter(), deadline, cancellation_token)
 
-    def get_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to):
+    def get_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, deadline=None,
+                          cancellation_token=None):
         """
         Gets a range of passages from one specific passage to another passage from the Bible Gateway site.
 
@@ -143,36 +359,241 @@ class WebExtractor:
         :type chapter_to: int
         :param passage_to: Last passage number to get in the last chapter
         :type passage_to: int
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: All passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
         :rtype: str or list
         """
-        # Capping the chapter and passage information, as this gets included in site search string and can cause
-        # the web request to stagger if this manages to be long enough.
-        capped_chapter_from = common.get_capped_integer(chapter_from,
-                                                        max_value=common.get_chapter_count(book, self.translation))
-        capped_passage_from = common.get_capped_integer(passage_from, max_value=common.get_end_of_chapter())
-        capped_chapter_to = common.get_capped_integer(chapter_to,
-                                                      max_value=common.get_chapter_count(book, self.translation))
-        capped_passage_to = common.get_capped_integer(passage_to, max_value=common.get_end_of_chapter())
-        # Defer to a direct search invocation when sourcing passages from the same chapter
-        if capped_chapter_from == capped_chapter_to:
-            return self.search(f'{book} {capped_chapter_from}:{capped_passage_from} - {capped_passage_to}')
-
-        # Get the partial section of the first chapter being requested, omitting some initial passages
-        initial_chapter = self.get_passages(book, capped_chapter_from, capped_passage_from, common.get_end_of_chapter())
-        # Get the partial section of the last chapter being requested, omitting some trailing passages
-        final_chapter = self.get_passages(book, capped_chapter_to, 1, capped_passage_to)
-        # Get all the chapters in between the initial and final chapters (exclusive since they have been pre-fetched).
-        # Sandwich those chapters between the first and last pre-fetched chapters to combine all the passage data.
-        chapters = [initial_chapter] + \
-                   [self.get_chapter(book, chapter)
-                    for chapter in range(capped_chapter_from + 1, capped_chapter_to)] + [final_chapter]
-        if self.output_as_list:
-            # Flattens the data structure from a list of lists to a normal list
-            return [chapter for chapter_list in chapters for chapter in chapter_list]
-        return '\n'.join(chapters)
+        return self._get_passage_range(book, chapter_from, passage_from, chapter_to, passage_to,
+                                       get_operation_token(deadline, cancellation_token))
 
-    def search_multiple(self, passage_names):
+    def _get_passage_range(self, book, chapter_from, passage_from, chapter_to, passage_to, cancellation_token=None,
+                           options=None):
+        """
+        A helper function to get a range of passages using a fixed set of output options, which allows callers to
+        change the output options of a single call without changing the output options of this extractor.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :param options: Output options used for this call only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: All passages between the specified passages (inclusive). Empty string/list if the passage is invalid.
+        :rtype: str or list
+        """
+        # The options are read once, so that the searches and the combined result all use the same options even if
+        # the output options of this extractor are changed by another thread in the meantime
+        options = options if options is not None else self._get_parse_options()
+        return self._combine_chapters(self._get_chapter_results(book, chapter_from, passage_from, chapter_to,
+                                                                passage_to, cancellation_token, options), options)
+
+    def iter_chapters(self, book, chapter_from, chapter_to, in_order=True, deadline=None, cancellation_token=None):
+        """
+        Yields the passages of a range of chapters from the Bible Gateway site, as each chapter is retrieved.
+
+        The chapter parameters will be automatically adjusted to the chapter boundaries of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the range.
+                         Defaults to True.
+        :type in_order: bool
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, starting from when
+                         iteration starts, after which it is stopped with a DeadlineExceededError.
+                         Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Generator of the passages between the specified chapters (inclusive)
+        :rtype: collections.abc.Iterator[PassageItem]
+        """
+        return self.iter_passages(book, chapter_from, 1, chapter_to, common.get_end_of_chapter(), in_order, deadline,
+                                  cancellation_token)
+
+    def iter_book(self, book, in_order=True, deadline=None, cancellation_token=None):
+        """
+        Yields the passages of a specific book from the Bible Gateway site, as each chapter is retrieved.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the book.
+                         Defaults to True.
+        :type in_order: bool
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, starting from when
+                         iteration starts, after which it is stopped with a DeadlineExceededError.
+                         Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Generator of the passages in the specified book
+        :rtype: collections.abc.Iterator[PassageItem]
+        """
+        return self.iter_passages(book, 1, 1, common.get_chapter_count(book, self.translation),
+                                  common.get_end_of_chapter(), in_order, deadline, cancellation_token)
+
+    def iter_passages(self, book, chapter_from, passage_from, chapter_to, passage_to, in_order=True, deadline=None,
+                      cancellation_token=None):
+        """
+        Yields a range of passages from one specific passage to another passage from the Bible Gateway site, as each
+        chapter is retrieved. Unlike get_passage_range, the passages of each chapter can be used straight away, and
+        only the chapters of the web requests in progress are kept in memory at any one time. Set
+        max_chapters_per_request to 1 to retrieve and yield one chapter at a time.
+
+        Each passage is yielded as a PassageItem, where the text of the passage uses the output options of this
+        extractor, except that passages are always split up and the minimal copyright text is never included.
+        Passages within a chapter are always yielded in order. Stopping the iteration early interrupts the web
+        requests that are still in progress.
+
+        Chapter and passage parameters will be automatically adjusted to the respective chapter and passage boundaries
+        of the specified book.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param in_order: If True, chapters are yielded in order. Otherwise, each chapter is yielded as soon as it is
+                         retrieved, and the sequence of each passage shows where its chapter belongs in the range.
+                         Defaults to True.
+        :type in_order: bool
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, starting from when
+                         iteration starts, after which it is stopped with a DeadlineExceededError.
+                         Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Generator of the passages between the specified passages (inclusive)
+        :rtype: collections.abc.Iterator[PassageItem]
+        """
+        chapter_requests = self._plan_chapter_requests(book, chapter_from, passage_from, chapter_to, passage_to)
+        first_chapter = chapter_requests[0][0][0]
+        first_passage = common.get_capped_integer(passage_from, max_value=common.get_end_of_chapter())
+        options = self._get_item_parse_options()
+        # The iteration has a token of its own, so that the web requests still in progress can be interrupted when the
+        # caller stops iterating, without cancelling the caller's token
+        iteration_token = CancellationToken(deadline, cancellation_token)
+        executor = ThreadPoolExecutor(max_workers=min(len(chapter_requests), self.max_concurrent_requests))
+        # Requests are submitted as earlier ones finish, so that only a limited number of results are held at once
+        futures = {}
+        next_request = 0
+        try:
+            while futures or next_request < len(chapter_requests):
+                while next_request < len(chapter_requests) and len(futures) < self.max_concurrent_requests:
+                    future = executor.submit(self.__get_chapter_request_results, book, chapter_requests[next_request],
+                                             iteration_token, options)
+                    futures[future] = next_request
+                    next_request += 1
+                if in_order:
+                    future = min(futures, key=futures.get)
+                else:
+                    future = next(iter(wait(futures, return_when=FIRST_COMPLETED)[0]))
+                request_index = futures.pop(future)
+                for (chapter, _, _), passages in zip(chapter_requests[request_index], future.result()):
+                    yield from self._get_passage_items(book, chapter,
+                                                       first_passage if chapter == first_chapter else 1, passages,
+                                                       chapter - first_chapter)
+        finally:
+            iteration_token.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __prefetch_adjacent_chapters(self, book, chapter, options):
+        """
+        A helper function to retrieve the chapters next to a chapter in the background, using the prefetch policy.
+        Chapters that are already in the passage cache are skipped.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter: Chapter number of the retrieved chapter
+        :type chapter: int
+        :param options: Output options used to retrieve the chapter, in the form returned by _get_parse_options
+        :type options: dict
+        """
+        capped_chapter = common.get_capped_integer(chapter, max_value=common.get_chapter_count(book, self.translation))
+        for adjacent_chapter in self.prefetch_policy.get_adjacent_chapters(book, capped_chapter, self.translation):
+            cache_key = self._get_chapter_cache_key(book, adjacent_chapter, options)
+            if cache_key in self.passage_cache:
+                continue
+            self.prefetch_policy.prefetch(cache_key, partial(self._get_passage_range, book, adjacent_chapter, 1,
+                                                             adjacent_chapter, common.get_end_of_chapter(),
+                                                             options=options))
+
+    def _get_chapter_cache_key(self, book, chapter, options=None):
+        """
+        A helper function to identify the search result of a whole chapter in the passage cache, which is the same
+        search result used by get_chapter.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter: Chapter number
+        :type chapter: int
+        :param options: Output options used for the search, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Cache key. None if the passage cache is disabled.
+        :rtype: tuple
+        """
+        chapter_request = self._plan_chapter_requests(book, chapter, 1, chapter, common.get_end_of_chapter())[0]
+        search = self._get_chapter_request_search(book, chapter_request)
+        return self._get_passage_cache_key(self._get_supported_translation(), search, False, options)
+
+    def get_passage_cache_stats(self):
+        """
+        Gets the usage statistics of the in-memory passage cache.
+
+        :return: Statistics with the keys 'hits', 'misses', 'evictions' and 'size'. All values are 0 if the passage
+                 cache is disabled.
+        :rtype: dict
+        """
+        if self.passage_cache is None:
+            return {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0}
+        return self.passage_cache.get_stats()
+
+    def invalidate_passage_cache(self, passage_name=None):
+        """
+        Removes search results from the in-memory passage cache.
+
+        :param passage_name: Name of the Bible passage to remove, which is matched regardless of letter casing and
+                             spacing. Defaults to None, which removes all search results.
+        :type passage_name: str
+        :return: Number of search results removed
+        :rtype: int
+        """
+        if self.passage_cache is None:
+            return 0
+        if passage_name is None:
+            return self.passage_cache.invalidate()
+        search_text = self.__normalise_search_text(passage_name)
+        return self.passage_cache.invalidate(lambda key: key[1] == search_text)
+
+    def search_multiple(self, passage_names, deadline=None, cancellation_token=None):
         """
         Retrieves a set of passages directly from the Bible Gateway site. Passages can be from different books.
         The language used for the search text is independent of the translation.
@@ -180,38 +601,244 @@ class WebExtractor:
 
         :param passage_names: List of Bible passages that are valid when used on www.biblegateway.com
         :type passage_names: list
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: Bible passages with newline separators for each set of passages
         :rtype: str or list
         """
-        return self.search(';'.join(passage_names))
+        return self.search(';'.join(passage_names), deadline, cancellation_token)
 
-    def search(self, passage_name):
+    def search(self, passage_name, deadline=None, cancellation_token=None):
         """
         Retrieves a specific passage directly from the Bible Gateway site.
         The language used for the search text is independent of the translation.
         Note that the output is subject to the Bible Gateway implicit passage limit when sending the web request.
+        The downloaded page is processed using parse_passage_html with the options of this extractor.
 
         :param passage_name: Name of the Bible passage which is valid when used on www.biblegateway.com
         :type passage_name: str
+        :param deadline: Number of seconds that retrieving the passages is allowed to take, after which it is stopped
+                         with a DeadlineExceededError. Defaults to None, which doesn't limit the time taken.
+        :type deadline: int or float
+        :param cancellation_token: Token used to stop retrieving the passages from another thread, which raises an
+                                   OperationCancelledError. Defaults to None.
+        :type cancellation_token: CancellationToken
         :return: Bible passage with preserved line breaks
         :rtype: str or list
         """
+        return self.__search(passage_name, False, get_operation_token(deadline, cancellation_token))
+
+    def __search(self, passage_name, split_chapters, cancellation_token=None, options=None):
+        """
+        A helper function that retrieves a specific passage directly from the Bible Gateway site.
+
+        :param passage_name: Name of the Bible passage which is valid when used on www.biblegateway.com
+        :type passage_name: str
+        :param split_chapters: If True, the result is split into chapters
+        :type split_chapters: bool
+        :param cancellation_token: Token used to stop the web request. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :param options: Output options used for this search only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Bible passage with preserved line breaks, or a list of these for each chapter if split_chapters
+                 is True
+        :rtype: str or list
+        """
+        translation = self._get_supported_translation()
+        options = options if options is not None else self._get_parse_options()
+        cache_key = self._get_passage_cache_key(translation, passage_name, split_chapters, options)
+        result = self._get_cached_search_result(cache_key)
+        if result is None:
+            source_site = self._get_search_url(passage_name)
+            get_search_result = partial(self.__get_search_result, source_site, split_chapters, cancellation_token,
+                                        options)
+            if self.single_flight is None:
+                result = get_search_result()
+            else:
+                # The result is shared with the other searches waiting for it, so each search gets its own copy
+                result = self._copy_search_result(
+                    self.single_flight.run(self._get_single_flight_key(source_site, split_chapters, options),
+                                           get_search_result, cancellation_token))
+            self._cache_search_result(cache_key, result)
+        return result
+
+    def __get_search_result(self, source_site, split_chapters, cancellation_token, options):
+        """
+        A helper function that downloads a search results page and extracts its passages.
+
+        :param source_site: URL of the search results page
+        :type source_site: str
+        :param split_chapters: If True, the result is split into chapters
+        :type split_chapters: bool
+        :param cancellation_token: Token used to stop the web request. None if it can't be stopped.
+        :type cancellation_token: CancellationToken
+        :param options: Output options, in the form returned by _get_parse_options
+        :type options: dict
+        :return: Bible passage with preserved line breaks, or a list of these for each chapter if split_chapters
+                 is True
+        :rtype: str or list
+        """
+        page = common.get_page(source_site, connection_pool=self.connection_pool, response_cache=self.response_cache,
+                               rate_limiter=self.rate_limiter, cancellation_token=cancellation_token,
+                               hedging_policy=self.hedging_policy)
+        return parse_passage_html(page, **options, split_chapters=split_chapters, source_site=source_site)
+
+    @staticmethod
+    def _get_single_flight_key(source_site, split_chapters, options):
+        """
+        A helper function to identify a search that can be shared with identical searches in progress.
+
+        :param source_site: URL of the search results page
+        :type source_site: str
+        :param split_chapters: True if the search result is split into chapters
+        :type split_chapters: bool
+        :param options: Output options used for the search, in the form returned by _get_parse_options
+        :type options: dict
+        :return: Key of the search
+        :rtype: tuple
+        """
+        return source_site, split_chapters, tuple(sorted(options.items()))
+
+    def _get_supported_translation(self):
+        """
+        A helper function to get the translation in the form used for processing search results.
+        Raises an error if the translation is not supported.
+
+        :return: Translation code in uppercase
+        :rtype: str
+        """
         # Some translations are very tricky to extract passages from, and currently, so specific extraction logic
         # for these translations should not be introduced until they need to be supported.
         translation = self.translation.upper()
         if common.is_unsupported_translation(translation):
             raise UnsupportedTranslationError(translation)
+        return translation
 
+    def _get_parse_options(self):
+        """
+        A helper function to get the options used to extract passages from a search results page, which are passed
+        to parse_passage_html.
+
+        :return: Keyword arguments for parse_passage_html, keyed on parameter name
+        :rtype: dict
+        """
+        return {'translation': self.translation, 'show_passage_numbers': self.show_passage_numbers,
+                'output_as_list': self.output_as_list,
+                'strip_excess_whitespace_from_list': self.strip_excess_whitespace_from_list,
+                'use_ascii_punctuation': self.use_ascii_punctuation,
+                'add_minimal_copyright': self.add_minimal_copyright, 'parser': self.parser, 'engine': self.engine}
+
+    def _get_search_url(self, passage_name):
+        """
+        A helper function to get the URL of the Bible Gateway page containing the results of a search.
+
+        :param passage_name: Name of the Bible passage which is valid when used on www.biblegateway.com
+        :type passage_name: str
+        :return: Page URL
+        :rtype: str
+        """
         # Use the printer-friendly view since there are fewer page elements to load and process
         source_site_params = urlencode({'version': self.translation, 'search': passage_name, 'interface': 'print'})
-        source_site = f'https://www.biblegateway.com/passage/?{source_site_params}'
-        soup = BeautifulSoup(common.get_page(source_site), 'html.parser')
+        return f'{self.base_url.rstrip("/")}/passage/?{source_site_params}'
 
-        # Don't collect contents from an invalid verse, since they do not exist.
-        # A fail-fast approach can be taken by checking for certain indicators of invalidity.
-        if not soup.find('div', {'class': 'passage-content'}):
-            raise InvalidSearchError(source_site)
+    def _get_passage_cache_key(self, translation, passage_name, split_chapters=False, options=None):
+        """
+        A helper function to identify a search result in the passage cache.
+
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param passage_name: Name of the Bible passage
+        :type passage_name: str
+        :param split_chapters: True if the search result is split into chapters. Defaults to False.
+        :type split_chapters: bool
+        :param options: Output options used for the search, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Cache key. None if the passage cache is disabled.
+        :rtype: tuple
+        """
+        if self.passage_cache is None:
+            return None
+        options = options if options is not None else self._get_parse_options()
+        # Search results depend on every output option, so all of them are included when identifying a result
+        return (translation, self.__normalise_search_text(passage_name), options['show_passage_numbers'],
+                options['output_as_list'], options['strip_excess_whitespace_from_list'],
+                options['use_ascii_punctuation'], options['add_minimal_copyright'], split_chapters)
+
+    def _get_cached_search_result(self, cache_key):
+        """
+        A helper function to get a search result from the passage cache.
 
+        :param cache_key: Key of the search result
+        :type cache_key: tuple
+        :return: A copy of the search result. None if it is not in the cache or the passage cache is disabled.
+        :rtype: str or list
+        """
+        if cache_key is None:
+            return None
+        # Lists are copied to prevent changes made by the caller from affecting the cached search result
+        return self._copy_search_result(self.passage_cache.get(cache_key))
+
+    def _cache_search_result(self, cache_key, result):
+        """
+        A helper function to add a search result to the passage cache.
+
+        :param cache_key: Key of the search result. None means that the passage cache is disabled.
+        :type cache_key: tuple
+        :param result: Search result
+        :type result: str or list
+        """
+        if cache_key is not None:
+            self.passage_cache.put(cache_key, self._copy_search_result(result))
+
+    def _copy_search_result(self, result):
+        """
+        A helper function to copy a search result, including any nested lists.
+
+        :param result: Search result
+        :type result: str or list
+        :return: Copy of the search result
+        :rtype: str or list
+        """
+        if isinstance(result, list):
+            return [self._copy_search_result(item) for item in result]
+        return result
+
+    @staticmethod
+    def __normalise_search_text(passage_name):
+        """
+        A helper function to convert a search string into a standard form, since Bible Gateway ignores letter casing
+        and the spacing around passage separators.
+
+        :param passage_name: Name of the Bible passage
+        :type passage_name: str
+        :return: Normalised search string
+        :rtype: str
+        """
+        return re.sub(r'\s*([-:;,])\s*', r'\1', ' '.join(passage_name.split())).lower()
+
+    def _parse_search_page(self, translation, page, source_site, split_chapters=False):
+        """
+        A helper function that extracts the passage contents from a Bible Gateway search results page.
+
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param page: Contents of the search results page
+        :type page: bytes or str
+        :param source_site: URL of the search results page
+        :type source_site: str
+        :param split_chapters: If True, the passage contents are split at the start of each chapter, and each chapter
+                               is processed as if it had been retrieved using a separate search. Defaults to False.
+        :type split_chapters: bool
+        :return: Bible passage with preserved line breaks. When split_chapters is True, this is a list containing the
+                 passage contents of each chapter instead.
+        :rtype: str or list
+        """
         # To get a list, the passage separator is given an actual practical use as an indicator of where to split
         # the string to create list elements.
         if self.output_as_list:
@@ -224,79 +851,20 @@ class WebExtractor:
         else:
             minimal_copyright_text = ''
 
-        # Compile the list of tags to remove from the parsed web page, corresponding to the following elements:
-        # h1
-        #    - Ignore passage display
-        # h2
-        #    - Ignore chapter headings
-        # h3
-        #    - Ignore section headings
-        # h4
-        #    - Ignore subsection headings, such as those in Ezekiel 40
-        # a with 'full-chap-link' class
-        #    - Ignore the "Read Full Chapter" text, which is carefully embedded within the passage
-        # sup with 'crossreference' class
-        #    - Ignore cross references
-        # sup with 'footnote' class
-        #    - Ignore in-line footnotes
-        # div with one of the 'footnotes', 'dropdowns', 'crossrefs', 'passage-other-trans' classes
-        #    - Ignore the footer area, which is composed of several main tags
-        # p with 'translation-note' class
-        #    - Ignore explicit translation notes in translations such as ESV
-        # crossref
-        #    - Ignore in-line references in translations such as WEB
-        removable_tags = soup.find_all(re.compile('^h1$|^h2$|^h3$|^h4$')) \
-            + soup.find_all('a', {'class': re.compile('^full-chap-link$|^bibleref$')}) \
-            + soup.find_all('sup', {'class': re.compile('^crossreference$|^footnote$')}) \
-            + soup.find_all('div', {
-                            'class': re.compile('^footnotes$|^dropdowns$|^crossrefs$|^passage-other-trans$')}) \
-            + soup.find_all('p', {'class': re.compile('^translation-note$')}) \
-            + soup.find_all('crossref')
-        # Normally, paragraphs with the 'first-line-none' class would contain valid passage contents.
-        # In the GNV translation, this class name is specifically used for the blurb of notable chapter details.
-        if translation == 'GNV':
-            removable_tags += soup.find_all('p', {'class': re.compile('^first-line-none$')})
-        [tag.decompose() for tag in removable_tags]
-
-        # Compile a list of ways Psalm interludes can be found. These are to be preserved, as it would be the
-        # translation team's decision to omit these from the passage, as opposed to a code-level design decision.
-        # span with 'selah' class
-        #    - Explicit Psalm interludes in the translations such as NLT and CEB
-        # i with 'selah' class
-        #    - Explicit Psalm interludes in the translations such as NKJV
-        # selah
-        #    - Explicit Psalm interludes in the translations such as HCSB
-        interludes = soup.find_all('span', {'class': 'selah'}) \
-            + soup.find_all('i', {'class': 'selah'}) \
-            + soup.find_all('selah')
-        # Psalm interludes may or may not have a leading space, depending on the translation.
-        # In any case, always add one in so that the interlude doesn't meld into the passage contents.
-        # To account for double spaces, this relies on a regex replacement later on to convert down to a single space.
-        [interlude.replace_with(f' {interlude.text}') for interlude in interludes]
-        # <br> tags will naturally be ignored when getting text
-        [br.replace_with('\n') for br in soup.find_all('br')]
-        # The versenum tag appears in only a few translations such as NIVUK, and is difficult to handle because
-        # its child tags are usually decomposed before this point, but space padding seems to take its place.
-        # Interestingly, the tag itself has attributes that indicate what the actual passage number is, so this is
-        # extracted instead of the actual text content contained within the tag.
-        if translation == 'NIVUK':
-            [versenum.replace_with(f'{passage_separator}{common.superscript_numbers(versenum.attrs["id"])}')
-                for versenum in soup.find_all('versenum')]
-        # Convert chapter numbers into new lines
-        [chapter_num.replace_with('\n') for chapter_num in soup.find_all('span', {'class': 'chapternum'})]
-        # Preserve superscript verse numbers by using their Unicode counterparts
-        # Add in the custom passage separator as well while access to the verse numbers is still available
-        [sup.replace_with(f'{passage_separator}{common.superscript_numbers(sup.text)}')
-         for sup in soup.find_all('sup', {'class': 'versenum'})]
-        # Some verses such as Nehemiah 7:30 - 42 store text in a <table> instead of <p>, which means
-        # spacing is not preserved when collecting the text. Therefore, a space is manually injected
-        # onto the end of the left cell's text to stop it from joining the right cell's text.
-        # Note: Python "double colon" syntax for lists is used to retrieve items at every N interval including 0.
-        # TODO: If a verse with >2 columns is found, this WILL need to be updated to be more dynamic
-        [td.replace_with(f'{td.text} ') for td in soup.find_all('td')[::2]]
-        # Preserve paragraph spacing by manually pre-pending a new line
-        # THIS MUST BE THE LAST PROCESSING STEP because doing this earlier interferes with other replacements
-        [p.replace_with(f'\n{p.text}') for p in soup.find_all('p')]
+        # When splitting the page into chapters, a marker is left behind to indicate where each chapter starts.
+        markers = {
+            'passage_separator': passage_separator,
+            'chapter_start': f'\n{self.__chapter_marker}' if split_chapters else '\n'
+        }
+        if self.engine == 'stream':
+            passage_texts = PassageContentParser(self.__cleanup_rules, translation, markers).parse(page)
+        else:
+            passage_texts = self.__get_passage_texts_from_soup(page, translation, markers)
+
+        # Don't collect contents from an invalid verse, since they do not exist.
+        # A fail-fast approach can be taken by checking for certain indicators of invalidity.
+        if not passage_texts:
+            raise InvalidSearchError(source_site)
 
         # Combine the text contents of all passage sections on the page.
         # Convert non-breaking spaces to normal spaces when retrieving the raw passage contents.
@@ -305,9 +873,126 @@ class WebExtractor:
         # Double square brackets are removed here, as they are mostly just indicators that the passages is only kept
         # due to convention with earlier translations. This replacement is done here, as it can sometimes have a
         # trailing space which can cause double spacing, which needs to be normalised.
-        raw_passage_text = '\n'.join([tag.text.replace('\xa0', ' ').strip() for tag in
-                                      soup.find_all('div', {'class': 'passage-content'})]) \
+        raw_passage_text = '\n'.join([text.replace('\xa0', ' ').strip() for text in passage_texts]) \
             .replace('[[', '').replace(']]', '')
+        if not split_chapters:
+            return self.__format_passage_text(translation, raw_passage_text, passage_separator, minimal_copyright_text)
+
+        chapter_texts = [chapter_text.strip() for chapter_text in raw_passage_text.split(self.__chapter_marker)]
+        # Searches that start at the beginning of a chapter have nothing before the first chapter marker
+        if len(chapter_texts) > 1 and not chapter_texts[0]:
+            chapter_texts.pop(0)
+        return [self.__format_passage_text(translation, chapter_text, passage_separator, minimal_copyright_text)
+                for chapter_text in chapter_texts]
+
+    def __get_passage_texts_from_soup(self, page, translation, markers):
+        """
+        A helper function that parses a search results page with Beautiful Soup, and gets the text contents of each
+        passage section after cleaning them up.
+
+        :param page: Contents of the search results page
+        :type page: bytes or str
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param markers: Text used by the rule actions, keyed on marker name
+        :type markers: dict
+        :return: Text contents of each passage section on the page, in the order they appear
+        :rtype: list
+        """
+        # Not all parsers support parsing only part of the page (such as html5lib), in which case the whole page is
+        # parsed instead. The passage contents are then searched for, so that the rest of the page is always ignored.
+        parse_only = self.__passage_content_strainer
+        if self.parser in self.__parsers_without_partial_parsing:
+            parse_only = None
+        soup = BeautifulSoup(page, self.parser, parse_only=parse_only)
+        passage_contents = soup.find_all('div', {'class': 'passage-content'})
+        self.__clean_up_page(passage_contents, translation, markers)
+        return [tag.text for tag in passage_contents]
+
+    def __clean_up_page(self, passage_contents, translation, markers):
+        """
+        A helper function that applies the clean up rules to the passage contents of a parsed web page.
+
+        The page is traversed once to find the tags matching each rule, after which each rule is applied in order.
+        This produces the same result as searching the page again for each rule after applying the previous rules,
+        as tags that have already been removed or replaced along with one of their ancestors are skipped.
+
+        :param passage_contents: Tags containing the passage contents, which are modified in place
+        :type passage_contents: list
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param markers: Text used by the rule actions, keyed on marker name
+        :type markers: dict
+        """
+        # Only the rules applicable to this translation are considered, and are looked up by tag name
+        rules_by_tag_name = {}
+        for rule_index, (tag_names, class_names, rule_translations, _, _) in enumerate(self.__cleanup_rules):
+            if rule_translations is None or translation in rule_translations:
+                rule_classes = set(class_names) if class_names is not None else None
+                [rules_by_tag_name.setdefault(tag_name, []).append((rule_index, rule_classes))
+                 for tag_name in tag_names]
+
+        matching_tags = [[] for _ in self.__cleanup_rules]
+        # The closest ancestor of each matching tag that also matches a rule, keyed on the ID of the matching tag.
+        # A tag is skipped if any of these ancestors have already been removed or replaced by the time its rule is
+        # applied, as searching the page again would not have found the tag at that point.
+        matching_ancestors = {}
+        # Passage sections contained within other passage sections are already traversed along with their ancestor
+        passage_content_ids = {id(passage_content) for passage_content in passage_contents}
+        outermost_passage_contents = [passage_content for passage_content in passage_contents
+                                      if all(id(parent) not in passage_content_ids
+                                             for parent in passage_content.parents)]
+        # Children are pushed onto the stack in reverse, so that tags are matched in the order they appear
+        stack = [(child, None) for passage_content in reversed(outermost_passage_contents)
+                 for child in reversed(passage_content.contents) if isinstance(child, Tag)]
+        while stack:
+            tag, matching_ancestor = stack.pop()
+            child_matching_ancestor = matching_ancestor
+            for rule_index, rule_classes in rules_by_tag_name.get(tag.name, []):
+                if rule_classes is None or not rule_classes.isdisjoint(tag.get('class', [])):
+                    matching_tags[rule_index].append(tag)
+                    matching_ancestors[id(tag)] = matching_ancestor
+                    child_matching_ancestor = tag
+                    break
+            # Removed tags are never searched again, so their contents don't need to be checked
+            if child_matching_ancestor is tag and self.__cleanup_rules[rule_index][4] is None:
+                continue
+            stack.extend((child, child_matching_ancestor) for child in reversed(tag.contents) if isinstance(child, Tag))
+
+        processed_tag_ids = set()
+        for (_, _, _, interval, action), tags in zip(self.__cleanup_rules, matching_tags):
+            index = 0
+            for tag in tags:
+                ancestor = matching_ancestors[id(tag)]
+                while ancestor is not None and id(ancestor) not in processed_tag_ids:
+                    ancestor = matching_ancestors[id(ancestor)]
+                if ancestor is not None:
+                    continue
+                if action is None:
+                    tag.decompose()
+                    processed_tag_ids.add(id(tag))
+                    continue
+                if index % interval == 0:
+                    tag.replace_with(action(tag.text, tag.attrs, markers))
+                    processed_tag_ids.add(id(tag))
+                index += 1
+
+    def __format_passage_text(self, translation, raw_passage_text, passage_separator, minimal_copyright_text):
+        """
+        A helper function that applies the output options to the text contents of a search results page.
+
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param raw_passage_text: Text contents of the passages
+        :type raw_passage_text: str
+        :param passage_separator: Text placed before each passage number, which is used to split the passages into a
+                                  list. Empty if the passages are not output as a list.
+        :type passage_separator: str
+        :param minimal_copyright_text: Copyright text to add to the end of the passages. Empty if not required.
+        :type minimal_copyright_text: str
+        :return: Bible passage with preserved line breaks
+        :rtype: str or list
+        """
         # To account for spaces between tags that end up blending into the passage contents, this regex replacement is
         # specifically used to remove that additional spacing, since it is part of the actual page layout.
         all_text = re.sub('([^ ]) {2,3}([^ ])', r'\1 \2', raw_passage_text)
@@ -317,10 +1002,10 @@ class WebExtractor:
         # when output_as_list is enabled.
         all_text = re.sub(fr'(\[)({passage_separator}[⁰¹²³⁴⁵⁶⁷⁸⁹]+ +)', r'\2\1', all_text)
 
-        # AMP has newlines directly follow the passage number & trailing space, particularly in Psalms.
-        # Bible Gateway support haven't specified a timeline for when this will be fixed, so it's handled here manually.
-        if translation == 'AMP':
-            all_text = re.sub('([⁰¹²³⁴⁵⁶⁷⁸⁹]+ +)\n', r'\1', all_text)
+        # Apply any translation-specific corrections
+        for rule_translations, pattern, replacement in self.__text_rules:
+            if translation in rule_translations:
+                all_text = re.sub(pattern, replacement, all_text)
 
         # Remove all superscript numbers if the passage numbers should be hidden
         if not self.show_passage_numbers:
@@ -366,3 +1051,315 @@ class WebExtractor:
         if self.strip_excess_whitespace_from_list:
             return [passage.strip() for passage in passage_list]
         return passage_list
+
+    def _get_chapter_results(self, book, chapter_from, passage_from, chapter_to, passage_to, cancellation_token=None,
+                             options=None):
+        """
+        A helper function to get a range of passages, with the passages of each chapter as a separate result.
+        Consecutive chapters are combined into as few web requests as possible, which are sent concurrently.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :param cancellation_token: Token used to stop the web requests, including those already in progress.
+                                   Defaults to None.
+        :type cancellation_token: CancellationToken
+        :param options: Output options used for these searches only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Search results for each chapter in the range, in order
+        :rtype: list
+        """
+        options = options if options is not None else self._get_parse_options()
+        chapter_requests = self._plan_chapter_requests(book, chapter_from, passage_from, chapter_to, passage_to)
+        if len(chapter_requests) == 1:
+            results = [self.__get_chapter_request_results(book, chapter_requests[0], cancellation_token, options)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chapter_requests), self.max_concurrent_requests)) as executor:
+                # Results are returned in the same order as the requests, regardless of which request finishes first
+                results = list(executor.map(lambda request: self.__get_chapter_request_results(book, request,
+                                                                                               cancellation_token,
+                                                                                               options),
+                                            chapter_requests))
+        return [chapter for result in results for chapter in result]
+
+    def __get_chapter_request_results(self, book, chapter_ranges, cancellation_token=None, options=None):
+        """
+        A helper function to get the search results of each chapter covered by a single web request.
+        If the page was cut off before the end of the last chapter, the chapters from where the page was cut off are
+        retrieved using further requests.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_ranges: Chapters covered by the request, as planned by _plan_chapter_requests
+        :type chapter_ranges: list
+        :param cancellation_token: Token used to stop the web requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :param options: Output options used for these searches only, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: Search results for each chapter, in order
+        :rtype: list
+        """
+        search = self._get_chapter_request_search(book, chapter_ranges)
+        if len(chapter_ranges) == 1:
+            return [self.__search(search, False, cancellation_token, options)]
+        chapters = self.__search(search, True, cancellation_token, options)
+        complete_chapters = self._get_complete_chapters(chapters, chapter_ranges)
+        if complete_chapters is None:
+            return [self.__search(self._get_chapter_request_search(book, [chapter_range]), False, cancellation_token,
+                                  options)
+                    for chapter_range in chapter_ranges]
+        if not complete_chapters:
+            # The page was cut off within the first chapter, which is retrieved on its own to make progress
+            complete_chapters = [self.__search(self._get_chapter_request_search(book, chapter_ranges[:1]), False,
+                                               cancellation_token, options)]
+        remaining_ranges = chapter_ranges[len(complete_chapters):]
+        if not remaining_ranges:
+            return complete_chapters
+        return complete_chapters + self.__get_chapter_request_results(book, remaining_ranges, cancellation_token,
+                                                                      options)
+
+    @staticmethod
+    def _get_complete_chapters(chapters, chapter_ranges):
+        """
+        A helper function to find the chapters of a web request covering multiple chapters which were returned in
+        full. Bible Gateway has an implicit limit on the amount of passages it returns, so a page can be cut off
+        before the end of the last chapter. The search of the request ends with the first passage of the chapter
+        after the last chapter, so every chapter followed by another chapter on the page is complete.
+
+        :param chapters: Search results for each chapter that was returned, including the following chapter
+        :type chapters: list
+        :param chapter_ranges: Chapters covered by the request, as planned by _plan_chapter_requests
+        :type chapter_ranges: list
+        :return: Search results of the complete chapters, in order. None if the page has more chapters than
+                 expected, in which case it couldn't be split into chapters correctly.
+        :rtype: list
+        """
+        if len(chapters) > len(chapter_ranges) + 1:
+            return None
+        return chapters[:min(len(chapters) - 1, len(chapter_ranges))]
+
+    def _get_item_parse_options(self):
+        """
+        A helper function to get the output options used to retrieve passages that are yielded as separate items.
+        Passages are always split up with their passage numbers, so that each passage can be numbered.
+
+        :return: Keyword arguments for parse_passage_html, keyed on parameter name
+        :rtype: dict
+        """
+        return {**self._get_parse_options(), 'show_passage_numbers': True, 'output_as_list': True,
+                'add_minimal_copyright': False}
+
+    def _get_passage_items(self, book, chapter, passage_from, passages, sequence):
+        """
+        A helper function to convert the passages of a chapter into separate items, which are numbered using the
+        passage number at the start of each passage. Passages without a passage number follow on from the previous
+        passage.
+
+        :param book: Name of the book
+        :type book: str
+        :param chapter: Chapter number
+        :type chapter: int
+        :param passage_from: First passage number in the list of passages
+        :type passage_from: int
+        :param passages: Passages of the chapter in order, retrieved using _get_item_parse_options
+        :type passages: list
+        :param sequence: Position of the chapter within the range being retrieved
+        :type sequence: int
+        :return: Passage items, in order
+        :rtype: list
+        """
+        items = []
+        passage_number = passage_from
+        for passage in passages:
+            leading_number = common.get_leading_passage_number(passage)
+            if leading_number is not None:
+                passage_number = leading_number
+            if not self.show_passage_numbers:
+                passage = common.remove_superscript_numbers_in_passage(passage)
+            elif passage_number == 1 and leading_number is None:
+                # The first passage of a chapter doesn't have a passage number on the page, so it is added here for
+                # consistency with the other passages
+                passage = f'¹ {passage}'
+            items.append(PassageItem(book, chapter, passage_number, passage, sequence))
+            passage_number += 1
+        return items
+
+    def _plan_chapter_requests(self, book, chapter_from, passage_from, chapter_to, passage_to):
+        """
+        A helper function to determine the web requests needed to retrieve a range of passages.
+        Consecutive chapters are combined into a single request, in the same way as _get_chapter_chunks.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_from: First chapter number to get
+        :type chapter_from: int
+        :param passage_from: First passage number to get in the first chapter
+        :type passage_from: int
+        :param chapter_to: Last chapter number to get
+        :type chapter_to: int
+        :param passage_to: Last passage number to get in the last chapter
+        :type passage_to: int
+        :return: Requests to send, in order. Each request is a list of the chapters it covers, where each chapter is a
+                 tuple containing the chapter number, the first passage number to get and the last passage number to
+                 get.
+        :rtype: list
+        """
+        # Capping the chapter and passage information, as this gets included in site search string and can cause
+        # the web request to stagger if this manages to be long enough.
+        capped_chapter_from = common.get_capped_integer(chapter_from,
+                                                        max_value=common.get_chapter_count(book, self.translation))
+        capped_passage_from = common.get_capped_integer(passage_from, max_value=common.get_end_of_chapter())
+        capped_chapter_to = common.get_capped_integer(chapter_to,
+                                                      max_value=common.get_chapter_count(book, self.translation))
+        capped_passage_to = common.get_capped_integer(passage_to, max_value=common.get_end_of_chapter())
+
+        # The first chapter being requested omits some initial passages, and the last chapter being requested omits
+        # some trailing passages. All the chapters in between are retrieved in full.
+        chapter_ranges = [(chapter, 1, common.get_end_of_chapter())
+                          for chapter in range(capped_chapter_from, capped_chapter_to + 1)]
+        if not chapter_ranges:
+            # An inverted chapter range is still searched for, although it is expected to fail as an invalid search
+            chapter_ranges = [(capped_chapter_from, capped_passage_from, capped_passage_to)]
+        chapter_ranges[0] = (chapter_ranges[0][0], capped_passage_from, chapter_ranges[0][2])
+        chapter_ranges[-1] = (chapter_ranges[-1][0], chapter_ranges[-1][1], capped_passage_to)
+        return self._get_chapter_chunks(book, chapter_ranges)
+
+    def _get_chapter_chunks(self, book, chapter_ranges):
+        """
+        A helper function to split consecutive chapters into the chunks retrieved by each web request.
+        Each chunk stays within the maximum number of chapters and passages per request, where whole chapters are
+        estimated to have as many passages as an average chapter. A chapter that isn't followed by another chapter in
+        the book, or which ends partway through, is retrieved on its own, since there is no way to tell whether a
+        combined page was cut off partway through it.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_ranges: Consecutive chapters to get, in order. Each chapter is a tuple containing the chapter
+                               number, the first passage number to get and the last passage number to get.
+        :type chapter_ranges: list
+        :return: Chunks of chapters, in order. Each chunk is a list of chapters in the same format as chapter_ranges.
+        :rtype: list
+        """
+        chapter_count = common.get_chapter_count(book, self.translation)
+        chunks = []
+        chunk = []
+        chunk_passages = 0
+        for chapter, chapter_passage_from, chapter_passage_to in chapter_ranges:
+            if chapter_passage_to >= common.get_end_of_chapter():
+                passage_count = max(1, common.get_average_passages_per_chapter() - chapter_passage_from + 1)
+            else:
+                passage_count = max(1, chapter_passage_to - chapter_passage_from + 1)
+            is_cut_off_detectable = chapter_passage_to >= common.get_end_of_chapter() and chapter < chapter_count
+            # The first passage of the following chapter is also part of a combined request
+            if chunk and (len(chunk) >= self.max_chapters_per_request or not is_cut_off_detectable or
+                          chunk_passages + passage_count + 1 > self.max_passages_per_request):
+                chunks.append(chunk)
+                chunk = []
+                chunk_passages = 0
+            chunk.append((chapter, chapter_passage_from, chapter_passage_to))
+            chunk_passages += passage_count
+            if not is_cut_off_detectable:
+                chunks.append(chunk)
+                chunk = []
+                chunk_passages = 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _get_chapter_request_search(book, chapter_ranges):
+        """
+        A helper function to determine the search string of a web request covering one or more chapters.
+        A request covering multiple chapters also searches for the first passage of the following chapter, which is
+        only on the page if the page wasn't cut off before the end of the last chapter.
+
+        :param book: Name of the book (This must match the name used by the translation)
+        :type book: str
+        :param chapter_ranges: Chapters covered by the request, as planned by _plan_chapter_requests
+        :type chapter_ranges: list
+        :return: Search string
+        :rtype: str
+        """
+        first_chapter, first_passage, last_passage = chapter_ranges[0]
+        if len(chapter_ranges) == 1:
+            return f'{book} {first_chapter}:{first_passage} - {last_passage}'
+        return f'{book} {first_chapter}:{first_passage} - {chapter_ranges[-1][0] + 1}:1'
+
+    def _combine_chapters(self, chapters, options=None):
+        """
+        A helper function to combine the search results of consecutive chapters into a single result.
+
+        :param chapters: Search results for each chapter, in order
+        :type chapters: list
+        :param options: Output options used to get the search results, in the form returned by _get_parse_options.
+                        Defaults to None, which uses the output options of this extractor.
+        :type options: dict
+        :return: All passages in the chapters
+        :rtype: str or list
+        """
+        options = options if options is not None else self._get_parse_options()
+        if options['output_as_list']:
+            # Flattens the data structure from a list of lists to a normal list
+            return [chapter for chapter_list in chapters for chapter in chapter_list]
+        return '\n'.join(chapters)
+
+
+def parse_passage_html(page, translation='NIV', show_passage_numbers=True, output_as_list=False,
+                       strip_excess_whitespace_from_list=False, use_ascii_punctuation=False, add_minimal_copyright=False,
+                       parser=None, engine='soup', split_chapters=False, source_site=None):
+    """
+    Extracts the passage contents from a Bible Gateway search results page (using the printer-friendly view), without
+    sending any web requests. This produces the same output as WebExtractor.search when given the page that it would
+    have downloaded, so pages can be retrieved and processed separately, such as processing pages in other processes
+    or processing pages that were saved earlier.
+
+    :param page: Contents of the search results page
+    :type page: bytes or str
+    :param translation: Translation code of the page. For example, 'NIV', 'ESV', 'NLT'
+    :type translation: str
+    :param show_passage_numbers: If True, any present passage numbers are preserved. Defaults to True.
+    :type show_passage_numbers: bool
+    :param output_as_list: When True, returns the passage data as a list of strings. Defaults to False.
+    :type output_as_list: bool
+    :param strip_excess_whitespace_from_list: When True and output_as_list is also True, leading and trailing
+                                              whitespace characters are removed for each string element in the list.
+                                              Defaults to False.
+    :type strip_excess_whitespace_from_list: bool
+    :param use_ascii_punctuation: When True, converts all Unicode punctuation characters into their ASCII
+                                  counterparts. This also applies to passage separators. Defaults to False.
+    :type use_ascii_punctuation: bool
+    :param add_minimal_copyright: If True, includes additional text that follows recommendations from the Bible
+                                  Gateway Terms of Use Agreement when quoting passages for non-commercial use.
+                                  Defaults to False.
+    :type add_minimal_copyright: bool
+    :param parser: Name of the HTML parser used by Beautiful Soup to process the page. Defaults to None, which uses
+                   lxml if it is installed and falls back to html.parser otherwise.
+    :type parser: str
+    :param engine: Method used to extract the passage contents, which is either 'soup' or 'stream'.
+                   Defaults to 'soup'.
+    :type engine: str
+    :param split_chapters: If True, the passage contents are split at the start of each chapter, and each chapter
+                           is processed as if it had been retrieved using a separate search. Defaults to False.
+    :type split_chapters: bool
+    :param source_site: URL of the search results page, which is only used when reporting an invalid search.
+                        Defaults to None.
+    :type source_site: str
+    :return: Bible passage with preserved line breaks. When split_chapters is True, this is a list containing the
+             passage contents of each chapter instead.
+    :rtype: str or list
+    """
+    bible = WebExtractor(translation=translation, show_passage_numbers=show_passage_numbers,
+                         output_as_list=output_as_list,
+                         strip_excess_whitespace_from_list=strip_excess_whitespace_from_list,
+                         use_ascii_punctuation=use_ascii_punctuation, add_minimal_copyright=add_minimal_copyright,
+                         parser=parser, engine=engine)
+    return bible._parse_search_page(bible._get_supported_translation(), page, source_site, split_chapters)
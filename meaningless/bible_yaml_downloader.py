@@ -9,7 +9,9 @@ class YAMLDownloader(BaseDownloader):
     """
 
     def __init__(self, translation='NIV', show_passage_numbers=True, default_directory=os.getcwd(),
-                 strip_excess_whitespace=False, enable_multiprocessing=True, use_ascii_punctuation=False):
+                 strip_excess_whitespace=False, enable_multiprocessing=True, use_ascii_punctuation=False,
+                 **kwargs):
         super().__init__(yaml_file_interface.write, translation, show_passage_numbers, default_directory,
                          strip_excess_whitespace, enable_multiprocessing, use_ascii_punctuation,
-                         file_extension='.yaml', write_key_as_string=False)
+                         file_extension='.yaml', write_key_as_string=False,
+                         file_reading_function=yaml_file_interface.read, **kwargs)
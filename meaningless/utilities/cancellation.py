@@ -0,0 +1,186 @@
+import threading
+import weakref
+from time import time
+from meaningless.utilities.exceptions import OperationCancelledError, DeadlineExceededError
+
+# This is a collection of helper methods and classes used to stop long-running operations, either on request or once
+# they have taken too long.
+
+
+class CancellationToken:
+    """
+    A thread-safe handle used to stop an operation, either by cancelling it or once its deadline has passed.
+    Operations check the token between steps, and web requests in progress are interrupted as soon as the token is
+    cancelled.
+
+    Tokens can be sent to other processes, where they keep the same deadline and whether they have already been
+    cancelled. Cancelling a token afterwards only affects the process it was cancelled in, so the Downloaders stop
+    their worker processes directly when their token is cancelled.
+    """
+
+    def __init__(self, timeout=None, parent=None):
+        """
+        :param timeout: Number of seconds until the deadline of the operation. Defaults to None, which only stops
+                        the operation once the token is cancelled.
+        :type timeout: int or float
+        :param parent: When specified, this token is also cancelled when the parent token is cancelled, and its
+                       deadline is no later than the deadline of the parent token. Defaults to None.
+        :type parent: CancellationToken
+        """
+        self.deadline = time() + max(0, timeout) if timeout is not None else None
+        if parent is not None and parent.deadline is not None:
+            self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+        self.__initialise_state()
+        if parent is not None:
+            parent.__add_child(self)
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the token.
+        """
+        self.__lock = threading.Lock()
+        self.__cancelled = threading.Event()
+        self.__callbacks = []
+        self.__children = weakref.WeakSet()
+
+    def __getstate__(self):
+        """
+        Sends the deadline and cancellation status of the token to another process.
+        """
+        return {'deadline': self.deadline, 'is_cancelled': self.__cancelled.is_set()}
+
+    def __setstate__(self, state):
+        """
+        Restores the token received from another process.
+        """
+        self.deadline = state['deadline']
+        self.__initialise_state()
+        if state['is_cancelled']:
+            self.__cancelled.set()
+
+    @property
+    def is_cancelled(self):
+        """
+        True if the token has been cancelled, or if its deadline has passed.
+        """
+        return self.__cancelled.is_set() or (self.deadline is not None and time() >= self.deadline)
+
+    def cancel(self):
+        """
+        Cancels the token, as well as any tokens created with this token as their parent.
+        Web requests in progress that were sent using these tokens are interrupted.
+        """
+        with self.__lock:
+            if self.__cancelled.is_set():
+                return
+            self.__cancelled.set()
+            callbacks = list(self.__callbacks)
+            children = list(self.__children)
+        [callback() for callback in callbacks]
+        [child.cancel() for child in children]
+
+    def raise_if_cancelled(self):
+        """
+        Raises an OperationCancelledError if the token has been cancelled, or a DeadlineExceededError if its
+        deadline has passed.
+        """
+        if self.__cancelled.is_set():
+            raise OperationCancelledError()
+        if self.deadline is not None and time() >= self.deadline:
+            raise DeadlineExceededError()
+
+    def get_remaining_time(self):
+        """
+        Gets the amount of time left before the deadline.
+
+        :return: Number of seconds until the deadline. None if the token doesn't have a deadline.
+        :rtype: float
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time())
+
+    def get_timeout(self, timeout):
+        """
+        Limits a timeout so that it doesn't extend past the deadline.
+
+        :param timeout: Number of seconds to wait. None means waiting indefinitely.
+        :type timeout: int or float
+        :return: The smaller of the timeout and the time left before the deadline
+        :rtype: int or float
+        """
+        remaining_time = self.get_remaining_time()
+        if remaining_time is None:
+            return timeout
+        return remaining_time if timeout is None else min(timeout, remaining_time)
+
+    def sleep(self, seconds):
+        """
+        Waits for a number of seconds, stopping early with an error if the token is cancelled or the deadline passes.
+
+        :param seconds: Number of seconds to wait
+        :type seconds: int or float
+        """
+        self.__cancelled.wait(self.get_timeout(max(0, seconds)))
+        self.raise_if_cancelled()
+
+    def add_callback(self, callback):
+        """
+        Registers a function to run when the token is cancelled. The function runs straight away if the token has
+        already been cancelled.
+
+        :param callback: Function that doesn't take any arguments
+        :type callback: callable[[], None]
+        """
+        with self.__lock:
+            if not self.__cancelled.is_set():
+                self.__callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        """
+        Unregisters a function that was registered using add_callback. Nothing happens if it isn't registered.
+
+        :param callback: Function to unregister
+        :type callback: callable[[], None]
+        """
+        with self.__lock:
+            if callback in self.__callbacks:
+                self.__callbacks.remove(callback)
+
+    def __add_child(self, child):
+        """
+        A helper function to cancel another token whenever this token is cancelled.
+
+        :param child: Token to cancel along with this token
+        :type child: CancellationToken
+        """
+        with self.__lock:
+            if not self.__cancelled.is_set():
+                self.__children.add(child)
+                return
+        child.cancel()
+
+
+def get_operation_token(deadline=None, cancellation_token=None):
+    """
+    A helper function to get the token used to stop a single operation, based on the options given to it.
+
+    :param deadline: Number of seconds that the operation is allowed to take. None means there is no time limit.
+    :type deadline: int or float
+    :param cancellation_token: Token that can be used to cancel the operation. None means it can't be cancelled.
+    :type cancellation_token: CancellationToken
+    :return: Token for the operation. None if the operation doesn't need to be stopped.
+    :rtype: CancellationToken
+
+    >>> get_operation_token() is None
+    True
+    >>> get_operation_token(deadline=5).get_remaining_time() > 4
+    True
+    """
+    if deadline is None and cancellation_token is None:
+        return None
+    if deadline is None:
+        return cancellation_token
+    return CancellationToken(deadline, cancellation_token)
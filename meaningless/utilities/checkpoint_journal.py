@@ -0,0 +1,174 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from time import time
+
+# This is a collection of helper methods and classes used to record the chapters of a download as they are retrieved,
+# so that a download which fails partway through can be resumed without retrieving those chapters again.
+
+
+class CheckpointJournal:
+    """
+    A journal of retrieved chapters stored in a SQLite database, which is safe to share between threads and processes.
+    Chapters are stored under a download key, which identifies the parameters of the download that retrieved them.
+    Each chapter is committed as soon as it is recorded, so recorded chapters are kept even if the program stops
+    before the download finishes.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Directory containing the journal database. This is created if it doesn't already exist.
+        :type directory: str
+        """
+        self.directory = directory
+        self.database_path = os.path.join(directory, 'checkpoint_journal.sqlite3')
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the journal.
+        """
+        self.__local = threading.local()
+        self.__stats_lock = threading.Lock()
+        self.__stats = {'recorded_chapters': 0, 'restored_chapters': 0, 'removed_downloads': 0}
+
+    def __getstate__(self):
+        """
+        Sends the journal configuration to another process, rather than its database connections.
+        """
+        return {'directory': self.directory, 'database_path': self.database_path}
+
+    def __setstate__(self, state):
+        """
+        Restores the journal configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def record(self, download_key, chapters):
+        """
+        Records retrieved chapters of a download, replacing any chapters with the same number recorded before.
+
+        :param download_key: Identifies the download
+        :type download_key: str
+        :param chapters: Passages of each chapter, keyed on chapter number. The passages of each chapter are keyed on
+                         passage number.
+        :type chapters: dict
+        """
+        now = time()
+        # The passages are stored as pairs rather than an object, so that integer passage keys are preserved
+        rows = [(download_key, int(chapter), json.dumps(list(passages.items()), ensure_ascii=False), now)
+                for chapter, passages in chapters.items()]
+        connection = self.__get_connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('INSERT OR REPLACE INTO chapters (download, chapter, passages, recorded_at) '
+                                   'VALUES (?, ?, ?, ?)', rows)
+        self.__increment_stat('recorded_chapters', len(rows))
+
+    def get_chapters(self, download_key):
+        """
+        Gets the chapters recorded for a download.
+
+        :param download_key: Identifies the download
+        :type download_key: str
+        :return: Passages of each recorded chapter, keyed on chapter number in ascending order
+        :rtype: dict
+        """
+        rows = self.__get_connection().execute('SELECT chapter, passages FROM chapters WHERE download = ? '
+                                               'ORDER BY chapter', (download_key,)).fetchall()
+        self.__increment_stat('restored_chapters', len(rows))
+        return {chapter: dict(json.loads(passages)) for chapter, passages in rows}
+
+    def remove(self, download_key=None):
+        """
+        Removes recorded chapters from the journal, which is done once a download has finished.
+
+        :param download_key: Identifies the download to remove. Defaults to None, which removes all downloads.
+        :type download_key: str
+        """
+        connection = self.__get_connection()
+        with connection:
+            if download_key is None:
+                connection.execute('DELETE FROM chapters')
+            else:
+                connection.execute('DELETE FROM chapters WHERE download = ?', (download_key,))
+        self.__increment_stat('removed_downloads')
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the journal in the current process, as well as the overall journal contents.
+
+        :return: A copy of the statistics, with the following keys:
+                 'recorded_chapters' = Number of chapters recorded,
+                 'restored_chapters' = Number of recorded chapters retrieved from the journal,
+                 'removed_downloads' = Number of times downloads were removed from the journal,
+                 'downloads' = Number of downloads that currently have recorded chapters,
+                 'chapters' = Number of chapters currently recorded
+        :rtype: dict
+        """
+        with self.__stats_lock:
+            stats = dict(self.__stats)
+        stats['downloads'], stats['chapters'] = self.__get_connection().execute(
+            'SELECT COUNT(DISTINCT download), COUNT(*) FROM chapters').fetchone()
+        return stats
+
+    def __increment_stat(self, stat, amount=1):
+        """
+        A helper function to increase one of the usage statistics.
+
+        :param stat: Name of the statistic
+        :type stat: str
+        :param amount: Amount to increase the statistic by
+        :type amount: int
+        """
+        with self.__stats_lock:
+            self.__stats[stat] += amount
+
+    def __get_connection(self):
+        """
+        A helper function to get the database connection for the current thread, creating it if necessary.
+        SQLite connections can't be shared between threads or processes, so each one gets its own connection.
+
+        :return: Database connection
+        :rtype: sqlite3.Connection
+        """
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory, exist_ok=True)
+            # Explicit transactions are used instead of the implicit ones managed by the sqlite3 module
+            connection = sqlite3.connect(self.database_path, timeout=60, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS chapters (download TEXT, chapter INTEGER, passages TEXT, '
+                               'recorded_at REAL, PRIMARY KEY (download, chapter))')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+
+def get_download_key(parameters):
+    """
+    A helper function to identify a download by its parameters, so that a download is only resumed by another
+    download with exactly the same parameters.
+
+    :param parameters: Parameters of the download, which must be able to be converted to JSON
+    :type parameters: dict
+    :return: Download key
+    :rtype: str
+
+    >>> key = get_download_key({'book': 'Ruth', 'translation': 'NIV'})
+    >>> key == get_download_key({'translation': 'NIV', 'book': 'Ruth'})
+    True
+    >>> key == get_download_key({'book': 'Ruth', 'translation': 'ESV'})
+    False
+    """
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+if __name__ == "__main__":
+    # Run this section when run as a standalone script. Don't run this part when being imported.
+    import doctest
+    doctest.testmod(verbose=True)
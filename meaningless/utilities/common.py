@@ -1,10 +1,29 @@
-from urllib.request import urlopen
-from urllib.error import URLError
+from urllib.error import URLError, HTTPError
 from time import sleep
+from random import uniform
+from functools import partial
+from importlib.util import find_spec
+from urllib.parse import urlsplit, urlunsplit
+import gzip
 import re
+import zlib
+from bs4 import UnicodeDammit
+from meaningless.utilities.connection_pool import get_default_pool
+from meaningless.utilities.rate_limiter import parse_retry_after
+from meaningless.utilities.fixture_store import get_default_fixture_store, REPLAY_MODE
 
 # This is a collection of helper methods used across the various modules.
 
+# Response status codes where the web server asks for requests to be slowed down, and may say when to try again
+THROTTLED_STATUS_CODES = {429, 503}
+# Maximum number of seconds to honour from a Retry-After header
+MAX_RETRY_AFTER = 300
+
+BIBLE_GATEWAY_URL = 'https://www.biblegateway.com'
+'''
+The base URL of the Bible Gateway site, which is used by default when retrieving passages.
+'''
+
 MEANINGLESS_VERSION = '1.3.0'
 '''
 The current version of the Meaningless library.
@@ -72,6 +91,34 @@ def get_end_of_chapter():
     return 9000
 
 
+def get_average_passages_per_chapter():
+    """
+    A helper function to define the average number of passages in a chapter, which is used to estimate the size of
+    chapters before they are retrieved. This is based on the 31,102 passages across the 1,189 chapters of most
+    translations.
+
+    :return: A static number
+    :rtype: int
+    """
+    return 26
+
+
+def get_default_html_parser():
+    """
+    A helper function to get the fastest HTML parser available to Beautiful Soup.
+    The lxml parser is used if it is installed, otherwise this falls back to the built-in Python HTML parser.
+
+    :return: Name of the HTML parser
+    :rtype: str
+
+    >>> get_default_html_parser() in ['lxml', 'html.parser']
+    True
+    """
+    if find_spec('lxml') is not None:
+        return 'lxml'
+    return 'html.parser'
+
+
 def get_chapter_count(book, translation='NIV'):
     """
     A helper function to return the number of chapters in a given book for a particular translation.
@@ -111,21 +158,55 @@ def get_chapter_count(book, translation='NIV'):
     return 0
 
 
-def get_page(url, retry_count=3, retry_delay=2):
+def get_page(url, retry_count=3, retry_delay=2, connection_pool=None, response_cache=None, rate_limiter=None,
+             cancellation_token=None, hedging_policy=None, fixture_store=None, base_url=None):
     """
     A helper function that returns the contents of a web page.
+    Requests are sent through a pool of persistent connections, so that subsequent requests to the same host
+    can skip the connection setup. Compressed responses are requested, and are decompressed and then decoded using the
+    character set specified by the web server.
+    Failed requests are retried after a randomised delay, so that many concurrent requests don't all retry at once.
+    If the web server responds with a 429 or 503 status, its Retry-After header is honoured when present.
 
     :param url: Page URL to obtain
     :type url: str
     :param retry_count: Number of attempts to resend the request if it fails after the first try
     :type retry_count: int
-    :param retry_delay: Number of seconds to wait before retrying a request. This increases after every retry.
+    :param retry_delay: Maximum number of seconds to wait before retrying a request. This increases after every retry.
     :type retry_delay: int
+    :param connection_pool: Connection pool used to send the request.
+                            Defaults to None, which uses the default pool of the current process.
+    :type connection_pool: ConnectionPool
+    :param response_cache: When specified, pages are served from this cache when possible, and downloaded pages are
+                           stored in it (encoded as UTF-8). Expired pages are revalidated with the web server using
+                           their ETag or Last-Modified headers, so that unchanged pages are not downloaded again.
+                           Defaults to None, which always downloads the page.
+    :type response_cache: ResponseCache
+    :param rate_limiter: When specified, requests wait until they are allowed by this rate limiter, and a Retry-After
+                         header pauses all requests using it. Pages served from the response cache are not limited.
+                         Defaults to None, which sends requests as soon as possible.
+    :type rate_limiter: RateLimiter
+    :param cancellation_token: When specified, the request (including any retries) is stopped with an
+                               OperationCancelledError once the token is cancelled or its deadline passes.
+                               Defaults to None.
+    :type cancellation_token: CancellationToken
+    :param hedging_policy: When specified, a duplicate request is sent if a request is taking longer than usual, and
+                           whichever request completes first is used. Defaults to None, which only sends one request
+                           at a time.
+    :type hedging_policy: HedgingPolicy
+    :param fixture_store: When specified in record mode, every page obtained is also saved to this store. In replay
+                          mode, pages are served from this store without sending any web requests. Defaults to None,
+                          which uses the default fixture store set by environment variables, if any.
+    :type fixture_store: FixtureStore
+    :param base_url: When specified, the scheme and host of the URL are replaced with those of this base URL, such as
+                     to send the request to a local stand-in server instead. Defaults to None, which uses the URL as
+                     it is.
+    :type base_url: str
     :return: Page contents. Raises an error if the web page could not be loaded for any reason.
     :rtype: str
 
     >>> get_page('https://www.biblegateway.com')
-    b'<!DOCTYPE html>...'
+    '<!DOCTYPE html>...'
     >>> get_page('https://www.randomwebsite.com', retry_count=0)
     Traceback (most recent call last):
     ...
@@ -135,23 +216,188 @@ def get_page(url, retry_count=3, retry_delay=2):
     ...
     urllib.error.HTTPError: HTTP Error 404: Not Found
     """
+    if base_url:
+        url = replace_base_url(url, base_url)
+    store = fixture_store if fixture_store is not None else get_default_fixture_store()
+    if store is not None and store.mode == REPLAY_MODE:
+        return store.replay(url)
+    try:
+        text = _download_page(url, retry_count, retry_delay, connection_pool, response_cache, rate_limiter,
+                              cancellation_token, hedging_policy)
+    except HTTPError as exception:
+        # Pages that don't exist are recorded as well, but throttled requests are not, as they are only temporary
+        if store is not None and exception.code not in THROTTLED_STATUS_CODES:
+            store.record(url, None, exception.code)
+        raise exception
+    if store is not None:
+        store.record(url, text)
+    return text
+
+
+def _download_page(url, retry_count, retry_delay, connection_pool, response_cache, rate_limiter, cancellation_token,
+                   hedging_policy):
+    """
+    A helper function that downloads the contents of a web page, using the options given to get_page.
+
+    :param url: Page URL to obtain
+    :type url: str
+    :param retry_count: Number of attempts to resend the request if it fails after the first try
+    :type retry_count: int
+    :param retry_delay: Maximum number of seconds to wait before retrying a request
+    :type retry_delay: int
+    :param connection_pool: Connection pool used to send the request. None means the default pool.
+    :type connection_pool: ConnectionPool
+    :param response_cache: Cache used to serve and store pages. None means pages are not cached.
+    :type response_cache: ResponseCache
+    :param rate_limiter: Rate limiter that requests wait for. None means requests are not limited.
+    :type rate_limiter: RateLimiter
+    :param cancellation_token: Token used to stop the request. None means it can't be stopped.
+    :type cancellation_token: CancellationToken
+    :param hedging_policy: Policy used to send duplicate requests. None means that requests are not hedged.
+    :type hedging_policy: HedgingPolicy
+    :return: Page contents
+    :rtype: str
+    """
     # Cap the values to ensure the function isn't suspended for an eternity, but still attempts at least once
     retries = get_capped_integer(retry_count, 0, 10)
     delay = get_capped_integer(retry_delay, 0, 30)
     delay_multiplier = 2
+    pool = connection_pool if connection_pool is not None else get_default_pool()
+
+    if cancellation_token is not None:
+        cancellation_token.raise_if_cancelled()
+    cached_response = None
+    request_headers = {'Accept-Encoding': 'gzip, deflate'}
+    if response_cache is not None:
+        cached_response = response_cache.get(url)
+        if cached_response is not None:
+            if not cached_response.is_expired:
+                return decode_page(cached_response.body, 'utf-8')
+            # Ask the web server to only send the page if it has changed since it was stored
+            if cached_response.etag:
+                request_headers['If-None-Match'] = cached_response.etag
+            if cached_response.last_modified:
+                request_headers['If-Modified-Since'] = cached_response.last_modified
+
     # The extra addition to the range end is to account for the initial request
     for retry in range(0, retries + 1):
         try:
-            with urlopen(url) as response:
-                return response.read()
+            if rate_limiter is not None:
+                rate_limiter.acquire(cancellation_token)
+            if hedging_policy is not None:
+                response = hedging_policy.run(partial(pool.request, url, headers=request_headers), cancellation_token,
+                                              rate_limiter)
+            else:
+                response = pool.request(url, headers=request_headers, cancellation_token=cancellation_token)
+            if response.status == 304 and cached_response is not None:
+                response_cache.revalidate(url)
+                return decode_page(cached_response.body, 'utf-8')
+            body = decompress_page(response.body, response.headers.get('Content-Encoding'))
+            text = decode_page(body, response.headers.get_content_charset())
+            if response_cache is not None:
+                response_cache.store(url, text.encode('utf-8'), response.headers.get('ETag'),
+                                     response.headers.get('Last-Modified'))
+            return text
         except URLError as exception:
             if retry < retries:
-                sleep(delay)
+                # Wait for a random part of the delay, so that requests which failed together don't retry together
+                retry_after = uniform(delay / 2, delay)
                 delay *= delay_multiplier
+                if isinstance(exception, HTTPError) and exception.code in THROTTLED_STATUS_CODES:
+                    server_retry_after = parse_retry_after(exception.headers.get('Retry-After'))
+                    if server_retry_after is not None:
+                        retry_after = max(retry_after, min(server_retry_after, MAX_RETRY_AFTER))
+                    if rate_limiter is not None:
+                        # Every request sharing the rate limiter is held back, not just this one
+                        rate_limiter.pause(retry_after)
+                        continue
+                if cancellation_token is not None:
+                    cancellation_token.sleep(retry_after)
+                else:
+                    sleep(retry_after)
                 continue
             raise exception
 
 
+def replace_base_url(url, base_url):
+    """
+    A helper function to send a URL to a different web server, by replacing its scheme and host with those of a base
+    URL. Any path in the base URL is prepended to the path of the URL.
+
+    :param url: URL to change
+    :type url: str
+    :param base_url: Base URL of the web server, such as 'http://127.0.0.1:8080'
+    :type base_url: str
+    :return: URL on the web server
+    :rtype: str
+
+    >>> replace_base_url('https://www.biblegateway.com/passage/?search=Psalm+3', 'http://127.0.0.1:8080')
+    'http://127.0.0.1:8080/passage/?search=Psalm+3'
+    >>> replace_base_url('https://www.biblegateway.com/passage/?search=Psalm+3', 'http://localhost/gateway/')
+    'http://localhost/gateway/passage/?search=Psalm+3'
+    """
+    scheme, host, path, query, fragment = urlsplit(url)
+    base_scheme, base_host, base_path, _, _ = urlsplit(base_url)
+    return urlunsplit((base_scheme, base_host, base_path.rstrip('/') + path, query, fragment))
+
+
+def decompress_page(body, content_encoding):
+    """
+    A helper function that decompresses the body of a web response.
+
+    :param body: Response body
+    :type body: bytes
+    :param content_encoding: Value of the Content-Encoding response header. None if it was not provided.
+    :type content_encoding: str
+    :return: Decompressed response body
+    :rtype: bytes
+
+    >>> decompress_page(gzip.compress(b'<html></html>'), 'gzip')
+    b'<html></html>'
+    >>> decompress_page(zlib.compress(b'<html></html>'), 'deflate')
+    b'<html></html>'
+    >>> decompress_page(b'<html></html>', None)
+    b'<html></html>'
+    """
+    encoding = (content_encoding or '').strip().lower()
+    if encoding in ['gzip', 'x-gzip']:
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some web servers send raw deflate data, without the zlib header and checksum
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def decode_page(body, charset=None):
+    """
+    A helper function that converts the body of a web response into text.
+
+    :param body: Response body
+    :type body: bytes
+    :param charset: Character set specified in the Content-Type response header. None if it was not provided.
+    :type charset: str
+    :return: Page contents
+    :rtype: str
+
+    >>> decode_page('<p>“Meaningless!”</p>'.encode('utf-8'), 'utf-8')
+    '<p>“Meaningless!”</p>'
+    >>> decode_page('<p>Éclésiaste</p>'.encode('iso-8859-1'), 'iso-8859-1')
+    '<p>Éclésiaste</p>'
+    >>> decode_page('<meta charset="utf-8"><p>“Meaningless!”</p>'.encode('utf-8'))
+    '<meta charset="utf-8"><p>“Meaningless!”</p>'
+    """
+    if charset:
+        try:
+            return body.decode(charset)
+        except (LookupError, UnicodeDecodeError):
+            pass
+    # The character set is only detected from the page contents when the web server doesn't provide a valid one
+    return UnicodeDammit(body, is_html=True).unicode_markup
+
+
 def superscript_numbers(text, remove_brackets=True):
     """
     A helper function that converts a string's numeric characters into their superscript Unicode variations
@@ -197,6 +443,25 @@ def remove_superscript_numbers_in_passage(text):
     return re.sub(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]+\s?', '', text)
 
 
+def get_leading_passage_number(text):
+    """
+    A helper function to get the superscript passage number at the start of a passage.
+
+    :param text: Passage text
+    :type text: str
+    :return: Passage number. None if the passage doesn't start with a superscript number.
+    :rtype: int
+
+    >>> get_leading_passage_number('¹⁷ Then I applied myself')
+    17
+    >>> get_leading_passage_number('In the beginning')
+    """
+    match = re.match(r'\s*([⁰¹²³⁴⁵⁶⁷⁸⁹]+)', text)
+    if match is None:
+        return None
+    return int(match.group(1).translate(str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')))
+
+
 def get_capped_integer(number, min_value=1, max_value=100):
     """
     A helper function to limit an integer between an upper and lower bound
@@ -377,6 +642,7 @@ def get_bible_data_for_language(language, mode=0):
     :param mode: Numeric value corresponding to a specific data set. Defaults to 0.
                  0 = All information
                  1 = New Testament only
+                 2 = Old Testament only
     :type mode: int
     :return: Dictionary containing Bible data relating to a particular supported language
     :rtype: dict
@@ -385,6 +651,8 @@ def get_bible_data_for_language(language, mode=0):
     {'Language': 'English', 'Books': {...'Ruth': 4...}
     >>> get_bible_data_for_language('English', mode=1)
     {'Language': 'English', 'Books': {'Matthew': 28...}
+    >>> get_bible_data_for_language('English', mode=2)
+    {'Language': 'English', 'Books': {'Genesis': 50...'Malachi': 4}}
     >>> get_bible_data_for_language('Español')
     {'Language': 'Español', 'Books': {...'Rut': 4...}
     >>> get_bible_data_for_language('Saiyan')
@@ -545,6 +813,8 @@ def get_bible_data_for_language(language, mode=0):
     if bible_language in bible_book_mapping.keys():
         if mode == 1:
             bible_books = bible_book_mapping[bible_language]['NT']
+        elif mode == 2:
+            bible_books = bible_book_mapping[bible_language]['OT']
         else:
             # Default to all information when the mode doesn't match one of the preset data sets
             bible_books = {**bible_book_mapping[bible_language]['OT'], **bible_book_mapping[bible_language]['NT']}
@@ -0,0 +1,400 @@
+import os
+import socket
+import threading
+import uuid
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from time import monotonic
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit, urljoin
+from urllib.request import __version__ as urllib_version
+
+# This is a collection of helper methods and classes used to reuse HTTP connections across multiple web requests.
+
+# Pools that have been reconstructed in this process after being sent from another process, keyed on the pool ID.
+# This allows every task received by a worker process to share the same set of open connections, rather than creating
+# a brand new pool each time the owning object is unpickled.
+_process_pools = {}
+_process_pools_lock = threading.RLock()
+_default_pool = None
+_default_pool_pid = None
+
+
+class PooledResponse:
+    """
+    A fully read HTTP response that was obtained through a connection pool
+    """
+
+    def __init__(self, url, status, reason, headers, body):
+        """
+        :param url: The URL which the response was obtained from, after following any redirects
+        :type url: str
+        :param status: HTTP status code
+        :type status: int
+        :param reason: HTTP reason phrase
+        :type reason: str
+        :param headers: Response headers
+        :type headers: http.client.HTTPMessage
+        :param body: Response body
+        :type body: bytes
+        """
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of persistent (keep-alive) HTTP connections, which avoids paying for a new TCP and TLS handshake
+    on every web request sent to the same host.
+
+    Instances can be passed to other processes, such as those in a multiprocessing pool. Each process lazily opens its
+    own connections, since sockets cannot be shared between processes, but all tasks received by the same process
+    reuse those connections.
+    """
+
+    def __init__(self, max_connections_per_host=6, idle_timeout=30, max_redirects=5, connect_timeout=10,
+                 read_timeout=30):
+        """
+        :param max_connections_per_host: Maximum number of connections that can be open to a single host at any time.
+                                         Requests are blocked until a connection is available once this is reached.
+                                         Defaults to 6.
+        :type max_connections_per_host: int
+        :param idle_timeout: Number of seconds an unused connection is kept open before it is discarded.
+                             Defaults to 30.
+        :type idle_timeout: int or float
+        :param max_redirects: Maximum number of redirects to follow for a single request. Defaults to 5.
+        :type max_redirects: int
+        :param connect_timeout: Number of seconds to wait for a new connection to be established. None means waiting
+                                indefinitely. Defaults to 10.
+        :type connect_timeout: int or float
+        :param read_timeout: Number of seconds to wait for each socket read to complete, which stops a stalled
+                             connection from blocking a request forever. None means waiting indefinitely.
+                             Defaults to 30.
+        :type read_timeout: int or float
+        """
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.idle_timeout = idle_timeout
+        self.max_redirects = max_redirects
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_id = uuid.uuid4().hex
+        self.__lock = threading.Condition()
+        # Idle connections are stored as a list of (connection, time_of_last_use) pairs for each host
+        self.__idle_connections = {}
+        self.__active_count = {}
+        self.__stats = {'requests': 0, 'new_connections': 0, 'reuses': 0, 'idle_evictions': 0}
+
+    def __reduce__(self):
+        """
+        Sends the pool configuration to another process, rather than its open connections.
+        """
+        return _restore_pool, (self.pool_id, self.max_connections_per_host, self.idle_timeout, self.max_redirects,
+                               self.connect_timeout, self.read_timeout)
+
+    def request(self, url, headers=None, timeout=None, cancellation_token=None):
+        """
+        Sends a GET request using a pooled connection, following any redirects.
+
+        :param url: Page URL to obtain
+        :type url: str
+        :param headers: Additional request headers
+        :type headers: dict
+        :param timeout: Number of seconds to wait for the connection and for each socket read to complete.
+                        Defaults to None, which uses the connect and read timeouts of the pool.
+        :type timeout: int or float
+        :param cancellation_token: When specified, the request is interrupted as soon as the token is cancelled, and
+                                   doesn't wait past the deadline of the token. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: The fully read response. Raises a HTTPError for error status codes, or a URLError for failures
+                 relating to the connection itself. Raises an OperationCancelledError if the request was stopped by
+                 the cancellation token.
+        :rtype: PooledResponse
+        """
+        current_url = url
+        for redirect in range(0, self.max_redirects + 1):
+            connect_timeout = timeout if timeout is not None else self.connect_timeout
+            read_timeout = timeout if timeout is not None else self.read_timeout
+            if cancellation_token is not None:
+                cancellation_token.raise_if_cancelled()
+                connect_timeout = cancellation_token.get_timeout(connect_timeout)
+                read_timeout = cancellation_token.get_timeout(read_timeout)
+            response = self.__send(current_url, headers, connect_timeout, read_timeout, cancellation_token)
+            location = response.headers.get('Location')
+            if response.status in (301, 302, 303, 307, 308) and location and redirect < self.max_redirects:
+                current_url = urljoin(current_url, location)
+                continue
+            if response.status >= 400:
+                raise HTTPError(current_url, response.status, response.reason, response.headers, None)
+            return response
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the pool in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'requests' = Number of requests sent,
+                 'new_connections' = Number of connections that have been opened,
+                 'reuses' = Number of requests sent through an already open connection,
+                 'idle_evictions' = Number of connections closed after being unused for longer than the idle timeout,
+                 'idle_connections' = Number of connections currently open and waiting to be reused
+        :rtype: dict
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['idle_connections'] = sum([len(idle) for idle in self.__idle_connections.values()])
+        return stats
+
+    def clear(self):
+        """
+        Closes all idle connections in the pool. Connections that are currently in use are unaffected.
+        """
+        with self.__lock:
+            connections = [connection for idle in self.__idle_connections.values() for connection, _ in idle]
+            self.__idle_connections = {}
+        [connection.close() for connection in connections]
+
+    def __send(self, url, headers, connect_timeout, read_timeout, cancellation_token):
+        """
+        A helper function that sends a single request without following redirects.
+
+        :param url: Page URL to obtain
+        :type url: str
+        :param headers: Additional request headers
+        :type headers: dict
+        :param connect_timeout: Number of seconds to wait for a new connection to be established
+        :type connect_timeout: int or float
+        :param read_timeout: Number of seconds to wait for each socket read to complete
+        :type read_timeout: int or float
+        :param cancellation_token: Token which interrupts the request when cancelled. None if it can't be cancelled.
+        :type cancellation_token: CancellationToken
+        :return: The fully read response
+        :rtype: PooledResponse
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise URLError(f'unknown url type: {url}')
+        host_key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        # Mimic the default headers of urlopen, since some sites treat unrecognised clients differently
+        request_headers = {'User-Agent': f'Python-urllib/{urllib_version}'}
+        request_headers.update(headers or {})
+
+        connection, is_reused = self.__acquire(host_key, connect_timeout, cancellation_token)
+        # Shutting down the socket wakes up any blocked reads, which is how a cancelled request is interrupted
+        active_connections = [connection]
+        interrupt = lambda: _shutdown_connection(active_connections[-1])
+        if cancellation_token is not None:
+            cancellation_token.add_callback(interrupt)
+        try:
+            try:
+                response = self.__send_through_connection(connection, path, request_headers, connect_timeout,
+                                                           read_timeout)
+            except (HTTPException, ConnectionError) as exception:
+                if not is_reused or (cancellation_token is not None and cancellation_token.is_cancelled):
+                    raise exception
+                # The server may have closed a kept-alive connection without this side noticing, which is only
+                # discovered upon trying to use it again. Retrying once with a fresh connection handles this.
+                connection.close()
+                connection = self.__create_connection(host_key, connect_timeout)
+                active_connections.append(connection)
+                response = self.__send_through_connection(connection, path, request_headers, connect_timeout,
+                                                           read_timeout)
+        except (HTTPException, OSError) as exception:
+            connection.close()
+            self.__release(host_key, None)
+            if cancellation_token is not None:
+                # Failures caused by the token are reported as such, rather than as a connection failure
+                cancellation_token.raise_if_cancelled()
+            if isinstance(exception, URLError):
+                raise exception
+            raise URLError(exception)
+        finally:
+            if cancellation_token is not None:
+                cancellation_token.remove_callback(interrupt)
+
+        if response.will_close:
+            connection.close()
+            self.__release(host_key, None)
+        else:
+            self.__release(host_key, connection)
+        return PooledResponse(url, response.status, response.reason, response.headers, response.body)
+
+    @staticmethod
+    def __send_through_connection(connection, path, headers, connect_timeout, read_timeout):
+        """
+        A helper function that sends a request through a specific connection and reads the entire response body,
+        which is required before the connection can be reused.
+
+        :param connection: Connection to use
+        :type connection: http.client.HTTPConnection
+        :param path: Request path, including the query string
+        :type path: str
+        :param headers: Request headers
+        :type headers: dict
+        :param connect_timeout: Number of seconds to wait for the connection to be established, if it isn't already
+        :type connect_timeout: int or float
+        :param read_timeout: Number of seconds to wait for each socket read to complete
+        :type read_timeout: int or float
+        :return: The response object, with its body stored in the 'body' attribute
+        :rtype: http.client.HTTPResponse
+        """
+        if connection.sock is None:
+            connection.timeout = connect_timeout
+            connection.connect()
+        connection.timeout = read_timeout
+        connection.sock.settimeout(read_timeout)
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.body = response.read()
+        return response
+
+    def __acquire(self, host_key, timeout, cancellation_token):
+        """
+        A helper function to obtain a connection to a host, blocking if the host is at its connection limit.
+
+        :param host_key: Tuple of the scheme, host name and port
+        :type host_key: tuple
+        :param timeout: Connection timeout used when a new connection is created
+        :type timeout: int or float
+        :param cancellation_token: Token which stops the wait for a connection when cancelled. None if it can't be
+                                   cancelled.
+        :type cancellation_token: CancellationToken
+        :return: A tuple of the connection and whether it was previously used
+        :rtype: tuple
+        """
+        with self.__lock:
+            self.__stats['requests'] += 1
+            while True:
+                self.__evict_idle_connections()
+                idle = self.__idle_connections.get(host_key, [])
+                if idle:
+                    # Prefer the most recently used connection, as it is the least likely to have been closed remotely
+                    connection, _ = idle.pop()
+                    self.__active_count[host_key] = self.__active_count.get(host_key, 0) + 1
+                    self.__stats['reuses'] += 1
+                    return connection, True
+                if self.__active_count.get(host_key, 0) < self.max_connections_per_host:
+                    self.__active_count[host_key] = self.__active_count.get(host_key, 0) + 1
+                    break
+                if cancellation_token is None:
+                    self.__lock.wait()
+                    continue
+                # Cancelling the token doesn't wake up this thread, so the token is checked periodically instead
+                self.__lock.wait(cancellation_token.get_timeout(0.1))
+                cancellation_token.raise_if_cancelled()
+        return self.__create_connection(host_key, timeout), False
+
+    def __create_connection(self, host_key, timeout):
+        """
+        A helper function to create a new connection. The actual socket is opened when the first request is sent.
+
+        :param host_key: Tuple of the scheme, host name and port
+        :type host_key: tuple
+        :param timeout: Connection timeout
+        :type timeout: int or float
+        :return: A new connection
+        :rtype: http.client.HTTPConnection
+        """
+        scheme, host, port = host_key
+        with self.__lock:
+            self.__stats['new_connections'] += 1
+        if scheme == 'https':
+            return HTTPSConnection(host, port, timeout=timeout)
+        return HTTPConnection(host, port, timeout=timeout)
+
+    def __release(self, host_key, connection):
+        """
+        A helper function to return a connection to the pool once a request has been completed.
+
+        :param host_key: Tuple of the scheme, host name and port
+        :type host_key: tuple
+        :param connection: Connection to keep open for reuse. None means that the connection was closed.
+        :type connection: http.client.HTTPConnection or None
+        """
+        with self.__lock:
+            self.__active_count[host_key] -= 1
+            if connection is not None:
+                self.__idle_connections.setdefault(host_key, []).append((connection, monotonic()))
+            self.__lock.notify()
+
+    def __evict_idle_connections(self):
+        """
+        A helper function to close connections which have not been used within the idle timeout.
+        This is expected to be called while the pool lock is held.
+        """
+        expiry = monotonic() - self.idle_timeout
+        for host_key, idle in self.__idle_connections.items():
+            expired = [connection for connection, last_used in idle if last_used < expiry]
+            if expired:
+                self.__idle_connections[host_key] = [(connection, last_used) for connection, last_used in idle
+                                                     if last_used >= expiry]
+                self.__stats['idle_evictions'] += len(expired)
+                [connection.close() for connection in expired]
+
+
+def _shutdown_connection(connection):
+    """
+    A helper function to stop any further use of a connection's socket, including reads that are in progress in
+    another thread. The connection itself still needs to be closed afterwards.
+
+    :param connection: Connection to shut down
+    :type connection: http.client.HTTPConnection
+    """
+    sock = connection.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _restore_pool(pool_id, max_connections_per_host, idle_timeout, max_redirects, connect_timeout=10,
+                  read_timeout=30):
+    """
+    A helper function to obtain a pool that was sent from another process.
+    The same pool object is returned for every request with the same pool ID within a process.
+
+    :param pool_id: Unique identifier of the original pool
+    :type pool_id: str
+    :param max_connections_per_host: Maximum number of connections that can be open to a single host at any time
+    :type max_connections_per_host: int
+    :param idle_timeout: Number of seconds an unused connection is kept open before it is discarded
+    :type idle_timeout: int or float
+    :param max_redirects: Maximum number of redirects to follow for a single request
+    :type max_redirects: int
+    :param connect_timeout: Number of seconds to wait for a new connection to be established
+    :type connect_timeout: int or float
+    :param read_timeout: Number of seconds to wait for each socket read to complete
+    :type read_timeout: int or float
+    :return: Connection pool belonging to the current process
+    :rtype: ConnectionPool
+    """
+    with _process_pools_lock:
+        pool = _process_pools.get((os.getpid(), pool_id))
+        if pool is None:
+            pool = ConnectionPool(max_connections_per_host, idle_timeout, max_redirects, connect_timeout, read_timeout)
+            pool.pool_id = pool_id
+            _process_pools[(os.getpid(), pool_id)] = pool
+        return pool
+
+
+def get_default_pool():
+    """
+    Gets the connection pool shared by all web requests that don't specify a pool.
+    A separate default pool is created for each process.
+
+    :return: Default connection pool for the current process
+    :rtype: ConnectionPool
+    """
+    global _default_pool, _default_pool_pid
+    with _process_pools_lock:
+        # Connections inherited from a parent process (e.g. when forking) must not be reused,
+        # as both processes would be reading from the same socket.
+        if _default_pool is None or _default_pool_pid != os.getpid():
+            _default_pool = ConnectionPool()
+            _default_pool_pid = os.getpid()
+        return _default_pool
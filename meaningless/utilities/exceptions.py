@@ -87,3 +87,43 @@ class TranslationMismatchError(BaseError):
             f'but attempted to read a file in the {file_translation} translation')
         self.extractor_translation = extractor_translation
         self.file_translation = file_translation
+
+
+class OperationCancelledError(BaseError):
+    """
+    An exception thrown when an operation is stopped using a cancellation token
+    """
+
+    def __init__(self, message='The operation was cancelled'):
+        """
+        :param message: Description of why the operation was stopped
+        :type message: str
+        """
+        super(OperationCancelledError, self).__init__(message)
+
+
+class DeadlineExceededError(OperationCancelledError):
+    """
+    An exception thrown when an operation is stopped because it did not finish before its deadline
+    """
+
+    def __init__(self, message='The operation did not finish before its deadline'):
+        """
+        :param message: Description of why the operation was stopped
+        :type message: str
+        """
+        super(DeadlineExceededError, self).__init__(message)
+
+
+class MissingFixtureError(BaseError):
+    """
+    An exception thrown when replaying web responses from a fixture store, and the requested page was never recorded
+    """
+
+    def __init__(self, url):
+        """
+        :param url: The URL which has no recorded response
+        :type url: str
+        """
+        super(MissingFixtureError, self).__init__(f'No response has been recorded for {url}')
+        self.url = url
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+import zlib
+from http import HTTPStatus
+from time import time
+from urllib.error import HTTPError
+from meaningless.utilities.exceptions import MissingFixtureError
+from meaningless.utilities.response_cache import normalise_url
+
+# This is a collection of helper methods and classes used to record web responses, and replay them later on without
+# any network access. This allows passages to be retrieved reproducibly, such as when running tests or benchmarks.
+
+RECORD_MODE = 'record'
+REPLAY_MODE = 'replay'
+FIXTURE_MODE_VARIABLE = 'MEANINGLESS_FIXTURE_MODE'
+'''
+Name of the environment variable which sets the mode of the default fixture store, which is either 'record' or
+'replay'.
+'''
+FIXTURE_PATH_VARIABLE = 'MEANINGLESS_FIXTURE_PATH'
+'''
+Name of the environment variable which sets the database path of the default fixture store.
+'''
+
+_default_store = None
+_default_store_key = None
+_default_store_lock = threading.Lock()
+
+
+class FixtureStore:
+    """
+    A store of recorded web responses kept in a single SQLite database, which is safe to share between threads and
+    processes. Responses are keyed on their normalised URL and stored compressed.
+
+    In record mode, every page retrieved using common.get_page is saved to the store. In replay mode, pages are
+    served from the store instead of sending web requests, and pages which were never recorded raise an error.
+    """
+
+    def __init__(self, path, mode=REPLAY_MODE):
+        """
+        :param path: Path of the database file. Its directory is created if it doesn't already exist.
+        :type path: str
+        :param mode: 'record' to save retrieved pages, or 'replay' to serve pages without any network access.
+                     Defaults to 'replay'.
+        :type mode: str
+        """
+        if mode not in (RECORD_MODE, REPLAY_MODE):
+            raise ValueError(f'{mode} is not a valid fixture store mode')
+        self.path = path
+        self.mode = mode
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the store.
+        """
+        self.__local = threading.local()
+        self.__stats_lock = threading.Lock()
+        self.__stats = {'recorded': 0, 'replayed': 0, 'missing': 0}
+
+    def __getstate__(self):
+        """
+        Sends the store configuration to another process, rather than its database connections.
+        """
+        return {'path': self.path, 'mode': self.mode}
+
+    def __setstate__(self, state):
+        """
+        Restores the store configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def record(self, url, text, status=200):
+        """
+        Saves a web response, replacing any response previously recorded for the same page.
+
+        :param url: Page URL
+        :type url: str
+        :param text: Page contents. None if the response was an error.
+        :type text: str
+        :param status: HTTP status code of the response. Defaults to 200.
+        :type status: int
+        """
+        body = zlib.compress(text.encode('utf-8'), 9) if text is not None else None
+        connection = self.__get_connection()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO responses (url, status, body, recorded_at) VALUES (?, ?, ?, ?)',
+                               (normalise_url(url), status, body, time()))
+        self.__increment_stat('recorded')
+
+    def replay(self, url):
+        """
+        Gets a recorded web response.
+
+        :param url: Page URL
+        :type url: str
+        :return: Page contents. Raises a HTTPError if an error response was recorded, or a MissingFixtureError if the
+                 page was never recorded.
+        :rtype: str
+        """
+        row = self.__get_connection().execute('SELECT status, body FROM responses WHERE url = ?',
+                                              (normalise_url(url),)).fetchone()
+        if row is None:
+            self.__increment_stat('missing')
+            raise MissingFixtureError(url)
+        self.__increment_stat('replayed')
+        status, body = row
+        if status >= 400:
+            raise HTTPError(url, status, HTTPStatus(status).phrase, None, None)
+        return zlib.decompress(body).decode('utf-8')
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the store in the current process, as well as the overall store contents.
+
+        :return: A copy of the statistics, with the following keys:
+                 'recorded' = Number of responses saved,
+                 'replayed' = Number of recorded responses served,
+                 'missing' = Number of pages requested that were never recorded,
+                 'entries' = Number of responses currently stored,
+                 'size' = Total size (in bytes) of all compressed responses currently stored
+        :rtype: dict
+        """
+        with self.__stats_lock:
+            stats = dict(self.__stats)
+        stats['entries'], stats['size'] = self.__get_connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses').fetchone()
+        return stats
+
+    def __increment_stat(self, stat):
+        """
+        A helper function to increase one of the usage statistics by 1.
+
+        :param stat: Name of the statistic
+        :type stat: str
+        """
+        with self.__stats_lock:
+            self.__stats[stat] += 1
+
+    def __get_connection(self):
+        """
+        A helper function to get the database connection for the current thread, creating it if necessary.
+        SQLite connections can't be shared between threads or processes, so each one gets its own connection.
+
+        :return: Database connection
+        :rtype: sqlite3.Connection
+        """
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            # Explicit transactions are used instead of the implicit ones managed by the sqlite3 module
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, status INTEGER, '
+                               'body BLOB, recorded_at REAL)')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+
+def get_default_fixture_store():
+    """
+    Gets the fixture store used by all web requests that don't specify a store, which is configured using the
+    MEANINGLESS_FIXTURE_MODE and MEANINGLESS_FIXTURE_PATH environment variables. This allows scripts to be run
+    against recorded pages without changing them.
+
+    :return: Default fixture store for the current process. None if the environment variables are not both set.
+    :rtype: FixtureStore
+    """
+    global _default_store, _default_store_key
+    mode = os.environ.get(FIXTURE_MODE_VARIABLE)
+    path = os.environ.get(FIXTURE_PATH_VARIABLE)
+    if not mode or not path:
+        return None
+    with _default_store_lock:
+        if _default_store_key != (mode.lower(), path):
+            _default_store = FixtureStore(path, mode.lower())
+            _default_store_key = (mode.lower(), path)
+        return _default_store
+
+
+def set_default_fixture_store(store):
+    """
+    Sets the fixture store used by all web requests that don't specify a store, including those sent from processes
+    started afterwards (such as by the Downloaders), by setting the environment variables read by
+    get_default_fixture_store.
+
+    :param store: Fixture store to use. None stops using the default fixture store.
+    :type store: FixtureStore
+    """
+    if store is None:
+        os.environ.pop(FIXTURE_MODE_VARIABLE, None)
+        os.environ.pop(FIXTURE_PATH_VARIABLE, None)
+        return
+    os.environ[FIXTURE_MODE_VARIABLE] = store.mode
+    os.environ[FIXTURE_PATH_VARIABLE] = store.path
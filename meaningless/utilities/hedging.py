@@ -0,0 +1,221 @@
+import threading
+from collections import deque
+from time import monotonic
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.exceptions import OperationCancelledError
+
+# This is a collection of helper methods and classes used to reduce the tail latency of web requests, by sending a
+# duplicate request when the original request is taking much longer than usual.
+
+
+class _HedgedCall:
+    """
+    The state of a single call made using a hedging policy, which is shared by the original and duplicate requests
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Set by whichever request finishes first, after which a duplicate request is no longer needed
+        self.is_finished = False
+        self.is_hedge_sent = False
+        self.hedge_finished = threading.Event()
+        self.hedge_result = None
+        self.hedge_exception = None
+
+
+class HedgingPolicy:
+    """
+    A thread-safe policy for hedging web requests. When a request hasn't completed within a delay based on a
+    percentile of recent request times, a duplicate request is sent, and whichever request finishes first is used.
+    The other request is then interrupted.
+
+    The number of duplicate requests is capped to a fraction of all requests, so that hedging never adds more than a
+    fixed amount of load to the web server.
+
+    Instances can be passed to other processes, where they keep their configuration but track request times and
+    statistics separately.
+    """
+
+    def __init__(self, percentile=95, initial_delay=1, min_delay=0.05, max_extra_requests=0.1, sample_size=100,
+                 min_samples=10):
+        """
+        :param percentile: Percentile of recent request times that a request is allowed to take before a duplicate
+                           request is sent. Defaults to 95.
+        :type percentile: int or float
+        :param initial_delay: Number of seconds to wait before sending a duplicate request, until enough request
+                              times have been recorded to use the percentile. Defaults to 1.
+        :type initial_delay: int or float
+        :param min_delay: Minimum number of seconds to wait before sending a duplicate request. Defaults to 0.05.
+        :type min_delay: int or float
+        :param max_extra_requests: Maximum number of duplicate requests that can be sent, as a fraction of the number
+                                   of requests. Defaults to 0.1, which allows up to 1 duplicate request for every 10
+                                   requests. Set this to 0 to disable hedging.
+        :type max_extra_requests: int or float
+        :param sample_size: Number of recent request times used to calculate the percentile. Defaults to 100.
+        :type sample_size: int
+        :param min_samples: Minimum number of request times needed before the percentile is used. Defaults to 10.
+        :type min_samples: int
+        """
+        self.percentile = min(max(0, percentile), 100)
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_extra_requests = max(0, max_extra_requests)
+        self.sample_size = max(1, sample_size)
+        self.min_samples = max(1, min_samples)
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the policy.
+        """
+        self.__lock = threading.Lock()
+        self.__request_times = deque(maxlen=self.sample_size)
+        self.__stats = {'requests': 0, 'hedged_requests': 0, 'hedge_wins': 0, 'skipped_hedges': 0}
+
+    def __getstate__(self):
+        """
+        Sends the policy configuration to another process, rather than its recorded request times.
+        """
+        return {'percentile': self.percentile, 'initial_delay': self.initial_delay, 'min_delay': self.min_delay,
+                'max_extra_requests': self.max_extra_requests, 'sample_size': self.sample_size,
+                'min_samples': self.min_samples}
+
+    def __setstate__(self, state):
+        """
+        Restores the policy configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def get_delay(self):
+        """
+        Gets the number of seconds that a request is currently allowed to take before a duplicate request is sent.
+
+        :return: Number of seconds
+        :rtype: float
+        """
+        with self.__lock:
+            request_times = sorted(self.__request_times)
+        if len(request_times) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        index = min(len(request_times) - 1, int(len(request_times) * self.percentile / 100))
+        return max(self.min_delay, request_times[index])
+
+    def run(self, function, cancellation_token=None, rate_limiter=None):
+        """
+        Sends a request, along with a duplicate request if it takes longer than the current delay.
+
+        :param function: Function that sends the request and returns its response. It is called with a
+                         cancellation_token keyword argument, which is cancelled when the request is no longer needed,
+                         so it must be safe to call from multiple threads at once.
+        :type function: callable
+        :param cancellation_token: Token used to stop both requests. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :param rate_limiter: When specified, the duplicate request waits until it is allowed by this rate limiter.
+                             Defaults to None.
+        :type rate_limiter: RateLimiter
+        :return: Response of whichever request completed successfully first. If the original request fails, the
+                 duplicate request is used if it has been sent.
+        :rtype: object
+        """
+        call = _HedgedCall()
+        primary_token = CancellationToken(parent=cancellation_token)
+        hedge_token = CancellationToken(parent=cancellation_token)
+        with self.__lock:
+            self.__stats['requests'] += 1
+        start_time = monotonic()
+        # The duplicate request is sent from the timer thread, so the original request still runs in this thread
+        timer = threading.Timer(self.get_delay(), self.__send_hedge,
+                                (call, function, primary_token, hedge_token, rate_limiter))
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                result = function(cancellation_token=primary_token)
+            except Exception as exception:
+                with call.lock:
+                    is_hedge_won = call.is_finished
+                    call.is_finished = True
+                    is_hedge_sent = call.is_hedge_sent
+                if not is_hedge_sent:
+                    raise exception
+                # The original request may have been interrupted because the duplicate request completed first,
+                # otherwise the duplicate request still has a chance of succeeding
+                if not is_hedge_won:
+                    call.hedge_finished.wait()
+                if call.hedge_exception is not None:
+                    if cancellation_token is not None:
+                        cancellation_token.raise_if_cancelled()
+                    raise exception if not isinstance(exception, OperationCancelledError) else call.hedge_exception
+                result = call.hedge_result
+            else:
+                with call.lock:
+                    if call.is_finished:
+                        # The duplicate request completed just before this one, so its response is used instead
+                        result = call.hedge_result
+                    call.is_finished = True
+        finally:
+            timer.cancel()
+            hedge_token.cancel()
+        with self.__lock:
+            self.__request_times.append(monotonic() - start_time)
+        return result
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the policy in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'requests' = Number of requests sent using the policy, excluding duplicate requests,
+                 'hedged_requests' = Number of duplicate requests sent,
+                 'hedge_wins' = Number of duplicate requests that completed before the original request,
+                 'skipped_hedges' = Number of duplicate requests that weren't sent, since the limit of duplicate
+                 requests was reached,
+                 'delay' = Number of seconds that a request is currently allowed to take before it is hedged
+        :rtype: dict
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+        stats['delay'] = self.get_delay()
+        return stats
+
+    def __send_hedge(self, call, function, primary_token, hedge_token, rate_limiter):
+        """
+        A helper function that sends the duplicate request of a call, if it is still needed and allowed.
+
+        :param call: State of the call
+        :type call: _HedgedCall
+        :param function: Function that sends the request
+        :type function: callable
+        :param primary_token: Token of the original request, which is cancelled if the duplicate request wins
+        :type primary_token: CancellationToken
+        :param hedge_token: Token of the duplicate request
+        :type hedge_token: CancellationToken
+        :param rate_limiter: Rate limiter that the duplicate request waits for. None if requests are not limited.
+        :type rate_limiter: RateLimiter
+        """
+        with self.__lock:
+            if self.__stats['hedged_requests'] + 1 > self.max_extra_requests * self.__stats['requests']:
+                self.__stats['skipped_hedges'] += 1
+                return
+            with call.lock:
+                if call.is_finished:
+                    return
+                call.is_hedge_sent = True
+            self.__stats['hedged_requests'] += 1
+        try:
+            if rate_limiter is not None:
+                rate_limiter.acquire(hedge_token)
+            call.hedge_result = function(cancellation_token=hedge_token)
+        except Exception as exception:
+            call.hedge_exception = exception
+        else:
+            with call.lock:
+                is_winner = not call.is_finished
+                call.is_finished = True
+            if is_winner:
+                with self.__lock:
+                    self.__stats['hedge_wins'] += 1
+                primary_token.cancel()
+        finally:
+            call.hedge_finished.set()
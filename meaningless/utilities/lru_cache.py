@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+
+# This is a collection of helper classes used to keep frequently used data in memory.
+
+
+class LRUCache:
+    """
+    A thread-safe, bounded in-memory cache which discards the least recently used entry when it becomes full
+    """
+
+    def __init__(self, max_size=128):
+        """
+        :param max_size: Maximum number of entries to keep. Defaults to 128.
+        :type max_size: int
+        """
+        self.max_size = max(1, max_size)
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the contents and statistics of the cache.
+        """
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __getstate__(self):
+        """
+        Sends the cache configuration to another process, rather than its contents.
+        """
+        return {'max_size': self.max_size}
+
+    def __setstate__(self, state):
+        """
+        Restores the cache configuration received from another process, starting with an empty cache.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__entries
+
+    def get(self, key, default=None):
+        """
+        Gets an entry, marking it as the most recently used entry.
+
+        :param key: Key of the entry
+        :type key: object
+        :param default: Value to return if the key is not in the cache. Defaults to None.
+        :type default: object
+        :return: The cached value, or the default value if the key is not in the cache
+        :rtype: object
+        """
+        with self.__lock:
+            if key not in self.__entries:
+                self.__stats['misses'] += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return self.__entries[key]
+
+    def put(self, key, value):
+        """
+        Adds or replaces an entry, evicting the least recently used entry if the cache is full.
+
+        :param key: Key of the entry
+        :type key: object
+        :param value: Value to store
+        :type value: object
+        """
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.__stats['evictions'] += 1
+
+    def invalidate(self, predicate=None):
+        """
+        Removes entries from the cache.
+
+        :param predicate: Function which takes a key and returns True if that entry should be removed.
+                          Defaults to None, which removes all entries.
+        :type predicate: callable[[object], bool]
+        :return: Number of entries removed
+        :rtype: int
+        """
+        with self.__lock:
+            if predicate is None:
+                removed_keys = list(self.__entries.keys())
+            else:
+                removed_keys = [key for key in self.__entries.keys() if predicate(key)]
+            [self.__entries.pop(key) for key in removed_keys]
+        return len(removed_keys)
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the cache.
+
+        :return: A copy of the statistics, with the following keys:
+                 'hits' = Number of lookups that found an entry,
+                 'misses' = Number of lookups that didn't find an entry,
+                 'evictions' = Number of entries removed to make room for new entries,
+                 'size' = Number of entries currently stored
+        :rtype: dict
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['size'] = len(self.__entries)
+        return stats
@@ -0,0 +1,282 @@
+import re
+from html.parser import HTMLParser
+from bs4 import UnicodeDammit
+
+# This is a collection of helper classes used to extract passage contents directly from the markup of a web page,
+# without building a document tree first.
+
+# Tags which can't have any contents, and are therefore closed as soon as they are opened
+VOID_TAG_NAMES = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image',
+                  'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source',
+                  'spacer', 'track', 'wbr'}
+# Tags whose text contents are not displayed as part of the page, and are therefore excluded from the passage contents
+HIDDEN_TEXT_TAG_NAMES = {'rt', 'rp', 'style', 'script', 'template'}
+# Tags where text consisting only of whitespace is kept as it is, instead of being reduced to a single character
+PRESERVED_WHITESPACE_TAG_NAMES = {'pre', 'textarea'}
+ASCII_SPACES = ' \n\t\x0c\r'
+PASSAGE_CONTENT_CLASS = re.compile(r'(^|\s)passage-content(\s|$)')
+
+
+class _OpenTag:
+    """
+    A tag which is being processed by the passage content parser, which collects the text contents of the tag
+    """
+    __slots__ = ['name', 'attributes', 'rule_index', 'is_removed', 'is_replaced', 'child_level', 'text',
+                 'passage_index']
+
+    def __init__(self, name, attributes, rule_index, is_removed, is_replaced, child_level):
+        """
+        :param name: Tag name
+        :type name: str
+        :param attributes: Tag attributes
+        :type attributes: dict
+        :param rule_index: Index of the clean up rule applied to the tag. None if no rule is applied.
+        :type rule_index: int
+        :param is_removed: If True, the tag and its contents are removed from the passage contents
+        :type is_removed: bool
+        :param is_replaced: If True, the tag is replaced by the result of its clean up rule's action
+        :type is_replaced: bool
+        :param child_level: Clean up rules with an index below this number can still be applied to child tags
+        :type child_level: int
+        """
+        self.name = name
+        self.attributes = attributes
+        self.rule_index = rule_index
+        self.is_removed = is_removed
+        self.is_replaced = is_replaced
+        self.child_level = child_level
+        self.text = []
+        # Position of the tag's text contents in the list of passage contents, if the tag is a passage section
+        self.passage_index = None
+
+
+class PassageContentParser(HTMLParser):
+    """
+    A single-use parser which extracts the text contents of the passage sections on a Bible Gateway search results
+    page as the markup is read. Clean up rules are applied to each tag once it is closed, so no document tree is ever
+    built, and anything outside of the passage sections is skipped over.
+
+    This produces the same text contents as parsing the page with Beautiful Soup (using html.parser) and applying the
+    same clean up rules to the parsed passage sections.
+    """
+
+    def __init__(self, cleanup_rules, translation, markers):
+        """
+        :param cleanup_rules: Rules used to clean up the passage contents, in the format used by WebExtractor
+        :type cleanup_rules: list
+        :param translation: Translation code in uppercase
+        :type translation: str
+        :param markers: Text used by the rule actions, keyed on marker name
+        :type markers: dict
+        """
+        super().__init__(convert_charrefs=True)
+        self.cleanup_rules = cleanup_rules
+        self.markers = markers
+        # Only the rules applicable to this translation are considered, and are looked up by tag name
+        self.__rules_by_tag_name = {}
+        for rule_index, (tag_names, class_names, rule_translations, _, _) in enumerate(cleanup_rules):
+            if rule_translations is None or translation in rule_translations:
+                rule_classes = set(class_names) if class_names is not None else None
+                [self.__rules_by_tag_name.setdefault(tag_name, []).append((rule_index, rule_classes))
+                 for tag_name in tag_names]
+        self.__rule_counts = [0 for _ in cleanup_rules]
+        # Tags which are currently open, starting from the passage section that contains them
+        self.__open_tags = []
+        self.__open_tag_counts = {}
+        self.__hidden_text_depth = 0
+        self.__preserved_whitespace_depth = 0
+        # Void tags that might be explicitly closed later on, which is ignored as they have already been closed
+        self.__closed_void_tag_names = []
+        self.__pending_data = []
+        self.passage_contents = []
+
+    def parse(self, page):
+        """
+        Extracts the passage contents from a web page.
+
+        :param page: Contents of the web page
+        :type page: bytes or str
+        :return: Text contents of each passage section on the page, in the order they appear
+        :rtype: list
+        """
+        if isinstance(page, bytes):
+            page = UnicodeDammit(page, is_html=True).unicode_markup
+        self.feed(page)
+        self.close()
+        return self.passage_contents
+
+    def close(self):
+        super().close()
+        self.__end_data()
+        while self.__open_tags:
+            self.__pop_tag()
+
+    def handle_starttag(self, tag, attrs):
+        if self.__start_tag(tag, attrs) and tag in VOID_TAG_NAMES:
+            # Void tags are closed straight away, so closing them explicitly later on has no effect
+            self.__pop_to_tag(tag)
+            self.__closed_void_tag_names.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Tags written as <tag/> are closed straight away, regardless of whether they are void tags
+        self.__start_tag(tag, attrs)
+        self.__end_data()
+        self.__pop_to_tag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.__closed_void_tag_names:
+            self.__closed_void_tag_names.remove(tag)
+            return
+        self.__end_data()
+        self.__pop_to_tag(tag)
+
+    def handle_data(self, data):
+        self.__pending_data.append(data)
+
+    def handle_comment(self, data):
+        self.__end_data()
+
+    def handle_decl(self, decl):
+        self.__end_data()
+
+    def handle_pi(self, data):
+        self.__end_data()
+
+    def unknown_decl(self, data):
+        self.__end_data()
+        # CDATA sections are the only declarations that are included in the text contents
+        if data.upper().startswith('CDATA['):
+            self.__pending_data.append(data[len('CDATA['):])
+            self.__end_data(is_always_shown=True)
+
+    def __start_tag(self, tag, attrs):
+        """
+        A helper function to open a tag, if it is a passage section or is contained within one.
+
+        :param tag: Tag name
+        :type tag: str
+        :param attrs: Tag attributes, as provided by HTMLParser
+        :type attrs: list
+        :return: True if the tag was opened
+        :rtype: bool
+        """
+        self.__end_data()
+        is_passage_content = tag == 'div' and PASSAGE_CONTENT_CLASS.search(dict(attrs).get('class') or '')
+        if self.__open_tags:
+            open_tag = self.__create_open_tag(tag, attrs)
+        elif is_passage_content:
+            open_tag = _OpenTag(tag, None, None, False, False, len(self.cleanup_rules))
+        else:
+            return False
+        if is_passage_content:
+            # Passage sections within other passage sections are included in the text contents of both sections,
+            # which is the same as searching for all passage sections in a document tree
+            open_tag.passage_index = len(self.passage_contents)
+            self.passage_contents.append('')
+        self.__push_tag(open_tag)
+        return True
+
+    def __create_open_tag(self, tag, attrs):
+        """
+        A helper function to determine how a tag in a passage section is processed, based on the clean up rules.
+
+        :param tag: Tag name
+        :type tag: str
+        :param attrs: Tag attributes, as provided by HTMLParser
+        :type attrs: list
+        :return: The tag to add to the open tags
+        :rtype: _OpenTag
+        """
+        parent = self.__open_tags[-1]
+        if parent.is_removed:
+            return _OpenTag(tag, None, None, True, False, parent.child_level)
+        attributes = {key: value if value is not None else '' for key, value in attrs}
+        if 'class' in attributes:
+            attributes['class'] = attributes['class'].split()
+        for rule_index, rule_classes in self.__rules_by_tag_name.get(tag, []):
+            if rule_classes is None or not rule_classes.isdisjoint(attributes.get('class', [])):
+                break
+        else:
+            return _OpenTag(tag, attributes, None, False, False, parent.child_level)
+        # A rule isn't applied if an enclosing tag has already been replaced by the same rule or an earlier one,
+        # as the rules are applied in order and the contents of a replaced tag are no longer available to later rules
+        if rule_index >= parent.child_level:
+            return _OpenTag(tag, attributes, None, False, False, parent.child_level)
+        _, _, _, interval, action = self.cleanup_rules[rule_index]
+        if action is None:
+            return _OpenTag(tag, None, rule_index, True, False, parent.child_level)
+        rule_count = self.__rule_counts[rule_index]
+        self.__rule_counts[rule_index] += 1
+        if rule_count % interval != 0:
+            return _OpenTag(tag, attributes, rule_index, False, False, parent.child_level)
+        return _OpenTag(tag, attributes, rule_index, False, True, rule_index)
+
+    def __push_tag(self, open_tag):
+        """
+        A helper function to open a tag in a passage section.
+
+        :param open_tag: Tag to open
+        :type open_tag: _OpenTag
+        """
+        self.__open_tags.append(open_tag)
+        self.__open_tag_counts[open_tag.name] = self.__open_tag_counts.get(open_tag.name, 0) + 1
+        if open_tag.name in HIDDEN_TEXT_TAG_NAMES:
+            self.__hidden_text_depth += 1
+        if open_tag.name in PRESERVED_WHITESPACE_TAG_NAMES:
+            self.__preserved_whitespace_depth += 1
+
+    def __pop_tag(self):
+        """
+        A helper function to close the most recently opened tag, passing its text contents to its parent tag.
+        """
+        open_tag = self.__open_tags.pop()
+        self.__open_tag_counts[open_tag.name] -= 1
+        if open_tag.name in HIDDEN_TEXT_TAG_NAMES:
+            self.__hidden_text_depth -= 1
+        if open_tag.name in PRESERVED_WHITESPACE_TAG_NAMES:
+            self.__preserved_whitespace_depth -= 1
+        if open_tag.is_removed:
+            return
+        text = ''.join(open_tag.text)
+        if open_tag.passage_index is not None:
+            self.passage_contents[open_tag.passage_index] = text
+        if not self.__open_tags:
+            return
+        if open_tag.is_replaced:
+            text = self.cleanup_rules[open_tag.rule_index][4](text, open_tag.attributes, self.markers)
+        self.__open_tags[-1].text.append(text)
+
+    def __pop_to_tag(self, tag):
+        """
+        A helper function to close the most recently opened tag with a particular name, as well as any tags opened
+        after it. Nothing is closed if there are no open tags with that name.
+
+        :param tag: Tag name
+        :type tag: str
+        """
+        if not self.__open_tag_counts.get(tag):
+            return
+        while self.__open_tags[-1].name != tag:
+            self.__pop_tag()
+        self.__pop_tag()
+
+    def __end_data(self, is_always_shown=False):
+        """
+        A helper function to add the text read since the last tag to the currently open tag.
+
+        :param is_always_shown: If True, the text is included even if it is inside a tag whose text contents are
+                                not displayed. Defaults to False.
+        :type is_always_shown: bool
+        """
+        if not self.__pending_data:
+            return
+        data = ''.join(self.__pending_data)
+        self.__pending_data = []
+        if not self.__open_tags or self.__open_tags[-1].is_removed:
+            return
+        if self.__hidden_text_depth and not is_always_shown:
+            return
+        # Text consisting only of whitespace is reduced to a single character, unless its spacing is significant
+        if not self.__preserved_whitespace_depth and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        self.__open_tags[-1].text.append(data)
@@ -0,0 +1,220 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from meaningless.utilities import common
+from meaningless.utilities.cancellation import CancellationToken
+
+# This is a collection of helper methods and classes used to retrieve chapters in the background before they are
+# requested, so that reading through a book one chapter at a time doesn't wait for a web request on every chapter.
+
+
+class PrefetchPolicy:
+    """
+    A thread-safe policy for reading ahead when getting chapters one at a time. After a chapter is retrieved, the
+    chapters next to it are retrieved in the background, so that they are already available when they are requested.
+
+    The number of chapters being retrieved in the background is capped, and chapters that are requested while they
+    are still being retrieved wait for that retrieval to finish instead of sending another web request.
+
+    Instances can be passed to other processes, where they keep their configuration but retrieve chapters and track
+    statistics separately.
+    """
+
+    # Maximum number of retrieved chapters that are remembered until they are requested, which only affects statistics
+    __max_prefetched_chapters = 256
+
+    def __init__(self, next_chapters=1, previous_chapters=0, max_concurrent_prefetches=2):
+        """
+        :param next_chapters: Number of chapters after the requested chapter to retrieve in the background.
+                              Defaults to 1.
+        :type next_chapters: int
+        :param previous_chapters: Number of chapters before the requested chapter to retrieve in the background.
+                                  Defaults to 0.
+        :type previous_chapters: int
+        :param max_concurrent_prefetches: Maximum number of chapters that can be retrieved in the background at the
+                                          same time. Any more chapters are skipped rather than queued, so that
+                                          skipping through a book doesn't build up a backlog of web requests.
+                                          Defaults to 2.
+        :type max_concurrent_prefetches: int
+        """
+        self.next_chapters = max(0, next_chapters)
+        self.previous_chapters = max(0, previous_chapters)
+        self.max_concurrent_prefetches = max(1, max_concurrent_prefetches)
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the policy.
+        """
+        self.__lock = threading.Lock()
+        self.__executor = None
+        # Cancelled when the policy is closed, which stops any chapters still being retrieved
+        self.__cancellation_token = CancellationToken()
+        self.__in_progress = {}
+        self.__prefetched = OrderedDict()
+        self.__stats = {'requests': 0, 'hits': 0, 'misses': 0, 'prefetches': 0, 'skipped_prefetches': 0,
+                        'failed_prefetches': 0}
+
+    def __getstate__(self):
+        """
+        Sends the policy configuration to another process, rather than its chapters in progress.
+        """
+        return {'next_chapters': self.next_chapters, 'previous_chapters': self.previous_chapters,
+                'max_concurrent_prefetches': self.max_concurrent_prefetches}
+
+    def __setstate__(self, state):
+        """
+        Restores the policy configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_adjacent_chapters(self, book, chapter, translation='NIV'):
+        """
+        Gets the chapters to retrieve in the background after a chapter has been retrieved, without going past the
+        start or end of the book.
+
+        >>> PrefetchPolicy(next_chapters=2, previous_chapters=1).get_adjacent_chapters('Ruth', 2)
+        [3, 4, 1]
+        >>> PrefetchPolicy(next_chapters=2).get_adjacent_chapters('Ruth', 4)
+        []
+        >>> PrefetchPolicy().get_adjacent_chapters('Barnabas', 1)
+        []
+
+        :param book: Name of the book
+        :type book: str
+        :param chapter: Chapter number of the retrieved chapter
+        :type chapter: int
+        :param translation: Translation code for the book. Defaults to 'NIV'.
+        :type translation: str
+        :return: Chapter numbers in the order they should be retrieved, starting with the next chapter
+        :rtype: list
+        """
+        chapter_count = common.get_chapter_count(book, translation)
+        chapters = [chapter + offset for offset in range(1, self.next_chapters + 1)] + \
+                   [chapter - offset for offset in range(1, self.previous_chapters + 1)]
+        return [adjacent_chapter for adjacent_chapter in chapters if 1 <= adjacent_chapter <= chapter_count]
+
+    def prefetch(self, key, function):
+        """
+        Runs a function in the background, unless a call with the same key is already in progress or the maximum
+        number of calls in progress has been reached. Exceptions raised by the function are ignored.
+
+        :param key: Identifies the retrieved chapter
+        :type key: collections.abc.Hashable
+        :param function: Function that retrieves the chapter. It is called with a cancellation_token keyword argument,
+                         which is cancelled when the policy is closed.
+        :type function: callable
+        :return: True if the function was started, otherwise False
+        :rtype: bool
+        """
+        with self.__lock:
+            if self.__cancellation_token.is_cancelled or key in self.__in_progress or key in self.__prefetched:
+                return False
+            if len(self.__in_progress) >= self.max_concurrent_prefetches:
+                self.__stats['skipped_prefetches'] += 1
+                return False
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.max_concurrent_prefetches,
+                                                     thread_name_prefix='meaningless-prefetch')
+            self.__stats['prefetches'] += 1
+            self.__in_progress[key] = self.__executor.submit(self.__run_prefetch, key, function)
+        return True
+
+    def claim(self, key, cancellation_token=None):
+        """
+        Records that a chapter has been requested. If the chapter is still being retrieved in the background, this
+        waits for the retrieval to finish, so that the chapter doesn't need to be requested again.
+
+        :param key: Identifies the requested chapter
+        :type key: collections.abc.Hashable
+        :param cancellation_token: Token used to stop waiting for the chapter. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: True if the chapter was retrieved in the background, otherwise False
+        :rtype: bool
+        """
+        with self.__lock:
+            self.__stats['requests'] += 1
+            future = self.__in_progress.get(key)
+        if future is not None:
+            if cancellation_token is None:
+                wait([future])
+            else:
+                # Cancelling the token doesn't wake up this thread, so the token is checked periodically instead
+                while not wait([future], cancellation_token.get_timeout(0.1)).done:
+                    cancellation_token.raise_if_cancelled()
+        with self.__lock:
+            is_prefetched = self.__prefetched.pop(key, False)
+            self.__stats['hits' if is_prefetched else 'misses'] += 1
+        return is_prefetched
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the policy in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'requests' = Number of chapters requested,
+                 'hits' = Number of requested chapters that were retrieved in the background,
+                 'misses' = Number of requested chapters that were not retrieved in the background,
+                 'hit_rate' = Fraction of requested chapters that were retrieved in the background,
+                 'prefetches' = Number of chapters retrieved in the background,
+                 'skipped_prefetches' = Number of chapters not retrieved due to the maximum number of concurrent
+                 prefetches,
+                 'failed_prefetches' = Number of chapters that could not be retrieved in the background,
+                 'in_progress' = Number of chapters currently being retrieved in the background
+        :rtype: dict
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['in_progress'] = len(self.__in_progress)
+        stats['hit_rate'] = stats['hits'] / stats['requests'] if stats['requests'] else 0
+        return stats
+
+    def close(self):
+        """
+        Stops retrieving chapters in the background, including any chapters still being retrieved.
+        The policy can't be used to retrieve any more chapters after this.
+        """
+        self.__cancellation_token.cancel()
+        with self.__lock:
+            executor = self.__executor
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __run_prefetch(self, key, function):
+        """
+        A helper function to retrieve a chapter in the background and record the outcome.
+
+        :param key: Identifies the retrieved chapter
+        :type key: collections.abc.Hashable
+        :param function: Function that retrieves the chapter
+        :type function: callable
+        """
+        is_successful = False
+        try:
+            function(cancellation_token=self.__cancellation_token)
+            is_successful = True
+        except Exception:
+            # The chapter is retrieved again when it is requested, which raises the exception if it still happens
+            pass
+        finally:
+            with self.__lock:
+                self.__in_progress.pop(key, None)
+                if is_successful:
+                    self.__prefetched[key] = True
+                    while len(self.__prefetched) > self.__max_prefetched_chapters:
+                        self.__prefetched.popitem(last=False)
+                else:
+                    self.__stats['failed_prefetches'] += 1
+
+
+if __name__ == "__main__":
+    # Run this section when run as a standalone script. Don't run this part when being imported.
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import time, sleep
+
+# This is a collection of helper methods and classes used to limit the rate of web requests sent to a web server,
+# even when the requests are sent from multiple processes.
+
+
+class RateLimiter:
+    """
+    A token bucket which limits the number of web requests sent per second, which is safe to share between threads
+    and processes. The state of the bucket is stored in a SQLite database, so every process using the same rate
+    limiter draws from the same budget of requests.
+
+    Each request reserves the next available time slot, so requests are spread out evenly at the allowed rate
+    instead of being sent in bursts. When the web server asks for requests to be slowed down, all processes pause
+    until the requested time has passed.
+    """
+
+    def __init__(self, requests_per_second=2, burst=1, database_path=None):
+        """
+        :param requests_per_second: Maximum average number of requests that can be sent per second. Defaults to 2.
+        :type requests_per_second: int or float
+        :param burst: Number of requests that can be sent at once after a period of no requests. Defaults to 1.
+        :type burst: int
+        :param database_path: Path of the database storing the state of the rate limiter. Defaults to None, which
+                              uses a new file in the temporary directory that is removed once the rate limiter is no
+                              longer used by the process that created it.
+        :type database_path: str
+        """
+        self.requests_per_second = max(0.001, requests_per_second)
+        self.burst = max(1, burst)
+        if database_path is None:
+            database_path = os.path.join(tempfile.gettempdir(), f'meaningless_rate_limiter_{uuid.uuid4().hex}.sqlite3')
+            weakref.finalize(self, _remove_database, database_path)
+        self.database_path = database_path
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the rate limiter.
+        """
+        self.__local = threading.local()
+        self.__stats_lock = threading.Lock()
+        self.__stats = {'requests': 0, 'delayed_requests': 0, 'total_delay': 0.0, 'pauses': 0}
+
+    def __getstate__(self):
+        """
+        Sends the rate limiter configuration to another process, rather than its database connections.
+        """
+        return {'requests_per_second': self.requests_per_second, 'burst': self.burst,
+                'database_path': self.database_path}
+
+    def __setstate__(self, state):
+        """
+        Restores the rate limiter configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def acquire(self, cancellation_token=None):
+        """
+        Waits until the next request can be sent without exceeding the rate limit.
+
+        :param cancellation_token: When specified, the wait is stopped with an OperationCancelledError once the token
+                                   is cancelled or its deadline passes. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Number of seconds spent waiting
+        :rtype: float
+        """
+        interval = 1 / self.requests_per_second
+        now = time()
+        connection = self.__get_connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            # The bucket is tracked as the earliest time that the next request could be sent if there was no burst
+            # allowance, which is moved forward by one interval for every request
+            next_request_at = max(self.__get_next_request_time(connection), now)
+            connection.execute('UPDATE bucket SET next_request_at = ?', (next_request_at + interval,))
+        delay = max(0.0, next_request_at - (self.burst - 1) * interval - now)
+        with self.__stats_lock:
+            self.__stats['requests'] += 1
+            if delay > 0:
+                self.__stats['delayed_requests'] += 1
+                self.__stats['total_delay'] += delay
+        if cancellation_token is not None:
+            cancellation_token.sleep(delay)
+        elif delay > 0:
+            sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        """
+        Stops any further requests from being sent for a period of time, such as when the web server responds with
+        a Retry-After header. Requests then resume at the usual rate, rather than all at once.
+
+        :param seconds: Number of seconds to wait before sending the next request
+        :type seconds: int or float
+        """
+        interval = 1 / self.requests_per_second
+        resume_at = time() + max(0, seconds) + (self.burst - 1) * interval
+        connection = self.__get_connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            next_request_at = max(self.__get_next_request_time(connection), resume_at)
+            connection.execute('UPDATE bucket SET next_request_at = ?', (next_request_at,))
+        with self.__stats_lock:
+            self.__stats['pauses'] += 1
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the rate limiter in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'requests' = Number of requests that have been allowed,
+                 'delayed_requests' = Number of requests that had to wait before being sent,
+                 'total_delay' = Total number of seconds spent waiting,
+                 'pauses' = Number of times that requests were paused at the request of the web server
+        :rtype: dict
+        """
+        with self.__stats_lock:
+            return dict(self.__stats)
+
+    @staticmethod
+    def __get_next_request_time(connection):
+        """
+        A helper function to read the state of the bucket, creating it if necessary.
+
+        :param connection: Database connection, which must be in a write transaction
+        :type connection: sqlite3.Connection
+        :return: UNIX timestamp of the earliest time that the next request could be sent, ignoring the burst allowance
+        :rtype: float
+        """
+        row = connection.execute('SELECT next_request_at FROM bucket').fetchone()
+        if row is None:
+            connection.execute('INSERT INTO bucket (next_request_at) VALUES (0)')
+            return 0.0
+        return row[0]
+
+    def __get_connection(self):
+        """
+        A helper function to get the database connection for the current thread, creating it if necessary.
+        SQLite connections can't be shared between threads or processes, so each one gets its own connection.
+
+        :return: Database connection
+        :rtype: sqlite3.Connection
+        """
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            # Explicit transactions are used instead of the implicit ones managed by the sqlite3 module
+            connection = sqlite3.connect(self.database_path, timeout=60, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # The state of the bucket doesn't need to survive a power failure, so commits don't wait for the disk
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS bucket (next_request_at REAL)')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+
+def parse_retry_after(value):
+    """
+    A helper function to get the number of seconds to wait from the value of a Retry-After response header.
+
+    :param value: Header value, which is either a number of seconds or a HTTP date
+    :type value: str
+    :return: Number of seconds to wait. None if the value is missing or invalid.
+    :rtype: float
+
+    >>> parse_retry_after('120')
+    120.0
+    >>> parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT')
+    0.0
+    >>> parse_retry_after('soon') is None
+    True
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _remove_database(database_path):
+    """
+    A helper function to delete the files of a temporary rate limiter database.
+
+    :param database_path: Path of the database
+    :type database_path: str
+    """
+    for path in [database_path, f'{database_path}-wal', f'{database_path}-shm']:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+from time import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# This is a collection of helper methods and classes used to store web responses on disk, so that pages which have
+# already been downloaded don't need to be requested again.
+
+
+class CachedResponse:
+    """
+    A web response which has been retrieved from a response cache
+    """
+
+    def __init__(self, url, body, etag, last_modified, stored_at, is_expired):
+        """
+        :param url: Normalised URL which the response is stored under
+        :type url: str
+        :param body: Response body
+        :type body: bytes
+        :param etag: Value of the ETag header sent with the original response. None if it was not provided.
+        :type etag: str
+        :param last_modified: Value of the Last-Modified header sent with the original response.
+                              None if it was not provided.
+        :type last_modified: str
+        :param stored_at: UNIX timestamp of when the response was stored or last revalidated
+        :type stored_at: float
+        :param is_expired: True if the response is older than the time to live of the cache
+        :type is_expired: bool
+        """
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.is_expired = is_expired
+
+
+class ResponseCache:
+    """
+    A persistent cache of web responses stored in a SQLite database, which is safe to share between threads and
+    processes. Entries are keyed on their normalised URL, and the least recently used entries are evicted once the
+    total size of all stored responses exceeds the maximum size.
+    """
+
+    def __init__(self, directory, time_to_live=86400, max_size=512 * 1024 * 1024):
+        """
+        :param directory: Directory containing the cache database. This is created if it doesn't already exist.
+        :type directory: str
+        :param time_to_live: Number of seconds that a stored response can be used without revalidating it with the
+                             web server. Defaults to 86400 (1 day).
+        :type time_to_live: int or float
+        :param max_size: Maximum total size (in bytes) of all stored responses. Defaults to 512 MiB.
+        :type max_size: int
+        """
+        self.directory = directory
+        self.time_to_live = time_to_live
+        self.max_size = max_size
+        self.database_path = os.path.join(directory, 'response_cache.sqlite3')
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the cache.
+        """
+        self.__local = threading.local()
+        self.__stats_lock = threading.Lock()
+        self.__stats = {'hits': 0, 'misses': 0, 'revalidations': 0, 'evictions': 0}
+
+    def __getstate__(self):
+        """
+        Sends the cache configuration to another process, rather than its database connections.
+        """
+        return {'directory': self.directory, 'time_to_live': self.time_to_live, 'max_size': self.max_size,
+                'database_path': self.database_path}
+
+    def __setstate__(self, state):
+        """
+        Restores the cache configuration received from another process.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def get(self, url):
+        """
+        Gets a stored response, regardless of whether it has expired.
+
+        :param url: Page URL
+        :type url: str
+        :return: The stored response. None if the URL has not been stored.
+        :rtype: CachedResponse
+        """
+        key = normalise_url(url)
+        connection = self.__get_connection()
+        with connection:
+            row = connection.execute('SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?',
+                                     (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time(), key))
+        if row is None:
+            self.__increment_stat('misses')
+            return None
+        body, etag, last_modified, stored_at = row
+        is_expired = time() - stored_at > self.time_to_live
+        if not is_expired:
+            self.__increment_stat('hits')
+        return CachedResponse(key, bytes(body), etag, last_modified, stored_at, is_expired)
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Stores a response, evicting the least recently used responses if the cache becomes too large.
+        Responses larger than the maximum size of the cache are not stored.
+
+        :param url: Page URL
+        :type url: str
+        :param body: Response body
+        :type body: bytes
+        :param etag: Value of the ETag response header
+        :type etag: str
+        :param last_modified: Value of the Last-Modified response header
+        :type last_modified: str
+        """
+        if len(body) > self.max_size:
+            return
+        now = time()
+        connection = self.__get_connection()
+        with connection:
+            # Acquire the write lock up front, so that the size calculation and eviction of other processes can't
+            # interleave with this one
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('INSERT OR REPLACE INTO responses (url, body, etag, last_modified, stored_at, '
+                               'accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                               (normalise_url(url), body, etag, last_modified, now, now, len(body)))
+            excess_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0] - \
+                self.max_size
+            evicted_urls = []
+            if excess_size > 0:
+                for evicted_url, size in connection.execute('SELECT url, size FROM responses '
+                                                            'ORDER BY accessed_at ASC'):
+                    if excess_size <= 0:
+                        break
+                    evicted_urls.append((evicted_url,))
+                    excess_size -= size
+                connection.executemany('DELETE FROM responses WHERE url = ?', evicted_urls)
+        if evicted_urls:
+            self.__increment_stat('evictions', len(evicted_urls))
+
+    def revalidate(self, url):
+        """
+        Marks a stored response as fresh, which is used when the web server confirms it hasn't changed.
+
+        :param url: Page URL
+        :type url: str
+        """
+        connection = self.__get_connection()
+        with connection:
+            connection.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?',
+                               (time(), time(), normalise_url(url)))
+        self.__increment_stat('revalidations')
+
+    def invalidate(self, url=None):
+        """
+        Removes stored responses from the cache.
+
+        :param url: Page URL to remove. Defaults to None, which removes all stored responses.
+        :type url: str
+        """
+        connection = self.__get_connection()
+        with connection:
+            if url is None:
+                connection.execute('DELETE FROM responses')
+            else:
+                connection.execute('DELETE FROM responses WHERE url = ?', (normalise_url(url),))
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the cache in the current process, as well as the overall cache contents.
+
+        :return: A copy of the statistics, with the following keys:
+                 'hits' = Number of lookups that found a response which had not expired,
+                 'misses' = Number of lookups for responses that were not stored,
+                 'revalidations' = Number of expired responses confirmed to be unchanged by the web server,
+                 'evictions' = Number of responses removed to keep the cache under its maximum size,
+                 'entries' = Number of responses currently stored,
+                 'size' = Total size (in bytes) of all responses currently stored
+        :rtype: dict
+        """
+        with self.__stats_lock:
+            stats = dict(self.__stats)
+        stats['entries'], stats['size'] = self.__get_connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return stats
+
+    def __increment_stat(self, stat, amount=1):
+        """
+        A helper function to increase one of the usage statistics.
+
+        :param stat: Name of the statistic
+        :type stat: str
+        :param amount: Amount to increase the statistic by
+        :type amount: int
+        """
+        with self.__stats_lock:
+            self.__stats[stat] += amount
+
+    def __get_connection(self):
+        """
+        A helper function to get the database connection for the current thread, creating it if necessary.
+        SQLite connections can't be shared between threads or processes, so each one gets its own connection.
+
+        :return: Database connection
+        :rtype: sqlite3.Connection
+        """
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory, exist_ok=True)
+            # Explicit transactions are used instead of the implicit ones managed by the sqlite3 module
+            connection = sqlite3.connect(self.database_path, timeout=60, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, body BLOB, etag TEXT, '
+                               'last_modified TEXT, stored_at REAL, accessed_at REAL, size INTEGER)')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+
+def normalise_url(url):
+    """
+    A helper function to convert a URL into a standard form, so that equivalent URLs are treated as the same page.
+    The scheme and host name are made lowercase, default ports and fragments are removed,
+    and query parameters are sorted.
+
+    :param url: Page URL
+    :type url: str
+    :return: Normalised URL
+    :rtype: str
+
+    >>> normalise_url('HTTPS://www.BibleGateway.com:443/passage/?version=NIV&search=John+3&interface=print#top')
+    'https://www.biblegateway.com/passage/?interface=print&search=John+3&version=NIV'
+    >>> normalise_url('http://localhost:8080')
+    'http://localhost:8080/'
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        netloc = f'{netloc}:{parts.port}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
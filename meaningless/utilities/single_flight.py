@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import weakref
+from meaningless.utilities.exceptions import OperationCancelledError
+
+# This is a collection of helper methods and classes used to share the work of identical calls made at the same time,
+# so that concurrent searches for the same passage only send one web request and process the page once.
+
+
+class _Call:
+    """
+    The state of a call in progress, which is shared by the caller running it and all the callers waiting for it
+    """
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """
+    A thread-safe group of calls, where a call made while an identical call (with the same key) is already in progress
+    waits for the result of that call instead of running again. Results are only shared while a call is in progress,
+    so a call made after an identical call has finished runs again.
+
+    This supports both threads (using run) and coroutines (using run_async), where coroutines only share calls made
+    within the same event loop.
+
+    Instances can be passed to other processes, where they keep track of their calls and statistics separately.
+    """
+
+    def __init__(self):
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the group.
+        """
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        # Futures can only be awaited in the event loop they were created in, so each loop has its own set of calls
+        self.__async_calls = weakref.WeakKeyDictionary()
+        self.__stats = {'calls': 0, 'collapsed_calls': 0}
+
+    def __getstate__(self):
+        """
+        Sends the group to another process, without any of its calls in progress.
+        """
+        return {}
+
+    def __setstate__(self, state):
+        """
+        Restores the group received from another process.
+        """
+        self.__initialise_state()
+
+    def run(self, key, function, cancellation_token=None):
+        """
+        Runs a function, unless an identical call is already in progress, in which case its result is returned
+        instead once it finishes. Exceptions raised by the call are raised by all the callers sharing it.
+
+        :param key: Identifies the call, where calls with the same key are considered to be identical
+        :type key: collections.abc.Hashable
+        :param function: Function to run, which takes no arguments
+        :type function: callable
+        :param cancellation_token: Token used to stop waiting for an identical call. Cancelling the call being waited
+                                   for doesn't stop the callers waiting for it, which run the function again
+                                   instead. Defaults to None.
+        :type cancellation_token: CancellationToken
+        :return: Result of the function
+        :rtype: object
+        """
+        self.__increment_stat('calls')
+        while True:
+            with self.__lock:
+                call = self.__calls.get(key)
+                is_leader = call is None
+                if is_leader:
+                    call = self.__calls[key] = _Call()
+            if is_leader:
+                return self.__run_call(key, call, function)
+            if cancellation_token is None:
+                call.finished.wait()
+            else:
+                # Cancelling the token doesn't wake up this thread, so the token is checked periodically instead
+                while not call.finished.wait(cancellation_token.get_timeout(0.1)):
+                    cancellation_token.raise_if_cancelled()
+            # A cancelled or interrupted call only applies to the caller that ran it, so the function is run again
+            if call.exception is None or (isinstance(call.exception, Exception) and
+                                          not isinstance(call.exception, OperationCancelledError)):
+                break
+        self.__increment_stat('collapsed_calls')
+        if call.exception is not None:
+            raise call.exception
+        return call.result
+
+    async def run_async(self, key, coroutine_function):
+        """
+        Runs a coroutine function, unless an identical call is already in progress in the same event loop, in which
+        case its result is returned instead once it finishes. Exceptions raised by the call are raised by all the
+        callers sharing it.
+
+        :param key: Identifies the call, where calls with the same key are considered to be identical
+        :type key: collections.abc.Hashable
+        :param coroutine_function: Coroutine function to run, which takes no arguments
+        :type coroutine_function: callable
+        :return: Result of the coroutine
+        :rtype: object
+        """
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            calls = self.__async_calls.setdefault(loop, {})
+        self.__increment_stat('calls')
+        while key in calls:
+            future = calls[key]
+            # Waiting for the future rather than awaiting it directly means that cancelling this caller doesn't
+            # cancel the call that other callers are waiting for
+            await asyncio.wait([future])
+            # A cancelled call only applies to the caller that ran it, so the coroutine is run again
+            if not future.cancelled():
+                self.__increment_stat('collapsed_calls')
+                return future.result()
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await coroutine_function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exception:
+            future.set_exception(exception)
+            # The exception is raised by this caller, so the future doesn't need to report it as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            calls.pop(key, None)
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the group in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'calls' = Number of calls made,
+                 'collapsed_calls' = Number of calls that used the result of an identical call in progress, rather than
+                 running again,
+                 'in_flight' = Number of calls currently in progress
+        :rtype: dict
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['in_flight'] = len(self.__calls) + sum(len(calls) for calls in self.__async_calls.values())
+        return stats
+
+    def __run_call(self, key, call, function):
+        """
+        A helper function to run a call and share its outcome with the callers waiting for it.
+
+        :param key: Key of the call
+        :type key: collections.abc.Hashable
+        :param call: State of the call
+        :type call: _Call
+        :param function: Function to run
+        :type function: callable
+        :return: Result of the function
+        :rtype: object
+        """
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self.__lock:
+                self.__calls.pop(key, None)
+            call.finished.set()
+
+    def __increment_stat(self, stat):
+        """
+        A helper function to increase one of the usage statistics by 1.
+
+        :param stat: Name of the statistic
+        :type stat: str
+        """
+        with self.__lock:
+            self.__stats[stat] += 1
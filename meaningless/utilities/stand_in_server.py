@@ -0,0 +1,378 @@
+import gzip
+import re
+import threading
+from html import escape
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from random import Random
+from time import monotonic, sleep
+from urllib.error import HTTPError
+from urllib.parse import urlsplit, parse_qs
+from meaningless.utilities import common
+from meaningless.utilities.exceptions import MissingFixtureError
+
+# This is a collection of helper methods and classes used to run a local web server in place of the Bible Gateway
+# site, so that the Web Extractor and Downloaders can be load tested without sending any requests to Bible Gateway.
+
+# Words used to make up the synthetic passage contents
+_PASSAGE_WORDS = ['and', 'the', 'LORD', 'said', 'unto', 'them', 'of', 'his', 'people', 'land', 'went', 'out', 'into',
+                  'city', 'which', 'was', 'upon', 'earth', 'heaven', 'water', 'light', 'day', 'night', 'house', 'king',
+                  'word', 'all', 'were', 'for', 'they', 'come', 'before', 'after', 'great', 'mountain', 'river',
+                  'servant', 'hand', 'behold']
+# Matches searches such as 'Psalm 3', 'Psalm 3:1', 'Psalm 3 - 5', 'Psalm 3:1 - 8' and 'Psalm 3:1 - 5:12'
+_SEARCH_PATTERN = re.compile(r'^\s*(?P<book>.+?)\s+(?P<chapter_from>\d+)(?::(?P<passage_from>\d+))?'
+                             r'(?:\s*-\s*(?:(?P<chapter_to>\d+):)?(?P<end>\d+))?\s*$')
+
+
+class StandInServer:
+    """
+    A local web server that mimics the printer-friendly search results pages of the Bible Gateway site, which are
+    found at /passage/?version=...&search=...&interface=print. Any search for a valid passage of a supported
+    translation (covering all of its chapters) returns a synthetically generated page with the same structure as a
+    Bible Gateway page, unless the page has been recorded in a fixture store, in which case the recorded page is
+    returned instead.
+
+    The server can also add latency, fail a fraction of requests and throttle requests with 429 responses, so that
+    the concurrency and retry behaviour of the Web Extractor and Downloaders can be tested. These can be pointed at
+    the server using their base_url parameter.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, latency_jitter=0, error_rate=0,
+                 max_requests_per_second=None, retry_after=1, fixture_store=None, seed=None,
+                 max_passages_per_page=None):
+        """
+        :param host: Host name or IP address to listen on. Defaults to '127.0.0.1'.
+        :type host: str
+        :param port: Port to listen on. Defaults to 0, which uses any free port.
+        :type port: int
+        :param latency: Number of seconds to wait before responding to each request. Defaults to 0.
+        :type latency: int or float
+        :param latency_jitter: Maximum number of seconds randomly added to the latency of each request. Defaults to 0.
+        :type latency_jitter: int or float
+        :param error_rate: Fraction of requests that fail with a 500 response, from 0 to 1. Defaults to 0.
+        :type error_rate: float
+        :param max_requests_per_second: Maximum number of requests handled within each second, after which requests
+                                        are throttled with a 429 response. Defaults to None, which never throttles
+                                        requests.
+        :type max_requests_per_second: int
+        :param retry_after: Number of seconds sent in the Retry-After header of throttled responses. Defaults to 1.
+        :type retry_after: int
+        :param fixture_store: When specified, pages recorded in this store from the Bible Gateway site are returned
+                              instead of synthetic pages. Defaults to None, which only returns synthetic pages.
+        :type fixture_store: FixtureStore
+        :param seed: Seed of the random number generator used to add latency and fail requests, which makes this
+                     behaviour reproducible. Defaults to None, which uses a different seed each time.
+        :type seed: int
+        :param max_passages_per_page: Maximum number of passages in each synthetic page, after which the rest of the
+                                      search is cut off, as Bible Gateway does for very long searches.
+                                      Defaults to None, which returns every passage.
+        :type max_passages_per_page: int
+        """
+        self.latency = max(0, latency)
+        self.latency_jitter = max(0, latency_jitter)
+        self.error_rate = min(max(0, error_rate), 1)
+        self.max_requests_per_second = max_requests_per_second
+        self.retry_after = retry_after
+        self.fixture_store = fixture_store
+        self.max_passages_per_page = max_passages_per_page
+        self.__random = Random(seed)
+        self.__lock = threading.Lock()
+        self.__window_start = monotonic()
+        self.__window_requests = 0
+        self.__stats = {'requests': 0, 'generated_pages': 0, 'recorded_pages': 0, 'errors': 0, 'throttled': 0}
+        self.__thread = None
+        self.__http_server = ThreadingHTTPServer((host, port), _StandInRequestHandler)
+        self.__http_server.daemon_threads = True
+        self.__http_server.stand_in_server = self
+        bound_host, bound_port = self.__http_server.server_address[:2]
+        self.base_url = f'http://{bound_host}:{bound_port}'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts handling requests in a background thread.
+
+        :return: This server, so that it can be started as part of a with statement
+        :rtype: StandInServer
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__http_server.serve_forever, daemon=True)
+            self.__thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Handles requests in the current thread until the server is stopped from another thread.
+        """
+        self.__http_server.serve_forever()
+
+    def stop(self):
+        """
+        Stops handling requests and closes the server, which can't be started again afterwards.
+        """
+        if self.__thread is not None:
+            self.__http_server.shutdown()
+            self.__thread.join()
+        self.__http_server.server_close()
+
+    def get_stats(self):
+        """
+        Gets the statistics of the requests handled by the server.
+
+        :return: A copy of the statistics, with the following keys:
+                 'requests' = Number of requests received,
+                 'generated_pages' = Number of synthetic pages returned,
+                 'recorded_pages' = Number of pages returned from the fixture store,
+                 'errors' = Number of requests that randomly failed,
+                 'throttled' = Number of requests that were throttled
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    def _get_response(self, path):
+        """
+        A helper function to determine the response to a request, after waiting for the latency of the request.
+
+        :param path: Path of the request, including its query
+        :type path: str
+        :return: Tuple containing the status code, the response headers and the page contents
+        :rtype: tuple
+        """
+        with self.__lock:
+            self.__stats['requests'] += 1
+            now = monotonic()
+            if now - self.__window_start >= 1:
+                self.__window_start = now
+                self.__window_requests = 0
+            self.__window_requests += 1
+            is_throttled = self.max_requests_per_second is not None and \
+                self.__window_requests > self.max_requests_per_second
+            is_error = not is_throttled and self.__random.random() < self.error_rate
+            delay = self.latency + self.__random.uniform(0, self.latency_jitter)
+            if is_throttled:
+                self.__stats['throttled'] += 1
+            elif is_error:
+                self.__stats['errors'] += 1
+        # Throttled requests are rejected straight away, as they would be by a real web server
+        if is_throttled:
+            return HTTPStatus.TOO_MANY_REQUESTS, {'Retry-After': str(self.retry_after)}, ''
+        sleep(delay)
+        if is_error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, ''
+
+        url_parts = urlsplit(path)
+        if url_parts.path.rstrip('/') != '/passage':
+            return HTTPStatus.NOT_FOUND, {}, ''
+        if self.fixture_store is not None:
+            try:
+                page = self.fixture_store.replay(f'{common.BIBLE_GATEWAY_URL}{path}')
+            except MissingFixtureError:
+                pass
+            except HTTPError as exception:
+                return exception.code, {}, ''
+            else:
+                self.__increment_stat('recorded_pages')
+                return HTTPStatus.OK, {}, page
+        query = parse_qs(url_parts.query)
+        page = generate_passage_page(query.get('search', [''])[0], query.get('version', ['NIV'])[0],
+                                     self.max_passages_per_page)
+        self.__increment_stat('generated_pages')
+        return HTTPStatus.OK, {}, page
+
+    def __increment_stat(self, stat):
+        """
+        A helper function to increase one of the request statistics by 1.
+
+        :param stat: Name of the statistic
+        :type stat: str
+        """
+        with self.__lock:
+            self.__stats[stat] += 1
+
+
+class _StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    A request handler that sends the responses determined by the stand-in server
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status, headers, page = self.server.stand_in_server._get_response(self.path)
+        body = page.encode('utf-8')
+        if body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # Clients can interrupt their requests at any time, such as when a web request is cancelled
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Suppress request logging, since the server is expected to handle a very large number of requests
+        pass
+
+
+def generate_passage_page(search, translation='NIV', max_passages=None):
+    """
+    Generates a search results page with the same structure as a printer-friendly Bible Gateway page, which contains
+    synthetic passage contents. The same search always generates the same page.
+    Searches for multiple passages can be separated by semicolons, and searches for invalid passages generate a page
+    without any passage contents, as they would on Bible Gateway.
+
+    :param search: Search text, such as 'Psalm 3:1 - 5:12'
+    :type search: str
+    :param translation: Translation code, which determines the number of chapters in each book. Defaults to 'NIV'.
+    :type translation: str
+    :param max_passages: Maximum number of passages in the page, after which the remaining passages are left out.
+                         Defaults to None, which includes every passage.
+    :type max_passages: int
+    :return: Page contents
+    :rtype: str
+
+    >>> page = generate_passage_page('Psalm 150:6')
+    >>> '<span class="chapternum">150 </span>' in page
+    False
+    >>> '<sup class="versenum">6 </sup>' in page
+    True
+    >>> generate_passage_page('Psalm 151').count('passage-content')
+    0
+    >>> generate_passage_page('Genesis 50 - 51; John 3:16').count('passage-content')
+    2
+    >>> page = generate_passage_page('Psalm 3 - 5', max_passages=3)
+    >>> '<sup class="versenum">3 </sup>' in page
+    True
+    >>> '<sup class="versenum">4 </sup>' in page
+    False
+    """
+    sections = []
+    remaining_passages = max_passages
+    for passage_search in search.split(';'):
+        section, passage_count = _generate_passage_section(passage_search.strip(), translation, remaining_passages)
+        if section is not None:
+            sections.append(section)
+        if remaining_passages is not None:
+            remaining_passages -= passage_count
+    passage_contents = ''.join(sections)
+    return f'<!DOCTYPE html><html><head><title>{escape(search)} - Bible Gateway</title></head><body>' \
+           f'<div class="passage-text">{passage_contents}</div></body></html>'
+
+
+def get_passage_count(book, chapter, translation='NIV'):
+    """
+    Gets the number of passages in a chapter of a synthetic page, which is always between 10 and 40.
+
+    :param book: Name of the book
+    :type book: str
+    :param chapter: Chapter number
+    :type chapter: int
+    :param translation: Translation code. Defaults to 'NIV'.
+    :type translation: str
+    :return: Number of passages
+    :rtype: int
+
+    >>> get_passage_count('Psalm', 119) == get_passage_count('Psalm', 119)
+    True
+    """
+    return Random(f'{translation.upper()} {book.title()} {chapter}').randint(10, 40)
+
+
+def _generate_passage_section(search, translation, max_passages=None):
+    """
+    A helper function to generate the passage contents of a single search.
+
+    :param search: Search text for a single passage range
+    :type search: str
+    :param translation: Translation code
+    :type translation: str
+    :param max_passages: Maximum number of passages to generate. Defaults to None, which generates every passage.
+    :type max_passages: int
+    :return: Tuple containing the HTML of the passage contents (None if the search is invalid) and the number of
+             passages generated
+    :rtype: tuple
+    """
+    match = _SEARCH_PATTERN.match(search)
+    if match is None:
+        return None, 0
+    book = match.group('book')
+    chapter_count = common.get_chapter_count(book, translation)
+    chapter_from = int(match.group('chapter_from'))
+    end = int(match.group('end')) if match.group('end') else None
+    if match.group('chapter_to'):
+        chapter_to, passage_to = int(match.group('chapter_to')), end
+    elif match.group('passage_from') or end is None:
+        chapter_to, passage_to = chapter_from, end
+    else:
+        # A range without a passage number at the start is a range of whole chapters
+        chapter_to, passage_to = end, None
+    passage_from = int(match.group('passage_from')) if match.group('passage_from') else 1
+    if match.group('passage_from') and end is None and not match.group('chapter_to'):
+        passage_to = passage_from
+
+    chapter_to = min(chapter_to, chapter_count)
+    if chapter_from < 1 or chapter_from > chapter_to:
+        return None, 0
+    paragraphs = []
+    passage_count = 0
+    abbreviation = re.sub(r'\W', '', book.title())[:3]
+    for chapter in range(chapter_from, chapter_to + 1):
+        first = passage_from if chapter == chapter_from else 1
+        last = get_passage_count(book, chapter, translation)
+        if chapter == chapter_to and passage_to is not None:
+            last = min(last, passage_to)
+        if max_passages is not None:
+            last = min(last, first + max_passages - passage_count - 1)
+        if first > last:
+            continue
+        passage_count += last - first + 1
+        paragraphs.append(f'<h3><span class="text {abbreviation}-{chapter}-{first}">Chapter {chapter}</span></h3>')
+        passages = []
+        for passage in range(first, last + 1):
+            number = f'<span class="chapternum">{chapter} </span>' if passage == 1 \
+                else f'<sup class="versenum">{passage} </sup>'
+            passages.append(f'<span class="text {abbreviation}-{chapter}-{passage}">{number}'
+                            f'{_generate_passage_text(book, chapter, passage, translation)}'
+                            f'<sup class="crossreference">(<a href="#c-{chapter}{passage}">a</a>)</sup></span>')
+        paragraphs.append(f'<p>{" ".join(passages)}</p>')
+    if not paragraphs:
+        return None, passage_count
+    return f'<div class="passage-content passage-class-0"><h1 class="passage-display">{escape(search)}</h1>' \
+           f'{"".join(paragraphs)}<div class="footnotes"><h4>Footnotes</h4></div></div>', passage_count
+
+
+def _generate_passage_text(book, chapter, passage, translation):
+    """
+    A helper function to generate the text of a single passage, which is the same every time.
+
+    :param book: Name of the book
+    :type book: str
+    :param chapter: Chapter number
+    :type chapter: int
+    :param passage: Passage number
+    :type passage: int
+    :param translation: Translation code
+    :type translation: str
+    :return: Passage text
+    :rtype: str
+    """
+    random = Random(f'{translation.upper()} {book.title()} {chapter}:{passage}')
+    text = ' '.join(random.choice(_PASSAGE_WORDS) for _ in range(0, random.randint(8, 30)))
+    return f'{text[0].upper()}{text[1:]}.'
+
+
+if __name__ == "__main__":
+    # Run this section when run as a standalone script. Don't run this part when being imported.
+    import doctest
+    doctest.testmod(verbose=True, optionflags=doctest.ELLIPSIS)
@@ -0,0 +1,157 @@
+import importlib
+import multiprocessing
+import threading
+
+# This is a collection of helper methods and classes used to keep a set of worker processes running between downloads,
+# so that the cost of starting processes and importing modules in them is only paid once.
+
+
+def _preload_modules(module_names):
+    """
+    A helper function that runs when each worker process starts, which imports modules ahead of time so that the
+    first task sent to the process doesn't have to wait for them to be imported.
+
+    :param module_names: Names of the modules to import
+    :type module_names: tuple
+    """
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+class WorkerPool:
+    """
+    A thread-safe, reusable pool of worker processes. The processes are started when the pool is first used, and keep
+    running until the pool is closed, so the same processes can be used by many downloads.
+
+    Instances can be passed to other processes, but only the configuration of the pool is sent, since worker
+    processes can't be shared between processes.
+    """
+
+    def __init__(self, processes=None, start_method=None, preload_modules=('meaningless.bible_web_extractor',)):
+        """
+        :param processes: Number of worker processes. Defaults to None, which uses the number of CPUs.
+        :type processes: int
+        :param start_method: Method used to start the worker processes, which is either 'fork', 'forkserver' or
+                             'spawn'. Not all methods are available on every platform. Defaults to None, which uses the
+                             default method of the platform.
+        :type start_method: str
+        :param preload_modules: Names of the modules to import in each worker process as soon as it starts. When using
+                                the 'forkserver' start method, these are also imported by the fork server, so that
+                                worker processes start with the modules already imported.
+                                Defaults to the module of the Web Extractor.
+        :type preload_modules: collections.abc.Iterable[str]
+        """
+        # Fail fast on an unsupported start method, rather than when the pool is first used
+        multiprocessing.get_context(start_method)
+        self.processes = max(1, processes) if processes is not None else None
+        self.start_method = start_method
+        self.preload_modules = tuple(preload_modules) if preload_modules else ()
+        self.__initialise_state()
+
+    def __initialise_state(self):
+        """
+        A helper function to set up the process-specific state of the pool.
+        """
+        self.__lock = threading.Lock()
+        self.__pool = None
+        self.__stats = {'starts': 0, 'tasks': 0, 'terminations': 0}
+
+    def __getstate__(self):
+        """
+        Sends the pool configuration to another process, rather than its worker processes.
+        """
+        return {'processes': self.processes, 'start_method': self.start_method,
+                'preload_modules': self.preload_modules}
+
+    def __setstate__(self, state):
+        """
+        Restores the pool configuration received from another process, without starting any worker processes.
+        """
+        self.__dict__.update(state)
+        self.__initialise_state()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def is_running(self):
+        """
+        True if the worker processes have been started and the pool hasn't been closed since.
+        """
+        with self.__lock:
+            return self.__pool is not None
+
+    def apply_async(self, function, args=(), callback=None, error_callback=None):
+        """
+        Runs a function in one of the worker processes, starting the worker processes if they aren't running.
+
+        :param function: Function to run, which must be able to be sent to another process
+        :type function: callable
+        :param args: Arguments of the function. Defaults to no arguments.
+        :type args: tuple
+        :param callback: Function called with the result of the function, if it succeeds. Defaults to None.
+        :type callback: callable
+        :param error_callback: Function called with the exception raised by the function, if it fails.
+                               Defaults to None.
+        :type error_callback: callable
+        :return: Result of the function, which can be waited for
+        :rtype: multiprocessing.pool.AsyncResult
+        """
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = self.__start_pool()
+                self.__stats['starts'] += 1
+            self.__stats['tasks'] += 1
+            return self.__pool.apply_async(function, args, callback=callback, error_callback=error_callback)
+
+    def terminate(self):
+        """
+        Stops the worker processes immediately, including any functions still running in them.
+        New worker processes are started if the pool is used again.
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+            if pool is not None:
+                self.__stats['terminations'] += 1
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def close(self):
+        """
+        Waits for the functions already sent to the worker processes to finish, and then stops the worker processes.
+        New worker processes are started if the pool is used again.
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def get_stats(self):
+        """
+        Gets the usage statistics of the pool in the current process.
+
+        :return: A copy of the statistics, with the following keys:
+                 'starts' = Number of times the worker processes were started,
+                 'tasks' = Number of functions sent to the worker processes,
+                 'terminations' = Number of times the worker processes were stopped immediately
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    def __start_pool(self):
+        """
+        A helper function to start the worker processes.
+
+        :return: Pool of worker processes
+        :rtype: multiprocessing.pool.Pool
+        """
+        context = multiprocessing.get_context(self.start_method)
+        if self.preload_modules and context.get_start_method() == 'forkserver':
+            context.set_forkserver_preload(list(self.preload_modules))
+        return context.Pool(self.processes, initializer=_preload_modules, initargs=(self.preload_modules,))
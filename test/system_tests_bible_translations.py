@@ -1,9 +1,11 @@
 import unittest
 import multiprocessing
 import sys
+from importlib.util import find_spec
 sys.path.append('../')
 from meaningless import WebExtractor, JSONDownloader, JSONExtractor
 from meaningless.utilities import common
+from meaningless.utilities.response_cache import ResponseCache
 
 
 class UnitTests(unittest.TestCase):
@@ -69,6 +71,40 @@ class UnitTests(unittest.TestCase):
                                                     actual_result=actual_passage_results[expected_passage_index],
                                                     is_baseline=True)
 
+    def check_html_parser_equivalence(self, translation, translation_contains_ot=True):
+        """
+        Checks that a translation returns the same results for a basic set of passages, regardless of which of the
+        installed HTML parsers or extraction engines is used to process the downloaded pages
+
+        :param translation: Translation code for the tests. For example, 'NIV', 'ESV', 'NLT'
+        :type translation: str
+        :param translation_contains_ot: Indicates if the translation contains the Old Testament. Defaults to True.
+        :type translation_contains_ot: bool
+        """
+        # Each page only needs to be downloaded once, as the same pages are then processed by each parser
+        response_cache = ResponseCache(f'./tmp/check_html_parser_equivalence/{translation}')
+        passage_names = ['Revelation 21:25', 'Matthew 1:1 - 3', 'John 7:53', 'Mark 9:42 - 50']
+        if translation_contains_ot:
+            passage_names += ['Nehemiah 7:40 - 42', 'Psalm 32:4', 'Psalm 83', 'Ezekiel 40:1 - 10']
+        # The built-in parser is always available, so it is used as the reference for the other parsers
+        parsers = ['lxml', 'html5lib']
+        for output_as_list in [False, True]:
+            bible = WebExtractor(translation=translation, output_as_list=output_as_list, parser='html.parser',
+                                 response_cache=response_cache)
+            expected_results = [bible.search(passage_name) for passage_name in passage_names]
+            for parser in parsers:
+                if find_spec(parser) is None:
+                    # Parsers which are not installed can't be compared
+                    continue
+                bible = WebExtractor(translation=translation, output_as_list=output_as_list, parser=parser,
+                                     response_cache=response_cache)
+                actual_results = [bible.search(passage_name) for passage_name in passage_names]
+                self.assertEqual(expected_results, actual_results, f'Passages are different when using {parser}')
+            bible = WebExtractor(translation=translation, output_as_list=output_as_list, engine='stream',
+                                 response_cache=response_cache)
+            actual_results = [bible.search(passage_name) for passage_name in passage_names]
+            self.assertEqual(expected_results, actual_results, 'Passages are different when using the stream engine')
+
     def check_omitted_passages(self, translation):
         """
         Checks that a translation can return the correct results for all known passages which can be omitted
@@ -142,166 +178,199 @@ class UnitTests(unittest.TestCase):
     def test_translation_niv(self):
         translation = 'NIV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nasb(self):
         translation = 'NASB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nkjv(self):
         translation = 'NKJV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nrsv(self):
         translation = 'NRSV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_esv(self):
         translation = 'ESV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_web(self):
         translation = 'WEB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nlt(self):
         translation = 'NLT'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_kjv(self):
         translation = 'KJV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_asv(self):
         translation = 'ASV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_ylt(self):
         translation = 'YLT'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_net(self):
         translation = 'NET'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nlv(self):
         translation = 'NLV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_kj21(self):
         translation = 'KJ21'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_akjv(self):
         translation = 'AKJV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_mev(self):
         translation = 'MEV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_leb(self):
         translation = 'LEB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_brg(self):
         translation = 'BRG'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_ehv(self):
         translation = 'EHV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_esvuk(self):
         translation = 'ESVUK'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_gw(self):
         translation = 'GW'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_isv(self):
         translation = 'ISV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_jub(self):
         translation = 'JUB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nog(self):
         translation = 'NOG'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nasb1995(self):
         translation = 'NASB1995'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_gnv(self):
         translation = 'GNV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_rva(self):
         translation = 'RVA'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nivuk(self):
         translation = 'NIVUK'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nrsvue(self):
         translation = 'NRSVUE'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_nmb(self):
         translation = 'NMB'
         self.check_baseline_passages(translation, translation_contains_ot=False)
+        self.check_html_parser_equivalence(translation, translation_contains_ot=False)
         self.check_omitted_passages(translation)
 
     def test_translation_amp(self):
         translation = 'AMP'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_lsb(self):
         translation = 'LSB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_csb(self):
         translation = 'CSB'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
     def test_translation_rsv(self):
         translation = 'RSV'
         self.check_baseline_passages(translation)
+        self.check_html_parser_equivalence(translation)
         self.check_omitted_passages(translation)
 
 
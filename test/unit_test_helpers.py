@@ -0,0 +1,72 @@
+import unittest
+import os
+import shutil
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# This is a collection of helper methods and classes shared by the unit tests which send web requests to a local web
+# server or need an empty directory to write to.
+
+
+def get_empty_directory(group, name):
+    """
+    A helper function to get an empty directory for a test, which is created if it doesn't exist
+    :param group: Name of the directory containing the directories of related tests, such as the module being tested
+    :type group: str
+    :param name: Name of the directory, such as the name of the test
+    :type name: str
+    :return: Directory path
+    :rtype: str
+    """
+    directory = f'./tmp/{group}/{name}'
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    return directory
+
+
+class BaseLocalRequestHandler(BaseHTTPRequestHandler):
+    """
+    A request handler for a local web server, which keeps connections alive between requests.
+    Subclasses implement do_GET to decide how each request is answered.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def send_body(self, body=b'', status=200, headers=None):
+        """
+        A helper function to send a complete response
+        :param body: Contents of the response. Defaults to no contents.
+        :type body: bytes
+        :param status: Status code of the response. Defaults to 200.
+        :type status: int
+        :param headers: Additional response headers, keyed on header name. Defaults to None.
+        :type headers: dict
+        """
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Suppress request logging to keep the test output clean
+        pass
+
+
+class LocalServerTestCase(unittest.TestCase):
+    """
+    A test case which runs a local web server for all of its tests, using the request handler of the test case
+    """
+    request_handler = BaseLocalRequestHandler
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), cls.request_handler)
+        cls.server.daemon_threads = True
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import asyncio
+sys.path.append('../')
+from meaningless import AsyncWebExtractor, WebExtractor, InvalidSearchError, UnsupportedTranslationError
+from meaningless.utilities.stand_in_server import StandInServer
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def run_extractor(coroutine_function, **kwargs):
+        """
+        A helper function to run a coroutine using a new Async Web Extractor
+        :param coroutine_function: Function that takes the extractor and returns a coroutine
+        :type coroutine_function: callable
+        :param kwargs: Options used to create the extractor
+        :return: Result of the coroutine
+        """
+        async def run():
+            async with AsyncWebExtractor(**kwargs) as bible:
+                return await coroutine_function(bible)
+        return asyncio.run(run())
+
+    def test_get_passage(self):
+        text = self.run_extractor(lambda bible: bible.get_passage('Ecclesiastes', 1, 17))
+        self.assertEqual('¹⁷ Then I applied myself to the understanding of wisdom, and also of '
+                         'madness and folly, but I learned that this, too, is a chasing after the wind.', text,
+                         'Passage is incorrect')
+
+    def test_get_passage_invalid(self):
+        self.assertRaises(InvalidSearchError, self.run_extractor, lambda bible: bible.search('Barnabas 7'))
+
+    def test_get_passage_unsupported_translation(self):
+        self.assertRaises(UnsupportedTranslationError, self.run_extractor,
+                          lambda bible: bible.search('Ecclesiastes 1:17'), translation='msg')
+
+    def test_get_passage_range(self):
+        text = self.run_extractor(lambda bible: bible.get_passage_range('Ecclesiastes', 1, 17, 3, 2))
+        self.assertEqual(WebExtractor().get_passage_range('Ecclesiastes', 1, 17, 3, 2), text, 'Passage is incorrect')
+
+    def test_get_passage_range_as_list(self):
+        passages = self.run_extractor(lambda bible: bible.get_chapters('Ecclesiastes', 1, 3), output_as_list=True,
+                                      max_concurrent_requests=2)
+        self.assertEqual(WebExtractor(output_as_list=True).get_chapters('Ecclesiastes', 1, 3), passages,
+                         'Passage is incorrect')
+
+    def test_get_chapters_with_combined_requests(self):
+        passages = self.run_extractor(lambda bible: bible.get_chapters('Ecclesiastes', 1, 12),
+                                      max_chapters_per_request=5)
+        self.assertEqual(WebExtractor(max_chapters_per_request=1).get_chapters('Ecclesiastes', 1, 12), passages,
+                         'Passage is incorrect')
+
+    def test_inherited_passage_range_helper(self):
+        with StandInServer() as server:
+            bible = AsyncWebExtractor(base_url=server.base_url, max_chapters_per_request=3)
+            # The synchronous helper inherited from the Web Extractor still gets passages without an event loop
+            self.assertEqual(WebExtractor(base_url=server.base_url).get_passage_range('Ruth', 1, 3, 4, 5),
+                             bible._get_passage_range('Ruth', 1, 3, 4, 5), 'Passages are incorrect')
+
+    def test_get_book(self):
+        text = self.run_extractor(lambda bible: bible.get_book('Philemon'))
+        self.assertEqual(WebExtractor().get_book('Philemon'), text, 'Passage is incorrect')
+
+    def test_search_multiple(self):
+        text = self.run_extractor(lambda bible: bible.search_multiple(['Ecclesiastes 1:17', 'Philemon 1:1']))
+        self.assertEqual(WebExtractor().search_multiple(['Ecclesiastes 1:17', 'Philemon 1:1']), text,
+                         'Passage is incorrect')
+
+    def test_concurrent_searches(self):
+        searches = ['Ecclesiastes 1:17', 'Ecclesiastes 2:1', 'Ecclesiastes 3:1', 'Ecclesiastes 4:1']
+
+        async def search_all(bible):
+            return await asyncio.gather(*[bible.search(search) for search in searches])
+
+        passages = self.run_extractor(search_all, max_concurrent_requests=2)
+        bible = WebExtractor()
+        self.assertEqual([bible.search(search) for search in searches], passages, 'Passages are incorrect')
+
+    def test_iter_passages(self):
+        async def collect(bible, in_order):
+            return [item async for item in bible.iter_chapters('Ruth', 1, 4, in_order)]
+        with StandInServer(latency_jitter=0.2, seed=1) as server:
+            bible = WebExtractor(base_url=server.base_url, max_chapters_per_request=1)
+            expected_items = list(bible.iter_chapters('Ruth', 1, 4))
+            options = {'base_url': server.base_url, 'max_chapters_per_request': 1}
+            self.assertEqual(expected_items, self.run_extractor(lambda bible: collect(bible, True), **options),
+                             'Passages are incorrect')
+            items = self.run_extractor(lambda bible: collect(bible, False), **options)
+            self.assertEqual(expected_items, sorted(items, key=lambda item: (item.sequence, item.passage)),
+                             'Passages are incorrect')
+
+    def test_iter_book_stopped_early(self):
+        async def get_first_item(bible):
+            items = bible.iter_book('Psalm')
+            first_item = await items.__anext__()
+            await items.aclose()
+            return first_item
+        with StandInServer(latency=0.2) as server:
+            first_item = self.run_extractor(get_first_item, base_url=server.base_url, max_chapters_per_request=1,
+                                            max_concurrent_requests=2)
+            self.assertEqual((1, 1), (first_item.chapter, first_item.passage), 'First passage is incorrect')
+            self.assertLessEqual(server.get_stats()['requests'], 3, 'Remaining chapters should not be requested')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,13 @@
 import unittest
+import os
 import sys
+import shutil
 from timeit import default_timer
 sys.path.append('../')
-from meaningless import yaml_file_interface, InvalidSearchError, InvalidPassageError, UnsupportedTranslationError
+from meaningless import yaml_file_interface, InvalidSearchError, InvalidPassageError, UnsupportedTranslationError, \
+    OperationCancelledError, DeadlineExceededError
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.stand_in_server import StandInServer
 from meaningless.bible_base_downloader import BaseDownloader
 
 
@@ -262,6 +267,25 @@ class UnitTests(unittest.TestCase):
                                translation='test_unsupported_translation')
         self.assertRaises(UnsupportedTranslationError, bible.download_book, 'Ecclesiastes')
 
+    def test_base_download_with_deadline(self):
+        download_path = './tmp/test_base_download_with_deadline/'
+        for enable_multiprocessing in [True, False]:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   translation=self.get_test_translation(),
+                                   enable_multiprocessing=enable_multiprocessing)
+            start_time = default_timer()
+            self.assertRaises(DeadlineExceededError, bible.download_book, 'Psalms', deadline=0.5)
+            self.assertLess(default_timer() - start_time, 5, 'Download did not stop at the deadline')
+
+    def test_base_download_cancelled(self):
+        download_path = './tmp/test_base_download_cancelled/'
+        bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                               translation=self.get_test_translation())
+        cancellation_token = CancellationToken()
+        cancellation_token.cancel()
+        self.assertRaises(OperationCancelledError, bible.download_chapters, 'Psalms', 1, 20,
+                          cancellation_token=cancellation_token)
+
     def test_base_download_on_translation_with_versenum_tags(self):
         download_path = './tmp/test_base_download_with_valid_empty_passage/'
         bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
@@ -272,6 +296,123 @@ class UnitTests(unittest.TestCase):
         self.assertEqual(len(downloaded_file['Mark'][9]), 1, 'Incorrect number of passages downloaded')
         self.assertEqual(downloaded_file['Mark'][9][44], expected_contents, 'Passage contents do not match')
 
+    def test_base_download_executors(self):
+        documents = {}
+        with StandInServer(latency=0.02) as server:
+            for executor in ['serial', 'thread', 'process', 'async']:
+                download_path = f'./tmp/test_base_download_executors/{executor}'
+                with BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                    base_url=server.base_url, executor=executor, concurrency=3) as bible:
+                    self.assertEqual(1, bible.download_book('Ruth'), 'Download was not successful')
+                documents[executor] = yaml_file_interface.read(f'{download_path}/Ruth')['Ruth']
+        self.assertEqual(4, len(documents['serial']), 'Chapter count is incorrect')
+        for executor, document in documents.items():
+            self.assertEqual(documents['serial'], document, f'Passage contents do not match for {executor}')
+
+    def test_base_download_without_multiprocessing(self):
+        download_path = './tmp/test_base_download_without_multiprocessing/'
+        with StandInServer(latency=0.1) as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, enable_multiprocessing=False, max_chapters_per_request=1)
+            start_time = default_timer()
+            self.assertEqual(1, bible.download_book('Ruth'), 'Download was not successful')
+            elapsed_time = default_timer() - start_time
+            requests = server.get_stats()['requests']
+        self.assertEqual(4, requests, 'Each chapter should be retrieved in a separate request')
+        # Every request waits for the latency of the server, so requests sent one at a time can't finish any sooner
+        self.assertGreaterEqual(elapsed_time, requests * server.latency, 'Web requests were sent concurrently')
+
+    def test_base_download_async_executor_cancelled(self):
+        download_path = './tmp/test_base_download_async_executor_cancelled/'
+        with StandInServer(latency=1) as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='async')
+            start_time = default_timer()
+            self.assertRaises(DeadlineExceededError, bible.download_book, 'Psalm', deadline=0.2)
+            self.assertLess(default_timer() - start_time, 1, 'Download was not stopped at the deadline')
+
+    def test_base_download_invalid_executor(self):
+        self.assertRaises(ValueError, BaseDownloader, file_writing_function=yaml_file_interface.write,
+                          executor='fibre')
+
+    def test_base_download_translation(self):
+        with StandInServer(latency=0.01) as server:
+            for executor in ['thread', 'process']:
+                download_path = f'./tmp/test_base_download_translation/{executor}'
+                with BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                    base_url=server.base_url, executor=executor) as bible:
+                    requests = server.get_stats()['requests']
+                    self.assertEqual(27, bible.download_translation('NT'), 'Book count is incorrect')
+                    # Each group of up to 9 consecutive chapters of an average length is retrieved in a single web
+                    # request, and the last chapter of each book is retrieved separately, instead of 260 requests
+                    self.assertEqual(65, server.get_stats()['requests'] - requests, 'Request count is incorrect')
+                    bible.download_book('Jude', f'{download_path}/Jude (book)')
+                self.assertEqual(yaml_file_interface.read(f'{download_path}/Jude (book)')['Jude'],
+                                 yaml_file_interface.read(f'{download_path}/Jude')['Jude'],
+                                 f'Passage contents do not match for {executor}')
+                self.assertEqual(22, len(yaml_file_interface.read(f'{download_path}/Revelation')['Revelation']),
+                                 f'Chapter count is incorrect for {executor}')
+
+    def test_base_download_translation_writes_finished_books(self):
+        download_path = './tmp/test_base_download_translation_writes_finished_books'
+        shutil.rmtree(download_path, ignore_errors=True)
+        with StandInServer(latency=0.2) as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='serial')
+            self.assertRaises(DeadlineExceededError, bible.download_translation, 'NT', deadline=2)
+        self.assertEqual(28, len(yaml_file_interface.read(f'{download_path}/Matthew')['Matthew']),
+                         'Finished book was not written')
+        self.assertRaises(FileNotFoundError, yaml_file_interface.read, f'{download_path}/Revelation')
+
+    def test_base_download_translation_without_testament(self):
+        # The New Matthew Bible only contains the New Testament
+        bible = BaseDownloader(file_writing_function=yaml_file_interface.write, translation='NMB',
+                               default_directory='./tmp/test_base_download_translation_without_testament')
+        self.assertEqual(0, bible.download_translation('OT'), 'No books should be downloaded')
+
+    def test_base_download_translation_invalid_testament(self):
+        bible = BaseDownloader(file_writing_function=yaml_file_interface.write)
+        self.assertRaises(ValueError, bible.download_translation, 'Apocrypha')
+
+    def test_base_refresh_book(self):
+        download_path = './tmp/test_base_refresh_book'
+        shutil.rmtree(download_path, ignore_errors=True)
+        with StandInServer() as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='thread',
+                                   file_reading_function=yaml_file_interface.read)
+            self.assertEqual([1, 2, 3, 4], bible.refresh_book('Ruth'), 'Missing file should be written entirely')
+            expected_document = yaml_file_interface.read(f'{download_path}/Ruth')
+            document = yaml_file_interface.read(f'{download_path}/Ruth')
+            document['Ruth'][2][3] = 'Edited passage'
+            document['Ruth'][5] = {1: 'Extra chapter'}
+            yaml_file_interface.write(f'{download_path}/Ruth', document)
+            self.assertEqual([2, 5], bible.refresh_book('Ruth'), 'Changed chapters are incorrect')
+            self.assertEqual(expected_document['Ruth'], yaml_file_interface.read(f'{download_path}/Ruth')['Ruth'],
+                             'File was not rewritten')
+            modified_time = os.path.getmtime(f'{download_path}/Ruth')
+            self.assertEqual([], bible.refresh_book('Ruth'), 'Unchanged file should not have any changed chapters')
+            self.assertEqual(modified_time, os.path.getmtime(f'{download_path}/Ruth'), 'Unchanged file was rewritten')
+
+    def test_base_refresh_translation(self):
+        download_path = './tmp/test_base_refresh_translation'
+        shutil.rmtree(download_path, ignore_errors=True)
+        with StandInServer() as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='thread',
+                                   file_reading_function=yaml_file_interface.read)
+            self.assertEqual(27, bible.download_translation('NT'), 'Book count is incorrect')
+            document = yaml_file_interface.read(f'{download_path}/Jude')
+            document['Jude'][1][1] = 'Edited passage'
+            yaml_file_interface.write(f'{download_path}/Jude', document)
+            self.assertEqual({'Jude': [1]}, bible.refresh_translation('NT'), 'Changed chapters are incorrect')
+            self.assertEqual({}, bible.refresh_translation('NT'), 'No books should have changed')
+
+    def test_base_refresh_without_reading_function(self):
+        bible = BaseDownloader(file_writing_function=yaml_file_interface.write)
+        self.assertRaises(ValueError, bible.refresh_book, 'Ruth')
+        self.assertRaises(ValueError, bible.refresh_translation)
+
 
 if __name__ == "__main__":
     unittest.main()
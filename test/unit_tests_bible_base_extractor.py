@@ -1,5 +1,6 @@
 import unittest
 import sys
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append('../')
 from meaningless import UnsupportedTranslationError, TranslationMismatchError, InvalidPassageError
 from meaningless.bible_base_extractor import BaseExtractor
@@ -563,6 +564,30 @@ class UnitTests(unittest.TestCase):
         self.assertRaises(UnsupportedTranslationError, bible.find_text_in_passage, '', 'Ecclesiastes', 1, 2)
         self.assertTrue(bible.output_as_list, 'output_as_list was not reverted to True when error was raised')
 
+    def test_find_text_in_passage_range_leaves_options_unchanged(self):
+        observed_options = []
+
+        def read_file(file_path):
+            observed_options.append(bible.output_as_list)
+            return yaml_file_interface.read(file_path)
+        bible = BaseExtractor(file_reading_function=read_file, file_extension=self.get_test_file_extension(),
+                              default_directory=self.get_test_directory(), translation=self.get_test_translation())
+        bible.find_text_in_chapter('Preacher', 'Ecclesiastes', 1)
+        self.assertEqual([False], observed_options, 'Output options should not be changed while searching')
+
+    def test_shared_extractor_across_threads(self):
+        bible = BaseExtractor(file_reading_function=yaml_file_interface.read,
+                              file_extension=self.get_test_file_extension(),
+                              default_directory=self.get_test_directory(), translation=self.get_test_translation())
+        expected_chapter = bible.get_chapter('Ecclesiastes', 1)
+        expected_search_result = bible.find_text_in_chapter('Preacher', 'Ecclesiastes', 1)
+        calls = [lambda: bible.get_chapter('Ecclesiastes', 1),
+                 lambda: bible.find_text_in_chapter('Preacher', 'Ecclesiastes', 1)] * 50
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(lambda call: call(), calls))
+        self.assertEqual([expected_chapter] * 50, results[::2], 'Passages do not match')
+        self.assertEqual([expected_search_result] * 50, results[1::2], 'Passages do not match')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,13 @@
 import unittest
 import sys
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append('../')
-from meaningless import WebExtractor, InvalidSearchError, UnsupportedTranslationError
+from meaningless import WebExtractor, InvalidSearchError, UnsupportedTranslationError, parse_passage_html, \
+    OperationCancelledError, DeadlineExceededError, yaml_file_interface
+from meaningless.bible_base_downloader import BaseDownloader
+from meaningless.utilities import common
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.stand_in_server import StandInServer, get_passage_count
 
 
 class UnitTests(unittest.TestCase):
@@ -535,6 +541,186 @@ class UnitTests(unittest.TestCase):
         # While unconventional, this still resolves to a valid search URL
         self.assertEqual(text1, text2, 'Passage is incorrect')
 
+    def test_search_with_passage_cache(self):
+        bible = WebExtractor(passage_cache_size=2)
+        text1 = bible.search('Ecclesiastes 1:17')
+        # Equivalent searches with different casing and spacing should be served from the cache
+        text2 = bible.search('ecclesiastes  1 : 17')
+        self.assertEqual(text1, text2, 'Passage is incorrect')
+        stats = bible.get_passage_cache_stats()
+        self.assertEqual(1, stats['hits'], 'Passage was not served from the cache')
+        self.assertEqual(1, stats['misses'], 'Passage was not stored in the cache')
+
+    def test_search_with_passage_cache_and_different_options(self):
+        bible = WebExtractor(passage_cache_size=2)
+        text = bible.search('Ecclesiastes 1:17')
+        bible.show_passage_numbers = False
+        text_without_numbers = bible.search('Ecclesiastes 1:17')
+        self.assertNotEqual(text, text_without_numbers, 'Cached passage ignored the output options')
+        self.assertEqual(0, bible.get_passage_cache_stats()['hits'], 'Cached passage ignored the output options')
+
+    def test_search_with_passage_cache_as_list(self):
+        bible = WebExtractor(output_as_list=True, passage_cache_size=2)
+        passages = bible.search('Ecclesiastes 1:17 - 18')
+        # Changes to the returned list should not affect the cached search result
+        passages.append('Extra')
+        self.assertEqual(2, len(bible.search('Ecclesiastes 1:17 - 18')), 'Cached passage was modified')
+
+    def test_invalidate_passage_cache(self):
+        bible = WebExtractor(passage_cache_size=2)
+        bible.search('Ecclesiastes 1:17')
+        bible.search('Ecclesiastes 1:18')
+        self.assertEqual(1, bible.invalidate_passage_cache('ECCLESIASTES 1:17'), 'Passage was not invalidated')
+        self.assertEqual(1, bible.get_passage_cache_stats()['size'], 'Passage was not invalidated')
+        self.assertEqual(1, bible.invalidate_passage_cache(), 'Passage cache was not cleared')
+
+    def test_invalidate_passage_cache_when_disabled(self):
+        bible = WebExtractor()
+        self.assertEqual(0, bible.invalidate_passage_cache(), 'Disabled passage cache contained passages')
+        self.assertEqual(0, bible.get_passage_cache_stats()['size'], 'Disabled passage cache contained passages')
+
+    def test_get_chapters_with_combined_requests(self):
+        separate_requests = WebExtractor(max_chapters_per_request=1).get_chapters('Ecclesiastes', 1, 12)
+        combined_requests = WebExtractor(max_chapters_per_request=5).get_chapters('Ecclesiastes', 1, 12)
+        self.assertEqual(separate_requests, combined_requests, 'Passages are incorrect')
+
+    def test_get_passage_range_with_combined_requests_as_list(self):
+        separate_requests = WebExtractor(output_as_list=True, max_chapters_per_request=1)\
+            .get_passage_range('Psalm', 9, 18, 12, 3)
+        combined_requests = WebExtractor(output_as_list=True, max_chapters_per_request=3, max_concurrent_requests=2)\
+            .get_passage_range('Psalm', 9, 18, 12, 3)
+        self.assertEqual(separate_requests, combined_requests, 'Passages are incorrect')
+
+    def test_get_chapters_with_combined_requests_cut_off(self):
+        # The combined page of each request is cut off 2 passages before the end of its last chapter
+        max_passages = sum(get_passage_count('Ruth', chapter) for chapter in range(1, 4)) - 2
+        with StandInServer() as server, StandInServer(max_passages_per_page=max_passages) as limited_server:
+            separate_requests = WebExtractor(base_url=server.base_url, max_chapters_per_request=1)\
+                .get_chapters('Ruth', 1, 3)
+            combined_requests = WebExtractor(base_url=limited_server.base_url).get_chapters('Ruth', 1, 3)
+            self.assertEqual(separate_requests, combined_requests, 'Passages are incorrect')
+            # Only the chapter that was cut off is retrieved again
+            self.assertEqual(2, limited_server.get_stats()['requests'], 'Number of requests is incorrect')
+
+    def test_get_chapters_with_combined_requests_not_cut_off(self):
+        with StandInServer() as server:
+            separate_requests = WebExtractor(base_url=server.base_url, max_chapters_per_request=1)\
+                .get_chapters('Ruth', 1, 3)
+            request_count = server.get_stats()['requests']
+            combined_requests = WebExtractor(base_url=server.base_url).get_chapters('Ruth', 1, 3)
+            # The first passage of chapter 4 is also requested, but isn't part of the result
+            self.assertEqual(separate_requests, combined_requests, 'Passages are incorrect')
+            self.assertEqual(1, server.get_stats()['requests'] - request_count,
+                             'Complete chapters should not be retrieved again')
+            request_count = server.get_stats()['requests']
+            # The last chapter of the book isn't followed by another chapter to show that it wasn't cut off
+            WebExtractor(base_url=server.base_url).get_book('Ruth')
+            self.assertEqual(2, server.get_stats()['requests'] - request_count, 'Number of requests is incorrect')
+
+    def test_get_chapters_with_combined_requests_limited_by_passages(self):
+        with StandInServer() as server:
+            bible = WebExtractor(base_url=server.base_url, max_passages_per_request=80)
+            # Each request covers 3 chapters of an average length, along with the first passage of the next chapter
+            self.assertEqual([[(1, 1, 9000), (2, 1, 9000), (3, 1, 9000)], [(4, 1, 9000), (5, 1, 9000), (6, 1, 9000)],
+                              [(7, 1, 9000), (8, 1, 9000), (9, 1, 9000)], [(10, 1, 9000)]],
+                             bible._plan_chapter_requests('Psalm', 1, 1, 10, 9000), 'Requests are incorrect')
+            # Passages requested from a single chapter are counted exactly
+            self.assertEqual([[(1, 1, 9000), (2, 1, 9000), (3, 1, 9000)], [(4, 1, 5)]],
+                             bible._plan_chapter_requests('Psalm', 1, 1, 4, 5), 'Requests are incorrect')
+            self.assertEqual(WebExtractor(base_url=server.base_url, max_chapters_per_request=1)
+                             .get_chapters('Psalm', 1, 10), bible.get_chapters('Psalm', 1, 10),
+                             'Passages are incorrect')
+
+    def test_get_passage_with_built_in_html_parser(self):
+        bible = WebExtractor(parser='html.parser')
+        self.assertEqual('html.parser', bible.parser, 'HTML parser is incorrect')
+        self.assertEqual(WebExtractor().search('Nehemiah 7:30 - 31'), bible.search('Nehemiah 7:30 - 31'),
+                         'Passage is incorrect')
+
+    def test_get_chapters_with_stream_engine(self):
+        bible = WebExtractor(engine='stream', output_as_list=True)
+        expected_passages = WebExtractor(parser='html.parser', output_as_list=True).get_chapters('Psalm', 3, 4)
+        self.assertEqual(expected_passages, bible.get_chapters('Psalm', 3, 4), 'Passages are incorrect')
+
+    def test_parse_passage_html(self):
+        page = common.get_page('https://www.biblegateway.com/passage/?version=ESV&search=Psalm+3&interface=print')
+        bible = WebExtractor(translation='ESV', output_as_list=True)
+        self.assertEqual(bible.search('Psalm 3'), parse_passage_html(page, 'ESV', output_as_list=True),
+                         'Passage is incorrect')
+        self.assertRaises(UnsupportedTranslationError, parse_passage_html, page, 'MSG')
+
+    def test_get_passages_with_deadline(self):
+        bible = WebExtractor()
+        self.assertRaises(DeadlineExceededError, bible.get_chapters, 'Psalm', 3, 40, deadline=0)
+        self.assertRaises(DeadlineExceededError, bible.search, 'Psalm 3', deadline=0)
+        self.assertEqual(bible.search('Psalm 3:1'), bible.get_passage('Psalm', 3, 1, deadline=60),
+                         'Passage is incorrect')
+
+    def test_get_passages_cancelled(self):
+        bible = WebExtractor()
+        cancellation_token = CancellationToken()
+        cancellation_token.cancel()
+        self.assertRaises(OperationCancelledError, bible.get_book, 'Philemon', cancellation_token=cancellation_token)
+        self.assertRaises(OperationCancelledError, bible.get_book, 'Philemon', deadline=60,
+                          cancellation_token=cancellation_token)
+
+    def test_iter_passages(self):
+        with StandInServer() as server:
+            bible = WebExtractor(base_url=server.base_url, max_chapters_per_request=2)
+            items = list(bible.iter_passages('Ruth', 1, 3, 4, 5))
+            expected_passages = [(chapter, passage) for chapter in range(1, 5)
+                                 for passage in range(3 if chapter == 1 else 1,
+                                                      6 if chapter == 4 else get_passage_count('Ruth', chapter) + 1)]
+            self.assertEqual(expected_passages, [(item.chapter, item.passage) for item in items],
+                             'Passage numbers are incorrect')
+            list_bible = WebExtractor(output_as_list=True, base_url=server.base_url)
+            # The first passage of each chapter is numbered as well, unlike the passages output as a list
+            self.assertEqual([passage if passage[0] in '⁰¹²³⁴⁵⁶⁷⁸⁹' else f'¹ {passage}'
+                              for passage in list_bible.get_passage_range('Ruth', 1, 3, 4, 5)],
+                             [item.text for item in items], 'Passages are incorrect')
+            self.assertEqual([0, 3], [items[0].sequence, items[-1].sequence], 'Sequence numbers are incorrect')
+            self.assertTrue(all(item.book == 'Ruth' for item in items), 'Book is incorrect')
+
+    def test_iter_chapters_out_of_order(self):
+        with StandInServer(latency_jitter=0.2, seed=1) as server:
+            bible = WebExtractor(show_passage_numbers=False, base_url=server.base_url, max_chapters_per_request=1)
+            items = list(bible.iter_chapters('Ruth', 1, 4, in_order=False))
+            self.assertEqual(sum(get_passage_count('Ruth', chapter) for chapter in range(1, 5)), len(items),
+                             'Passage count is incorrect')
+            # Passages within each chapter are always in order
+            sorted_items = sorted(items, key=lambda item: (item.sequence, item.passage))
+            self.assertEqual(sorted_items, sorted(items, key=lambda item: item.sequence), 'Passages are out of order')
+            list_bible = WebExtractor(show_passage_numbers=False, output_as_list=True, base_url=server.base_url)
+            self.assertEqual(list_bible.get_chapter('Ruth', 1), [item.text for item in items if item.chapter == 1],
+                             'Passages are incorrect')
+            self.assertFalse(items[0].text.startswith('¹'), 'Passage numbers should be hidden')
+
+    def test_iter_book_stopped_early(self):
+        with StandInServer(latency=0.2) as server:
+            bible = WebExtractor(base_url=server.base_url, max_chapters_per_request=1, max_concurrent_requests=2)
+            items = bible.iter_book('Psalm')
+            first_item = next(items)
+            self.assertEqual((1, 1), (first_item.chapter, first_item.passage), 'First passage is incorrect')
+            items.close()
+            self.assertLessEqual(server.get_stats()['requests'], 3, 'Remaining chapters should not be requested')
+            self.assertRaises(DeadlineExceededError, list, bible.iter_book('Psalm', deadline=0.3))
+
+    def test_shared_extractor_across_threads(self):
+        with StandInServer(latency=0.05) as server:
+            bible = WebExtractor(base_url=server.base_url, max_chapters_per_request=2)
+            downloader = BaseDownloader(file_writing_function=yaml_file_interface.write)
+            expected_chapter = bible.get_chapter('Ruth', 1)
+            # Downloads get passages as lists from the same extractor while other threads get passages as strings
+            calls = [lambda: bible.get_chapter('Ruth', 1),
+                     lambda: downloader._get_chapters_dict(bible, 'Ruth', [(1, 1, 5)]),
+                     lambda: downloader._get_chapters_dict(bible, 'Ruth', [(2, 1, 5), (3, 1, 5)])] * 10
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                results = list(executor.map(lambda call: call(), calls))
+            self.assertEqual([expected_chapter] * 10, results[::3], 'Passages should be output as a string')
+            self.assertEqual(list(range(1, 6)), list(results[1][1].keys()), 'Passages are incorrect')
+            self.assertEqual([2, 3], list(results[2].keys()), 'Chapters are incorrect')
+            self.assertFalse(bible.output_as_list, 'Output options should not be changed')
+
     # -------------- Tests which are ignored due to being unsupported translations --------------
 
     # def test_get_passage_exb(self):
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import pickle
+import threading
+from time import time, sleep
+sys.path.append('../')
+from meaningless.utilities.cancellation import CancellationToken, get_operation_token
+from meaningless.utilities.exceptions import OperationCancelledError, DeadlineExceededError
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_token_cancel(self):
+        cancellation_token = CancellationToken()
+        self.assertFalse(cancellation_token.is_cancelled, 'Token should not be cancelled yet')
+        self.assertIsNone(cancellation_token.get_remaining_time(), 'Token should not have a deadline')
+        cancellation_token.cancel()
+        self.assertTrue(cancellation_token.is_cancelled, 'Token was not cancelled')
+        self.assertRaises(OperationCancelledError, cancellation_token.raise_if_cancelled)
+
+    def test_token_deadline(self):
+        cancellation_token = CancellationToken(0.1)
+        self.assertEqual(5, CancellationToken(60).get_timeout(5), 'Timeout should not be limited')
+        self.assertLessEqual(cancellation_token.get_timeout(5), 0.1, 'Timeout was not limited by the deadline')
+        sleep(0.15)
+        self.assertTrue(cancellation_token.is_cancelled, 'Deadline was not applied')
+        self.assertEqual(0, cancellation_token.get_remaining_time(), 'Remaining time is incorrect')
+        self.assertRaises(DeadlineExceededError, cancellation_token.raise_if_cancelled)
+
+    def test_token_parent(self):
+        parent = CancellationToken(60)
+        child = CancellationToken(120, parent)
+        self.assertEqual(parent.deadline, child.deadline, 'Deadline should not be later than the parent deadline')
+        parent.cancel()
+        self.assertTrue(child.is_cancelled, 'Child token was not cancelled')
+        self.assertTrue(CancellationToken(parent=parent).is_cancelled, 'New child token was not cancelled')
+
+    def test_token_callbacks(self):
+        cancellation_token = CancellationToken()
+        calls = []
+        callback = lambda: calls.append('cancelled')
+        cancellation_token.add_callback(callback)
+        cancellation_token.add_callback(lambda: calls.append('other'))
+        cancellation_token.remove_callback(callback)
+        cancellation_token.cancel()
+        cancellation_token.cancel()
+        cancellation_token.add_callback(lambda: calls.append('late'))
+        self.assertEqual(['other', 'late'], calls, 'Callbacks were not called correctly')
+
+    def test_token_sleep_interrupted(self):
+        cancellation_token = CancellationToken()
+        threading.Timer(0.1, cancellation_token.cancel).start()
+        start_time = time()
+        self.assertRaises(OperationCancelledError, cancellation_token.sleep, 5)
+        self.assertLess(time() - start_time, 1, 'Sleep was not interrupted')
+        self.assertRaises(DeadlineExceededError, CancellationToken(0.1).sleep, 5)
+
+    def test_token_pickling(self):
+        cancellation_token = CancellationToken(60)
+        restored_token = pickle.loads(pickle.dumps(cancellation_token))
+        self.assertEqual(cancellation_token.deadline, restored_token.deadline, 'Deadline was not preserved')
+        self.assertFalse(restored_token.is_cancelled, 'Token should not be cancelled yet')
+        cancellation_token.cancel()
+        self.assertFalse(restored_token.is_cancelled, 'Tokens in other processes should be independent')
+        self.assertTrue(pickle.loads(pickle.dumps(cancellation_token)).is_cancelled, 'Cancellation was not preserved')
+
+    def test_get_operation_token(self):
+        cancellation_token = CancellationToken()
+        self.assertIsNone(get_operation_token(), 'Token should not be created')
+        self.assertIs(cancellation_token, get_operation_token(cancellation_token=cancellation_token),
+                      'Token should be used directly')
+        operation_token = get_operation_token(5, cancellation_token)
+        cancellation_token.cancel()
+        self.assertTrue(operation_token.is_cancelled, 'Operation token was not cancelled')
+
+
+if __name__ == '__main__':
+    unittest.main()
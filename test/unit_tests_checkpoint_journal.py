@@ -0,0 +1,119 @@
+import unittest
+import sys
+import shutil
+import pickle
+import multiprocessing
+sys.path.append('../')
+from meaningless import yaml_file_interface, DeadlineExceededError
+from meaningless.bible_base_downloader import BaseDownloader
+from meaningless.utilities.checkpoint_journal import CheckpointJournal, get_download_key
+from meaningless.utilities.stand_in_server import StandInServer
+
+
+def record_in_journal(journal, chapter):
+    """
+    A helper function to record a chapter from a separate process.
+    """
+    journal.record('Psalm', {chapter: {1: f'Chapter {chapter}'}})
+    return chapter
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def get_journal_directory(name):
+        """
+        A helper function to get an empty directory for a checkpoint journal
+        :param name: Name of the directory
+        :type name: str
+        :return: Directory path
+        :rtype: str
+        """
+        directory = f'./tmp/checkpoint_journal/{name}'
+        shutil.rmtree(directory, ignore_errors=True)
+        return directory
+
+    def test_journal_record_and_get(self):
+        journal = CheckpointJournal(self.get_journal_directory('test_journal_record_and_get'))
+        self.assertEqual({}, journal.get_chapters('Ruth'), 'Chapters were unexpectedly recorded')
+        journal.record('Ruth', {2: {1: 'First', 2: 'Second'}, '1': {'1': 'Only'}})
+        journal.record('Ruth', {2: {1: 'Replaced'}})
+        chapters = journal.get_chapters('Ruth')
+        self.assertEqual([1, 2], list(chapters.keys()), 'Chapters should be in order')
+        self.assertEqual({'1': 'Only'}, chapters[1], 'Passage keys should keep their type')
+        self.assertEqual({1: 'Replaced'}, chapters[2], 'Chapter was not replaced')
+        self.assertEqual({}, journal.get_chapters('Jonah'), 'Chapters should be specific to each download')
+        stats = journal.get_stats()
+        self.assertEqual(3, stats['recorded_chapters'], 'Recorded chapter count is incorrect')
+        self.assertEqual(2, stats['restored_chapters'], 'Restored chapter count is incorrect')
+        self.assertEqual(1, stats['downloads'], 'Download count is incorrect')
+
+    def test_journal_remove(self):
+        journal = CheckpointJournal(self.get_journal_directory('test_journal_remove'))
+        journal.record('Ruth', {1: {1: 'First'}})
+        journal.record('Jonah', {1: {1: 'First'}})
+        journal.remove('Ruth')
+        self.assertEqual({}, journal.get_chapters('Ruth'), 'Download was not removed')
+        self.assertEqual(1, len(journal.get_chapters('Jonah')), 'Other downloads should be kept')
+        journal.remove()
+        self.assertEqual(0, journal.get_stats()['chapters'], 'Not all downloads were removed')
+
+    def test_journal_across_processes(self):
+        journal = CheckpointJournal(self.get_journal_directory('test_journal_across_processes'))
+        with multiprocessing.Pool(4) as pool:
+            pool.starmap(record_in_journal, [(journal, chapter) for chapter in range(1, 21)])
+        self.assertEqual(list(range(1, 21)), list(journal.get_chapters('Psalm').keys()),
+                         'Chapters recorded by other processes are missing')
+        restored_journal = pickle.loads(pickle.dumps(journal))
+        self.assertEqual(0, restored_journal.get_stats()['recorded_chapters'],
+                         'Statistics should be specific to each process')
+
+    def test_download_key(self):
+        self.assertEqual(get_download_key({'book': 'Ruth', 'chapters': [[1, 1, 10]]}),
+                         get_download_key({'chapters': [[1, 1, 10]], 'book': 'Ruth'}), 'Key should ignore ordering')
+        self.assertNotEqual(get_download_key({'book': 'Ruth', 'chapters': [[1, 1, 10]]}),
+                            get_download_key({'book': 'Ruth', 'chapters': [[1, 1, 11]]}), 'Keys should differ')
+
+    def test_resumed_download(self):
+        download_path = self.get_journal_directory('test_resumed_download')
+        journal = CheckpointJournal(f'{download_path}/journal')
+        with StandInServer(latency=0.1) as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='serial', checkpoint_journal=journal,
+                                   max_chapters_per_request=1)
+            self.assertRaises(DeadlineExceededError, bible.download_book, 'Psalm', deadline=0.45)
+            recorded_chapters = journal.get_stats()['chapters']
+            self.assertGreater(recorded_chapters, 0, 'Retrieved chapters were not recorded')
+            requests = server.get_stats()['requests']
+            self.assertEqual(1, bible.download_book('Psalm'), 'Download was not successful')
+            # Each chapter is retrieved in a separate web request
+            self.assertEqual(150 - recorded_chapters, server.get_stats()['requests'] - requests,
+                             'Recorded chapters were retrieved again')
+            self.assertEqual(0, journal.get_stats()['chapters'], 'Recorded chapters were not removed')
+            BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                           base_url=server.base_url, executor='serial').download_book('Psalm',
+                                                                                      f'{download_path}/Psalm (full)')
+        self.assertEqual(yaml_file_interface.read(f'{download_path}/Psalm (full)')['Psalm'],
+                         yaml_file_interface.read(f'{download_path}/Psalm')['Psalm'], 'Passage contents do not match')
+
+    def test_resumed_download_with_different_parameters(self):
+        download_path = self.get_journal_directory('test_resumed_download_with_different_parameters')
+        journal = CheckpointJournal(f'{download_path}/journal')
+        with StandInServer(latency=0.1) as server:
+            bible = BaseDownloader(file_writing_function=yaml_file_interface.write, default_directory=download_path,
+                                   base_url=server.base_url, executor='serial', checkpoint_journal=journal,
+                                   max_chapters_per_request=1)
+            self.assertRaises(DeadlineExceededError, bible.download_chapters, 'Psalm', 1, 30, deadline=0.15)
+            bible.show_passage_numbers = False
+            requests = server.get_stats()['requests']
+            bible.download_chapters('Psalm', 1, 30)
+            self.assertEqual(30, server.get_stats()['requests'] - requests,
+                             'Chapters recorded with different parameters should not be used')
+        self.assertEqual(1, journal.get_stats()['downloads'], 'Unfinished download should be kept')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,8 @@
-import os
+import doctest
+import sys
+sys.path.append('../')
+from meaningless.utilities import common
 
 if __name__ == "__main__":
-    os.system('python ../meaningless/utilities/common.py')
+    # The doctests are run against the imported module, since the common module relies on other package modules
+    doctest.testmod(common, verbose=True, optionflags=doctest.ELLIPSIS)
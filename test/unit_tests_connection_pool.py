@@ -0,0 +1,175 @@
+import unittest
+import sys
+import pickle
+import threading
+import gzip
+import zlib
+from time import sleep, time
+from urllib.error import HTTPError, URLError
+sys.path.append('../')
+from meaningless.utilities import common
+from meaningless.utilities.connection_pool import ConnectionPool, get_default_pool
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.exceptions import OperationCancelledError, DeadlineExceededError
+from unit_test_helpers import BaseLocalRequestHandler, LocalServerTestCase
+
+
+class LocalRequestHandler(BaseLocalRequestHandler):
+    """
+    A request handler for a local web server, which redirects, delays, compresses and encodes pages based on their path
+    """
+
+    def do_GET(self):
+        if self.path.startswith('/redirect'):
+            self.send_body(status=302, headers={'Location': '/page'})
+            return
+        if self.path.startswith('/missing'):
+            self.send_body(status=404)
+            return
+        if self.path.startswith('/slow'):
+            sleep(0.2)
+        if self.path.startswith('/stalled'):
+            sleep(2)
+        charset = 'iso-8859-1' if self.path.startswith('/latin') else 'utf-8'
+        body = f'<html>{self.path} “Éclésiaste”</html>'.encode(charset, errors='replace')
+        headers = {'Content-Type': f'text/html; charset={charset}'}
+        if self.path.startswith('/compressed'):
+            content_encoding = self.headers.get('Accept-Encoding', '').split(',')[0].strip()
+            if content_encoding == 'gzip':
+                body = gzip.compress(body)
+            elif content_encoding == 'deflate':
+                body = zlib.compress(body)
+            if content_encoding:
+                headers['Content-Encoding'] = content_encoding
+        self.send_body(body, headers=headers)
+
+
+class UnitTests(LocalServerTestCase):
+    request_handler = LocalRequestHandler
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_pool_reuses_connection(self):
+        pool = ConnectionPool()
+        first = pool.request(f'{self.base_url}/page1')
+        second = pool.request(f'{self.base_url}/page2')
+        self.assertEqual('<html>/page1 “Éclésiaste”</html>'.encode('utf-8'), first.body, 'Response body is incorrect')
+        self.assertEqual('<html>/page2 “Éclésiaste”</html>'.encode('utf-8'), second.body, 'Response body is incorrect')
+        stats = pool.get_stats()
+        self.assertEqual(2, stats['requests'], 'Request count is incorrect')
+        self.assertEqual(1, stats['new_connections'], 'Connection was not reused')
+        self.assertEqual(1, stats['reuses'], 'Connection was not reused')
+        self.assertEqual(1, stats['idle_connections'], 'Connection was not kept alive')
+        pool.clear()
+
+    def test_pool_follows_redirects(self):
+        pool = ConnectionPool()
+        response = pool.request(f'{self.base_url}/redirect')
+        self.assertEqual(200, response.status, 'Redirect was not followed')
+        self.assertEqual(f'{self.base_url}/page', response.url, 'Redirected URL is incorrect')
+        self.assertEqual('<html>/page “Éclésiaste”</html>'.encode('utf-8'), response.body, 'Response body is incorrect')
+        pool.clear()
+
+    def test_pool_error_status(self):
+        pool = ConnectionPool()
+        self.assertRaises(HTTPError, pool.request, f'{self.base_url}/missing')
+        # Error responses are fully read, so the connection can still be reused afterwards
+        pool.request(f'{self.base_url}/page')
+        self.assertEqual(1, pool.get_stats()['new_connections'], 'Connection was not reused after an error')
+        pool.clear()
+
+    def test_pool_invalid_url(self):
+        pool = ConnectionPool()
+        self.assertRaises(URLError, pool.request, 'ftp://127.0.0.1/page')
+
+    def test_pool_connection_limit(self):
+        pool = ConnectionPool(max_connections_per_host=2)
+        threads = [threading.Thread(target=pool.request, args=(f'{self.base_url}/slow',)) for _ in range(0, 6)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        stats = pool.get_stats()
+        self.assertEqual(6, stats['requests'], 'Request count is incorrect')
+        self.assertEqual(2, stats['new_connections'], 'Connection limit was exceeded')
+        self.assertEqual(4, stats['reuses'], 'Connections were not reused')
+        pool.clear()
+
+    def test_pool_idle_eviction(self):
+        pool = ConnectionPool(idle_timeout=0.1)
+        pool.request(f'{self.base_url}/page1')
+        sleep(0.2)
+        pool.request(f'{self.base_url}/page2')
+        stats = pool.get_stats()
+        self.assertEqual(1, stats['idle_evictions'], 'Idle connection was not evicted')
+        self.assertEqual(2, stats['new_connections'], 'Evicted connection was reused')
+        pool.clear()
+
+    def test_pool_pickling(self):
+        pool = ConnectionPool(max_connections_per_host=3, idle_timeout=5)
+        pool.request(f'{self.base_url}/page')
+        restored_pool = pickle.loads(pickle.dumps(pool))
+        self.assertEqual(3, restored_pool.max_connections_per_host, 'Pool configuration was not preserved')
+        self.assertEqual(5, restored_pool.idle_timeout, 'Pool configuration was not preserved')
+        self.assertEqual(0, restored_pool.get_stats()['requests'], 'Connections were sent across')
+        # Restoring the same pool again in this process should reuse the same object
+        self.assertIs(restored_pool, pickle.loads(pickle.dumps(pool)), 'Restored pool is not reused')
+        pool.clear()
+
+    def test_get_page_with_pool(self):
+        pool = ConnectionPool()
+        common.get_page(f'{self.base_url}/page1', connection_pool=pool)
+        text = common.get_page(f'{self.base_url}/page2', connection_pool=pool)
+        self.assertEqual('<html>/page2 “Éclésiaste”</html>', text, 'Page contents is incorrect')
+        self.assertEqual(1, pool.get_stats()['reuses'], 'Connection was not reused')
+        pool.clear()
+
+    def test_get_page_with_default_pool(self):
+        initial_stats = get_default_pool().get_stats()
+        common.get_page(f'{self.base_url}/page')
+        self.assertEqual(initial_stats['requests'] + 1, get_default_pool().get_stats()['requests'],
+                         'Default pool was not used')
+
+    def test_get_page_with_compression(self):
+        text = common.get_page(f'{self.base_url}/compressed')
+        self.assertEqual('<html>/compressed “Éclésiaste”</html>', text, 'Page was not decompressed')
+        response = ConnectionPool().request(f'{self.base_url}/compressed', headers={'Accept-Encoding': 'deflate'})
+        self.assertEqual('<html>/compressed “Éclésiaste”</html>',
+                         common.decode_page(common.decompress_page(response.body, 'deflate'), 'utf-8'),
+                         'Page was not decompressed')
+
+    def test_get_page_with_charset(self):
+        text = common.get_page(f'{self.base_url}/latin')
+        # Characters which are not in the character set are replaced by the web server
+        self.assertEqual('<html>/latin ?Éclésiaste?</html>', text, 'Page was not decoded using its character set')
+
+    def test_get_page_error_status(self):
+        self.assertRaises(HTTPError, common.get_page, f'{self.base_url}/missing', retry_count=1, retry_delay=0)
+
+    def test_pool_read_timeout(self):
+        pool = ConnectionPool(read_timeout=0.2)
+        start_time = time()
+        self.assertRaises(URLError, pool.request, f'{self.base_url}/stalled')
+        self.assertLess(time() - start_time, 1, 'Request did not time out')
+        self.assertEqual(200, pool.request(f'{self.base_url}/slow', timeout=1).status, 'Timeout was not overridden')
+        pool.clear()
+
+    def test_pool_request_cancelled(self):
+        cancellation_token = CancellationToken()
+        threading.Timer(0.2, cancellation_token.cancel).start()
+        start_time = time()
+        self.assertRaises(OperationCancelledError, ConnectionPool().request, f'{self.base_url}/stalled',
+                          cancellation_token=cancellation_token)
+        self.assertLess(time() - start_time, 1, 'Request was not interrupted')
+
+    def test_get_page_with_deadline(self):
+        cancellation_token = CancellationToken(0.3)
+        start_time = time()
+        self.assertRaises(DeadlineExceededError, common.get_page, f'{self.base_url}/stalled', retry_delay=0,
+                          cancellation_token=cancellation_token)
+        self.assertLess(time() - start_time, 1, 'Request did not stop at the deadline')
+        self.assertRaises(DeadlineExceededError, common.get_page, f'{self.base_url}/page',
+                          cancellation_token=cancellation_token)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import pickle
+import multiprocessing
+from urllib.error import HTTPError
+sys.path.append('../')
+from meaningless import WebExtractor, MissingFixtureError
+from meaningless.utilities import common
+from meaningless.utilities.fixture_store import FixtureStore, get_default_fixture_store, set_default_fixture_store
+from unit_test_helpers import BaseLocalRequestHandler, LocalServerTestCase, get_empty_directory
+
+# A search results page with the same structure as a Bible Gateway page
+SEARCH_PAGE = '<html><body><div class="passage-content passage-class-0"><h1 class="passage-display">Psalm 3:1</h1>' \
+              '<p><span class="text Ps-3-1"><span class="chapternum">3 </span>LORD, how many are my foes!</span>' \
+              '</p></div></body></html>'
+
+
+class LocalRequestHandler(BaseLocalRequestHandler):
+    """
+    A request handler for a local web server, which counts the requests it receives
+    """
+    request_count = 0
+
+    def do_GET(self):
+        LocalRequestHandler.request_count += 1
+        if self.path.startswith('/missing'):
+            self.send_body(status=404)
+            return
+        self.send_body(f'<html>{self.path} “Éclésiaste”</html>'.encode('utf-8'),
+                       headers={'Content-Type': 'text/html; charset=utf-8'})
+
+
+def get_page_from_process(url):
+    """
+    A helper function to get a page from a separate process, using the default fixture store.
+    """
+    return common.get_page(url)
+
+
+class UnitTests(LocalServerTestCase):
+    request_handler = LocalRequestHandler
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def tearDown(self):
+        set_default_fixture_store(None)
+
+    @staticmethod
+    def get_store_path(name):
+        """
+        A helper function to get the path of a new fixture store
+        :param name: Name of the store
+        :type name: str
+        :return: Database path
+        :rtype: str
+        """
+        return f'{get_empty_directory("fixture_store", name)}/fixtures.sqlite3'
+
+    def test_record_and_replay(self):
+        path = self.get_store_path('test_record_and_replay')
+        recorded_text = common.get_page(f'{self.base_url}/page?b=2&a=1', fixture_store=FixtureStore(path, 'record'))
+        request_count = LocalRequestHandler.request_count
+        replay_store = FixtureStore(path, 'replay')
+        self.assertEqual(recorded_text, common.get_page(f'{self.base_url}/page?a=1&b=2', fixture_store=replay_store),
+                         'Replayed page is incorrect')
+        self.assertEqual(request_count, LocalRequestHandler.request_count, 'Web request was sent while replaying')
+        stats = replay_store.get_stats()
+        self.assertEqual(1, stats['replayed'], 'Replay count is incorrect')
+        self.assertEqual(1, stats['entries'], 'Entry count is incorrect')
+
+    def test_replay_error(self):
+        path = self.get_store_path('test_replay_error')
+        self.assertRaises(HTTPError, common.get_page, f'{self.base_url}/missing', retry_count=0,
+                          fixture_store=FixtureStore(path, 'record'))
+        with self.assertRaises(HTTPError) as context:
+            common.get_page(f'{self.base_url}/missing', fixture_store=FixtureStore(path, 'replay'))
+        self.assertEqual(404, context.exception.code, 'Recorded status code is incorrect')
+
+    def test_replay_missing_page(self):
+        store = FixtureStore(self.get_store_path('test_replay_missing_page'), 'replay')
+        self.assertRaises(MissingFixtureError, common.get_page, f'{self.base_url}/page', fixture_store=store)
+        self.assertEqual(1, store.get_stats()['missing'], 'Missing page count is incorrect')
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, FixtureStore, self.get_store_path('test_invalid_mode'), 'live')
+
+    def test_store_pickling(self):
+        store = FixtureStore(self.get_store_path('test_store_pickling'), 'record')
+        store.record('http://localhost/page', 'contents')
+        restored_store = pickle.loads(pickle.dumps(store))
+        self.assertEqual('record', restored_store.mode, 'Store configuration was not preserved')
+        self.assertEqual('contents', FixtureStore(store.path).replay('http://localhost/page'), 'Page is incorrect')
+
+    def test_default_store_used_by_processes(self):
+        store = FixtureStore(self.get_store_path('test_default_store_used_by_processes'), 'record')
+        urls = [f'{self.base_url}/page{index}' for index in range(0, 4)]
+        set_default_fixture_store(store)
+        self.assertIs(get_default_fixture_store(), get_default_fixture_store(), 'Default store was not reused')
+        with multiprocessing.Pool(2) as process_pool:
+            recorded_pages = process_pool.map(get_page_from_process, urls)
+        set_default_fixture_store(FixtureStore(store.path, 'replay'))
+        self.assertEqual('replay', get_default_fixture_store().mode, 'Default store was not changed')
+        self.assertEqual(recorded_pages, [common.get_page(url) for url in urls], 'Replayed pages are incorrect')
+        set_default_fixture_store(None)
+        self.assertIsNone(get_default_fixture_store(), 'Default store was not removed')
+
+    def test_web_extractor_replay(self):
+        store = FixtureStore(self.get_store_path('test_web_extractor_replay'), 'record')
+        bible = WebExtractor(parser='html.parser')
+        store.record(bible._get_search_url('Psalm 3:1'), SEARCH_PAGE)
+        set_default_fixture_store(FixtureStore(store.path, 'replay'))
+        self.assertEqual('LORD, how many are my foes!', bible.search('Psalm 3:1'), 'Passage is incorrect')
+        self.assertRaises(MissingFixtureError, bible.search, 'Psalm 3:2')
+
+
+if __name__ == '__main__':
+    unittest.main()
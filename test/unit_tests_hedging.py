@@ -0,0 +1,117 @@
+import unittest
+import sys
+import pickle
+import threading
+from time import sleep, time
+from urllib.error import URLError
+sys.path.append('../')
+from meaningless.utilities import common
+from meaningless.utilities.connection_pool import ConnectionPool
+from meaningless.utilities.hedging import HedgingPolicy
+from unit_test_helpers import BaseLocalRequestHandler, LocalServerTestCase
+
+
+class LocalRequestHandler(BaseLocalRequestHandler):
+    """
+    A request handler for a local web server, which stalls on the first request sent to each stalled page
+    """
+    stalled_paths = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with LocalRequestHandler.lock:
+            is_stalled = self.path.startswith('/stalled') and self.path not in LocalRequestHandler.stalled_paths
+            LocalRequestHandler.stalled_paths.add(self.path)
+        if is_stalled:
+            sleep(2)
+        self.send_body(f'<html>{self.path}</html>'.encode('utf-8'))
+
+
+class UnitTests(LocalServerTestCase):
+    request_handler = LocalRequestHandler
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def get_response(text, delay=0):
+        """
+        A helper function to create a request function which responds after a delay
+        :param text: Response to return
+        :type text: str
+        :param delay: Number of seconds to wait before responding
+        :type delay: int or float
+        :return: Request function
+        :rtype: callable
+        """
+        def respond(cancellation_token):
+            cancellation_token.sleep(delay)
+            return text
+        return respond
+
+    def test_policy_delay_uses_percentile(self):
+        policy = HedgingPolicy(percentile=50, initial_delay=2, min_delay=0, min_samples=4, max_extra_requests=0)
+        self.assertEqual(2, policy.get_delay(), 'Initial delay was not used')
+        [policy.run(self.get_response('page', delay)) for delay in [0.01, 0.01, 0.1, 0.2]]
+        self.assertGreaterEqual(policy.get_delay(), 0.1, 'Delay does not match the percentile')
+        self.assertLess(policy.get_delay(), 0.2, 'Delay does not match the percentile')
+
+    def test_policy_hedge_wins(self):
+        policy = HedgingPolicy(initial_delay=0.1, max_extra_requests=1)
+        responses = [self.get_response('slow', 2), self.get_response('fast')]
+        start_time = time()
+        text = policy.run(lambda cancellation_token: responses.pop(0)(cancellation_token))
+        self.assertEqual('fast', text, 'Response of the duplicate request was not used')
+        self.assertLess(time() - start_time, 1, 'Slow request was not interrupted')
+        stats = policy.get_stats()
+        self.assertEqual(1, stats['requests'], 'Request count is incorrect')
+        self.assertEqual(1, stats['hedged_requests'], 'Duplicate request count is incorrect')
+        self.assertEqual(1, stats['hedge_wins'], 'Duplicate request win count is incorrect')
+
+    def test_policy_hedge_loses(self):
+        policy = HedgingPolicy(initial_delay=0.1, max_extra_requests=1)
+        responses = [self.get_response('original', 0.2), self.get_response('duplicate', 2)]
+        text = policy.run(lambda cancellation_token: responses.pop(0)(cancellation_token))
+        self.assertEqual('original', text, 'Response of the original request was not used')
+        self.assertEqual(0, policy.get_stats()['hedge_wins'], 'Duplicate request should not have won')
+
+    def test_policy_hedge_after_failure(self):
+        policy = HedgingPolicy(initial_delay=0.1, max_extra_requests=1)
+
+        def fail(cancellation_token):
+            sleep(0.2)
+            raise URLError('Connection reset')
+        responses = [fail, self.get_response('duplicate', 0.3)]
+        text = policy.run(lambda cancellation_token: responses.pop(0)(cancellation_token))
+        self.assertEqual('duplicate', text, 'Duplicate request was not used after the original request failed')
+
+    def test_policy_extra_request_limit(self):
+        policy = HedgingPolicy(initial_delay=0.05, max_extra_requests=0.5)
+        [policy.run(self.get_response('page', 0.1)) for _ in range(0, 4)]
+        stats = policy.get_stats()
+        self.assertEqual(4, stats['requests'], 'Request count is incorrect')
+        self.assertEqual(2, stats['hedged_requests'], 'Duplicate requests exceeded the limit')
+        self.assertEqual(2, stats['skipped_hedges'], 'Skipped duplicate request count is incorrect')
+
+    def test_policy_pickling(self):
+        policy = HedgingPolicy(percentile=90, max_extra_requests=0.2)
+        policy.run(self.get_response('page'))
+        restored_policy = pickle.loads(pickle.dumps(policy))
+        self.assertEqual(90, restored_policy.percentile, 'Policy configuration was not preserved')
+        self.assertEqual(0.2, restored_policy.max_extra_requests, 'Policy configuration was not preserved')
+        self.assertEqual(0, restored_policy.get_stats()['requests'], 'Statistics should be specific to each process')
+
+    def test_get_page_with_hedging(self):
+        pool = ConnectionPool()
+        policy = HedgingPolicy(initial_delay=0.2, max_extra_requests=1)
+        start_time = time()
+        text = common.get_page(f'{self.base_url}/stalled', connection_pool=pool, hedging_policy=policy)
+        self.assertEqual('<html>/stalled</html>', text, 'Page contents are incorrect')
+        self.assertLess(time() - start_time, 1.5, 'Duplicate request was not used')
+        self.assertEqual(1, policy.get_stats()['hedge_wins'], 'Duplicate request should have won')
+        self.assertEqual(2, pool.get_stats()['requests'], 'Duplicate request was not sent')
+        pool.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
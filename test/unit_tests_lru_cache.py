@@ -0,0 +1,70 @@
+import unittest
+import sys
+import pickle
+import threading
+sys.path.append('../')
+from meaningless.utilities.lru_cache import LRUCache
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_cache_get_and_put(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get('a'), 'Entry was unexpectedly stored')
+        self.assertEqual('default', cache.get('a', 'default'), 'Default value was not returned')
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'), 'Entry is incorrect')
+        self.assertIn('a', cache, 'Entry was not stored')
+        self.assertEqual(1, len(cache), 'Cache size is incorrect')
+        stats = cache.get_stats()
+        self.assertEqual(1, stats['hits'], 'Hit count is incorrect')
+        self.assertEqual(2, stats['misses'], 'Miss count is incorrect')
+
+    def test_cache_least_recently_used_eviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        # Reading the first entry makes the second entry the least recently used
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIn('a', cache, 'Recently used entry was evicted')
+        self.assertNotIn('b', cache, 'Least recently used entry was not evicted')
+        self.assertIn('c', cache, 'New entry was evicted')
+        self.assertEqual(1, cache.get_stats()['evictions'], 'Eviction count is incorrect')
+
+    def test_cache_invalidate(self):
+        cache = LRUCache(5)
+        [cache.put(key, key) for key in range(0, 5)]
+        self.assertEqual(2, cache.invalidate(lambda key: key % 2 == 1), 'Incorrect number of entries removed')
+        self.assertEqual(3, len(cache), 'Entries were not removed')
+        self.assertEqual(3, cache.invalidate(), 'Incorrect number of entries removed')
+        self.assertEqual(0, len(cache), 'Cache was not cleared')
+
+    def test_cache_pickling(self):
+        cache = LRUCache(5)
+        cache.put('a', 1)
+        restored_cache = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(5, restored_cache.max_size, 'Cache configuration was not preserved')
+        self.assertEqual(0, len(restored_cache), 'Cache contents was sent across')
+
+    def test_cache_concurrent_access(self):
+        cache = LRUCache(50)
+
+        def use_cache(offset):
+            for key in range(0, 1000):
+                cache.put((offset + key) % 100, key)
+                cache.get(key % 100)
+
+        threads = [threading.Thread(target=use_cache, args=(offset,)) for offset in range(0, 8)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        self.assertEqual(50, len(cache), 'Cache exceeded its maximum size')
+        stats = cache.get_stats()
+        self.assertEqual(8000, stats['hits'] + stats['misses'], 'Lookups were not all counted')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+sys.path.append('../')
+from meaningless import parse_passage_html
+from meaningless.utilities.passage_parser import PassageContentParser
+from meaningless.utilities.exceptions import InvalidSearchError
+
+# A search results page with the same structure as a Bible Gateway page, covering the tags handled by clean up rules
+SEARCH_PAGE = '''<!DOCTYPE html>
+<html><head><title>Search</title><script>var passage = "<p>not a passage</p>";</script></head>
+<body><nav><h1>Navigation</h1><table><tr><td>Menu</td><td>Items</td></tr></table></nav>
+<div class="version-NIV result-text-style-normal text-html"><div class="passage-content passage-class-0">
+<h1 class="passage-display">Psalm 3:1 - 4</h1>
+<h3><span class="text Ps-3-1">A psalm of David.</span></h3>
+<p class="chapter-1"><span class="text Ps-3-1"><span class="chapternum">3 </span>LORD, how many are my foes!
+<sup class="crossreference" data-cr="#cen-NIV-1">(<a href="#cen-NIV-1">A</a>)</sup></span>
+<span class="text Ps-3-2"><sup class="versenum">2 </sup>Many are saying of me,<br/>&ldquo;God will not deliver him.&rdquo;
+<sup class="footnote" data-fn="#fen-NIV-1">[<a href="#fen-NIV-1">a</a>]</sup><span class="selah">[b]</span></span></p>
+<table><tr><td><span class="text Ps-3-3"><sup class="versenum">3 </sup>But you, LORD,</span></td>
+<td>are a shield<!-- around me --></td></tr></table>
+<p><span class="text Ps-3-4"><sup class="versenum">4 </sup>I call out to the LORD,<br>and he answers me.</span></p>
+<a class="full-chap-link" href="/passage/?search=Psalm+3">Read full chapter</a>
+<div class="footnotes"><h4>Footnotes</h4><ol><li>Psalm 3:2 Selah</li></ol></div>
+<div class="crossrefs hidden"><h4>Cross references</h4><ol><li>Psalm 3:1 : 2 Sam 15:12</li></ol></div>
+</div></div>
+<footer><p>Copyright</p></footer></body></html>'''
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def parse_page(page, translation='NIV', output_as_list=False, engine='stream', split_chapters=False):
+        """
+        A helper function to extract the passage contents of a page without sending a web request
+        :param page: Contents of the page
+        :type page: str or bytes
+        :param translation: Translation code for the page
+        :type translation: str
+        :param output_as_list: When True, returns the passage contents as a list of strings
+        :type output_as_list: bool
+        :param engine: Extraction engine to use
+        :type engine: str
+        :param split_chapters: If True, the passage contents are split at the start of each chapter
+        :type split_chapters: bool
+        :return: Passage contents
+        :rtype: str or list
+        """
+        return parse_passage_html(page, translation, output_as_list=output_as_list, parser='html.parser', engine=engine,
+                                  split_chapters=split_chapters, source_site='http://localhost/search')
+
+    def test_parse_page(self):
+        text = self.parse_page(SEARCH_PAGE)
+        expected_text = 'LORD, how many are my foes!\n\n² Many are saying of me,\n“God will not deliver him.”\n [b]\n' \
+                        '³ But you, LORD, \nare a shield\n\n⁴ I call out to the LORD,\nand he answers me.'
+        self.assertEqual(expected_text, text, 'Passage is incorrect')
+
+    def test_parse_page_same_as_soup(self):
+        for translation in ['NIV', 'NIVUK', 'GNV', 'AMP']:
+            for output_as_list in [False, True]:
+                for split_chapters in [False, True]:
+                    expected = self.parse_page(SEARCH_PAGE, translation, output_as_list, 'soup', split_chapters)
+                    actual = self.parse_page(SEARCH_PAGE, translation, output_as_list, 'stream', split_chapters)
+                    self.assertEqual(expected, actual, f'Passage is different for {translation}')
+
+    def test_parse_page_as_bytes(self):
+        page = SEARCH_PAGE.replace('<head>', '<head><meta charset="utf-8">').encode('utf-8')
+        self.assertEqual(self.parse_page(SEARCH_PAGE), self.parse_page(page), 'Passage is incorrect')
+
+    def test_parse_page_without_passages(self):
+        page = '<html><body><div class="passage-other-content"><p>No results found.</p></div></body></html>'
+        self.assertRaises(InvalidSearchError, self.parse_page, page)
+
+    def test_parser_ignores_unclosed_and_stray_tags(self):
+        rules = [(['sup'], ['footnote'], None, 1, None),
+                 (['td'], None, None, 2, lambda text, attributes, markers: f'{text}{markers["cell_end"]}')]
+        page = '<p>Outside</p></td><div class="passage-content">A<td>B</span><sup class="footnote">C</td>D' \
+               '<br></br><td>E</td><td>F</p><div class="passage-content x">G'
+        passage_contents = PassageContentParser(rules, 'NIV', {'cell_end': '|'}).parse(page)
+        # The last table cell is never closed, so it also contains the second passage section
+        self.assertEqual(['AB|DEFG|', 'G'], passage_contents, 'Passage contents are incorrect')
+
+    def test_parser_applies_rule_translations(self):
+        rules = [(['p'], ['note'], ['GNV'], 1, None)]
+        page = '<div class="passage-content"><p class="note">Note</p><p>Text</p></div>'
+        self.assertEqual(['Text'], PassageContentParser(rules, 'GNV', {}).parse(page), 'Rule was not applied')
+        self.assertEqual(['NoteText'], PassageContentParser(rules, 'NIV', {}).parse(page), 'Rule was applied')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import pickle
+import threading
+from time import sleep
+sys.path.append('../')
+from meaningless import WebExtractor
+from meaningless.utilities.prefetch import PrefetchPolicy
+from meaningless.utilities.stand_in_server import StandInServer
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_adjacent_chapters(self):
+        policy = PrefetchPolicy(next_chapters=2, previous_chapters=2)
+        self.assertEqual([2, 3], policy.get_adjacent_chapters('Ruth', 1), 'Chapters are incorrect')
+        self.assertEqual([3, 4, 1], policy.get_adjacent_chapters('Ruth', 2), 'Chapters are incorrect')
+        self.assertEqual([3, 2], policy.get_adjacent_chapters('Ruth', 4), 'Chapters are incorrect')
+        self.assertEqual([], policy.get_adjacent_chapters('Obadiah', 1), 'Chapters should stay within the book')
+        self.assertEqual([], PrefetchPolicy(next_chapters=0).get_adjacent_chapters('Ruth', 1),
+                         'No chapters should be prefetched')
+
+    def test_sequential_reading(self):
+        with StandInServer(latency=0.2) as server, PrefetchPolicy() as policy:
+            bible = WebExtractor(base_url=server.base_url, prefetch_policy=policy)
+            expected_chapters = WebExtractor(base_url=server.base_url).get_chapters('Ruth', 1, 4)
+            requests = server.get_stats()['requests']
+            chapters = []
+            for chapter in range(1, 5):
+                chapters.append(bible.get_chapter('Ruth', chapter))
+            self.assertEqual(expected_chapters, '\n'.join(chapters), 'Passages are incorrect')
+            # Chapters still being prefetched are waited for rather than requested again
+            self.assertEqual(requests + 4, server.get_stats()['requests'], 'Each chapter should only be requested once')
+            stats = policy.get_stats()
+            self.assertEqual(4, stats['requests'], 'Chapter request count is incorrect')
+            self.assertEqual(3, stats['hits'], 'Hit count is incorrect')
+            self.assertEqual(1, stats['misses'], 'Miss count is incorrect')
+            self.assertEqual(0.75, stats['hit_rate'], 'Hit rate is incorrect')
+            self.assertEqual(3, stats['prefetches'], 'The last chapter of the book should not be prefetched')
+
+    def test_prefetched_chapter_is_instant(self):
+        with StandInServer(latency=0.3) as server, PrefetchPolicy() as policy:
+            bible = WebExtractor(output_as_list=True, base_url=server.base_url, prefetch_policy=policy)
+            bible.get_chapter('Ruth', 1)
+            sleep(0.6)
+            self.assertEqual(0, policy.get_stats()['in_progress'], 'Next chapter was not prefetched')
+            requests = server.get_stats()['requests']
+            self.assertEqual(WebExtractor(output_as_list=True, base_url=server.base_url).get_chapter('Ruth', 2),
+                             bible.get_chapter('Ruth', 2), 'Passages are incorrect')
+            self.assertEqual(requests + 1, server.get_stats()['requests'], 'Prefetched chapter was requested again')
+
+    def test_max_concurrent_prefetches(self):
+        finished = threading.Event()
+        with PrefetchPolicy(max_concurrent_prefetches=1) as policy:
+            self.assertTrue(policy.prefetch('Ruth 1', lambda cancellation_token: finished.wait()),
+                            'Prefetch was not started')
+            self.assertFalse(policy.prefetch('Ruth 1', lambda cancellation_token: None),
+                             'Chapter in progress should not be prefetched again')
+            self.assertFalse(policy.prefetch('Ruth 2', lambda cancellation_token: None),
+                             'Prefetch should be skipped when the limit is reached')
+            self.assertEqual(1, policy.get_stats()['skipped_prefetches'], 'Skipped prefetch count is incorrect')
+            finished.set()
+            self.assertTrue(policy.claim('Ruth 1'), 'Prefetched chapter was not claimed')
+
+    def test_failed_prefetch(self):
+        def fail(cancellation_token):
+            raise ValueError('Invalid page')
+        with PrefetchPolicy() as policy:
+            policy.prefetch('Ruth 1', fail)
+            self.assertFalse(policy.claim('Ruth 1'), 'Failed prefetch should not be a hit')
+            self.assertEqual(1, policy.get_stats()['failed_prefetches'], 'Failed prefetch count is incorrect')
+
+    def test_close(self):
+        policy = PrefetchPolicy()
+        tokens = []
+        policy.prefetch('Ruth 1', lambda cancellation_token: tokens.append(cancellation_token))
+        policy.close()
+        self.assertTrue(tokens[0].is_cancelled, 'Prefetches should be stopped when closing the policy')
+        self.assertFalse(policy.prefetch('Ruth 2', lambda cancellation_token: None),
+                         'Closed policy should not start any prefetches')
+
+    def test_prefetch_policy_pickling(self):
+        policy = PrefetchPolicy(next_chapters=2, previous_chapters=1, max_concurrent_prefetches=3)
+        policy.claim('Ruth 1')
+        restored_policy = pickle.loads(pickle.dumps(policy))
+        self.assertEqual((2, 1, 3), (restored_policy.next_chapters, restored_policy.previous_chapters,
+                                     restored_policy.max_concurrent_prefetches), 'Configuration is incorrect')
+        self.assertEqual(0, restored_policy.get_stats()['requests'], 'Statistics should be specific to each process')
+
+
+if __name__ == '__main__':
+    unittest.main()
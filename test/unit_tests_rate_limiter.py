@@ -0,0 +1,119 @@
+import unittest
+import sys
+import pickle
+import multiprocessing
+from email.utils import formatdate
+from time import time
+sys.path.append('../')
+from meaningless.utilities import common
+from meaningless.utilities.rate_limiter import RateLimiter, parse_retry_after
+from unit_test_helpers import BaseLocalRequestHandler, LocalServerTestCase, get_empty_directory
+
+
+class LocalRequestHandler(BaseLocalRequestHandler):
+    """
+    A request handler for a local web server, which throttles the first request sent to each throttled page
+    """
+    throttled_paths = set()
+
+    def do_GET(self):
+        if self.path.startswith('/throttled') and self.path not in LocalRequestHandler.throttled_paths:
+            LocalRequestHandler.throttled_paths.add(self.path)
+            self.send_body(status=429 if self.path.startswith('/throttled/429') else 503,
+                           headers={'Retry-After': '1'})
+            return
+        self.send_body(f'<html>{self.path}</html>'.encode('utf-8'))
+
+
+def acquire_from_process(limiter, index):
+    """
+    A helper function to wait for the rate limiter from a separate process.
+    """
+    limiter.acquire()
+    return time()
+
+
+class UnitTests(LocalServerTestCase):
+    request_handler = LocalRequestHandler
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def get_database_path(name):
+        """
+        A helper function to get the path of a new rate limiter database
+        :param name: Name of the database
+        :type name: str
+        :return: Database path
+        :rtype: str
+        """
+        return f'{get_empty_directory("rate_limiter", name)}/rate_limiter.sqlite3'
+
+    def test_limiter_spaces_requests(self):
+        limiter = RateLimiter(requests_per_second=20)
+        start_time = time()
+        [limiter.acquire() for _ in range(0, 5)]
+        self.assertGreaterEqual(time() - start_time, 0.19, 'Requests were not spaced out')
+        stats = limiter.get_stats()
+        self.assertEqual(5, stats['requests'], 'Request count is incorrect')
+        self.assertEqual(4, stats['delayed_requests'], 'Delayed request count is incorrect')
+
+    def test_limiter_allows_burst(self):
+        limiter = RateLimiter(requests_per_second=2, burst=3)
+        delays = [limiter.acquire() for _ in range(0, 4)]
+        self.assertEqual([0, 0, 0], delays[0:3], 'Burst of requests was delayed')
+        self.assertGreater(delays[3], 0.4, 'Request after the burst was not delayed')
+
+    def test_limiter_pause(self):
+        limiter = RateLimiter(requests_per_second=100)
+        limiter.acquire()
+        limiter.pause(0.3)
+        start_time = time()
+        limiter.acquire()
+        self.assertGreaterEqual(time() - start_time, 0.25, 'Requests were not paused')
+        self.assertEqual(1, limiter.get_stats()['pauses'], 'Pause count is incorrect')
+
+    def test_limiter_shared_between_processes(self):
+        limiter = RateLimiter(requests_per_second=20, database_path=self.get_database_path('test_shared'))
+        start_time = time()
+        with multiprocessing.Pool(4) as process_pool:
+            acquisition_times = process_pool.starmap(acquire_from_process, [(limiter, index) for index in range(0, 12)])
+        # The first request is sent straight away, and the other 11 are each spaced out by 0.05 seconds
+        self.assertGreaterEqual(max(acquisition_times) - start_time, 0.54, 'Processes did not share the rate limit')
+
+    def test_limiter_pickling(self):
+        limiter = RateLimiter(requests_per_second=5, burst=2, database_path=self.get_database_path('test_pickling'))
+        limiter.acquire()
+        restored_limiter = pickle.loads(pickle.dumps(limiter))
+        self.assertEqual(5, restored_limiter.requests_per_second, 'Rate limiter configuration was not preserved')
+        self.assertEqual(2, restored_limiter.burst, 'Rate limiter configuration was not preserved')
+        self.assertEqual(limiter.database_path, restored_limiter.database_path, 'Rate limiter state is not shared')
+        self.assertEqual(0, restored_limiter.get_stats()['requests'], 'Statistics should be specific to each process')
+
+    def test_parse_retry_after(self):
+        self.assertEqual(5, parse_retry_after(' 5 '), 'Number of seconds is incorrect')
+        self.assertAlmostEqual(10, parse_retry_after(formatdate(time() + 10, usegmt=True)), delta=1.5,
+                               msg='Number of seconds until the date is incorrect')
+        self.assertIsNone(parse_retry_after(None), 'Missing header should be ignored')
+        self.assertIsNone(parse_retry_after('-1'), 'Invalid header should be ignored')
+
+    def test_get_page_honours_retry_after(self):
+        limiter = RateLimiter(requests_per_second=100)
+        start_time = time()
+        text = common.get_page(f'{self.base_url}/throttled/429', retry_delay=0, rate_limiter=limiter)
+        self.assertEqual('<html>/throttled/429</html>', text, 'Page contents are incorrect')
+        self.assertGreaterEqual(time() - start_time, 0.95, 'Retry-After header was not honoured')
+        stats = limiter.get_stats()
+        self.assertEqual(1, stats['pauses'], 'Requests were not paused')
+        self.assertEqual(2, stats['requests'], 'Request count is incorrect')
+
+    def test_get_page_honours_retry_after_without_limiter(self):
+        start_time = time()
+        text = common.get_page(f'{self.base_url}/throttled/503', retry_delay=0)
+        self.assertEqual('<html>/throttled/503</html>', text, 'Page contents are incorrect')
+        self.assertGreaterEqual(time() - start_time, 0.95, 'Retry-After header was not honoured')
+
+
+if __name__ == '__main__':
+    unittest.main()
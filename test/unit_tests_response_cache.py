@@ -0,0 +1,128 @@
+import unittest
+import sys
+import pickle
+import multiprocessing
+from time import sleep
+sys.path.append('../')
+from meaningless.utilities import common
+from meaningless.utilities.response_cache import ResponseCache, normalise_url
+from unit_test_helpers import BaseLocalRequestHandler, LocalServerTestCase, get_empty_directory
+
+
+class LocalRequestHandler(BaseLocalRequestHandler):
+    """
+    A request handler for a local web server, which supports conditional requests using ETags
+    """
+    request_count = 0
+
+    def do_GET(self):
+        LocalRequestHandler.request_count += 1
+        etag = '"version-1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(status=304, headers={'ETag': etag})
+            return
+        self.send_body(f'<html>{self.path}</html>'.encode('utf-8'), headers={'ETag': etag})
+
+
+def store_in_cache(cache, index):
+    """
+    A helper function to store a response from a separate process.
+    """
+    cache.store(f'http://localhost/page{index}', f'page{index}'.encode('utf-8'))
+    return index
+
+
+class UnitTests(LocalServerTestCase):
+    request_handler = LocalRequestHandler
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_cache_store_and_get(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_store_and_get'))
+        self.assertIsNone(cache.get('http://localhost/page'), 'Response was unexpectedly stored')
+        cache.store('http://localhost/page', b'contents', etag='"abc"', last_modified='yesterday')
+        response = cache.get('HTTP://LOCALHOST:80/page#section')
+        self.assertEqual(b'contents', response.body, 'Stored response is incorrect')
+        self.assertEqual('"abc"', response.etag, 'Stored ETag is incorrect')
+        self.assertEqual('yesterday', response.last_modified, 'Stored Last-Modified value is incorrect')
+        self.assertFalse(response.is_expired, 'Response expired too early')
+        stats = cache.get_stats()
+        self.assertEqual(1, stats['hits'], 'Hit count is incorrect')
+        self.assertEqual(1, stats['misses'], 'Miss count is incorrect')
+        self.assertEqual(1, stats['entries'], 'Entry count is incorrect')
+        self.assertEqual(8, stats['size'], 'Cache size is incorrect')
+
+    def test_cache_expiry(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_expiry'), time_to_live=0.1)
+        cache.store('http://localhost/page', b'contents')
+        sleep(0.2)
+        self.assertTrue(cache.get('http://localhost/page').is_expired, 'Response did not expire')
+        cache.revalidate('http://localhost/page')
+        self.assertFalse(cache.get('http://localhost/page').is_expired, 'Response was not revalidated')
+
+    def test_cache_least_recently_used_eviction(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_least_recently_used_eviction'),
+                              max_size=10)
+        cache.store('http://localhost/page1', b'1234')
+        cache.store('http://localhost/page2', b'1234')
+        # Reading the first page makes the second page the least recently used
+        cache.get('http://localhost/page1')
+        cache.store('http://localhost/page3', b'1234')
+        self.assertIsNotNone(cache.get('http://localhost/page1'), 'Recently used response was evicted')
+        self.assertIsNone(cache.get('http://localhost/page2'), 'Least recently used response was not evicted')
+        self.assertIsNotNone(cache.get('http://localhost/page3'), 'New response was evicted')
+        self.assertEqual(1, cache.get_stats()['evictions'], 'Eviction count is incorrect')
+        # Responses that can never fit are ignored
+        cache.store('http://localhost/page4', b'12345678901')
+        self.assertIsNone(cache.get('http://localhost/page4'), 'Oversized response was stored')
+
+    def test_cache_invalidate(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_invalidate'))
+        cache.store('http://localhost/page1', b'1')
+        cache.store('http://localhost/page2', b'2')
+        cache.invalidate('http://localhost/page1')
+        self.assertIsNone(cache.get('http://localhost/page1'), 'Response was not invalidated')
+        self.assertIsNotNone(cache.get('http://localhost/page2'), 'Response was unexpectedly invalidated')
+        cache.invalidate()
+        self.assertEqual(0, cache.get_stats()['entries'], 'Cache was not cleared')
+
+    def test_cache_shared_between_processes(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_shared_between_processes'))
+        with multiprocessing.Pool(4) as process_pool:
+            process_pool.starmap(store_in_cache, [(cache, index) for index in range(0, 20)])
+        self.assertEqual(20, cache.get_stats()['entries'], 'Responses from other processes were not stored')
+        self.assertEqual(b'page7', cache.get('http://localhost/page7').body, 'Stored response is incorrect')
+
+    def test_cache_pickling(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_cache_pickling'), time_to_live=5,
+                              max_size=100)
+        cache.store('http://localhost/page', b'contents')
+        restored_cache = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(5, restored_cache.time_to_live, 'Cache configuration was not preserved')
+        self.assertEqual(100, restored_cache.max_size, 'Cache configuration was not preserved')
+        self.assertEqual(b'contents', restored_cache.get('http://localhost/page').body, 'Cache contents is incorrect')
+
+    def test_normalise_url(self):
+        url = normalise_url('HTTPS://www.BibleGateway.com:443/passage/?version=NIV&search=John+3&interface=print#top')
+        self.assertEqual('https://www.biblegateway.com/passage/?interface=print&search=John+3&version=NIV', url,
+                         'URL was not normalised')
+
+    def test_get_page_with_cache(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_get_page_with_cache'))
+        initial_request_count = LocalRequestHandler.request_count
+        first = common.get_page(f'{self.base_url}/page', response_cache=cache)
+        second = common.get_page(f'{self.base_url}/page', response_cache=cache)
+        self.assertEqual(first, second, 'Cached page contents is incorrect')
+        self.assertEqual(initial_request_count + 1, LocalRequestHandler.request_count, 'Cached page was requested')
+
+    def test_get_page_with_expired_cache(self):
+        cache = ResponseCache(get_empty_directory('response_cache', 'test_get_page_with_expired_cache'), time_to_live=0)
+        common.get_page(f'{self.base_url}/page', response_cache=cache)
+        text = common.get_page(f'{self.base_url}/page', response_cache=cache)
+        self.assertEqual('<html>/page</html>', text, 'Revalidated page contents is incorrect')
+        self.assertEqual(1, cache.get_stats()['revalidations'], 'Expired page was not revalidated')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import sys
+import pickle
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+sys.path.append('../')
+from meaningless import WebExtractor, AsyncWebExtractor, OperationCancelledError
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.single_flight import SingleFlight
+from meaningless.utilities.stand_in_server import StandInServer
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    @staticmethod
+    def get_counting_function(result, delay=0.2):
+        """
+        A helper function to create a function which counts how many times it runs
+        :param result: Result of the function, or an exception to raise
+        :type result: object
+        :param delay: Number of seconds that the function takes to run
+        :type delay: int or float
+        :return: Function and a list containing the number of times it has run
+        :rtype: tuple
+        """
+        run_count = [0]
+
+        def function():
+            run_count[0] += 1
+            sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return function, run_count
+
+    def test_run_collapses_concurrent_calls(self):
+        single_flight = SingleFlight()
+        function, run_count = self.get_counting_function('page')
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(lambda _: single_flight.run('key', function), range(0, 10)))
+        self.assertEqual(['page'] * 10, results, 'Results are incorrect')
+        self.assertEqual(1, run_count[0], 'Function ran more than once')
+        stats = single_flight.get_stats()
+        self.assertEqual(10, stats['calls'], 'Call count is incorrect')
+        self.assertEqual(9, stats['collapsed_calls'], 'Collapsed call count is incorrect')
+        self.assertEqual(0, stats['in_flight'], 'Calls should no longer be in progress')
+        # Finished calls are not reused
+        single_flight.run('key', function)
+        self.assertEqual(2, run_count[0], 'Function should run again once the previous call has finished')
+
+    def test_run_different_keys(self):
+        single_flight = SingleFlight()
+        function, run_count = self.get_counting_function('page')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda key: single_flight.run(key, function), range(0, 4)))
+        self.assertEqual(4, run_count[0], 'Calls with different keys should not be collapsed')
+
+    def test_run_shares_exceptions(self):
+        single_flight = SingleFlight()
+        function, run_count = self.get_counting_function(ValueError('Invalid page'))
+
+        def run(_):
+            try:
+                single_flight.run('key', function)
+            except ValueError as exception:
+                return str(exception)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(run, range(0, 5)))
+        self.assertEqual(['Invalid page'] * 5, results, 'Exception was not shared')
+        self.assertEqual(1, run_count[0], 'Function ran more than once')
+
+    def test_run_after_cancelled_call(self):
+        single_flight = SingleFlight()
+        cancelled_function, _ = self.get_counting_function(OperationCancelledError())
+        function, run_count = self.get_counting_function('page', 0)
+        leader = threading.Thread(target=self.assertRaises,
+                                  args=(OperationCancelledError, single_flight.run, 'key', cancelled_function))
+        leader.start()
+        sleep(0.05)
+        self.assertEqual('page', single_flight.run('key', function), 'Function was not run again')
+        self.assertEqual(1, run_count[0], 'Function was not run again')
+        leader.join()
+
+    def test_run_waiting_call_cancelled(self):
+        single_flight = SingleFlight()
+        function, _ = self.get_counting_function('page', 1)
+        leader = threading.Thread(target=single_flight.run, args=('key', function))
+        leader.start()
+        sleep(0.05)
+        self.assertRaises(OperationCancelledError, single_flight.run, 'key', function, CancellationToken(0.1))
+        leader.join()
+
+    def test_run_async_collapses_concurrent_calls(self):
+        single_flight = SingleFlight()
+        run_count = [0]
+
+        async def coroutine_function():
+            run_count[0] += 1
+            await asyncio.sleep(0.2)
+            return 'page'
+
+        async def run():
+            waiting_call = asyncio.ensure_future(single_flight.run_async('key', coroutine_function))
+            results = await asyncio.gather(*[single_flight.run_async('key', coroutine_function) for _ in range(0, 5)])
+            # Cancelling a caller doesn't cancel the call that it was waiting for
+            await asyncio.sleep(0)
+            waiting_call.cancel()
+            return results
+        self.assertEqual(['page'] * 5, asyncio.run(run()), 'Results are incorrect')
+        self.assertEqual(1, run_count[0], 'Coroutine ran more than once')
+        self.assertEqual(5, single_flight.get_stats()['collapsed_calls'], 'Collapsed call count is incorrect')
+
+    def test_run_async_after_cancelled_call(self):
+        single_flight = SingleFlight()
+
+        async def coroutine_function():
+            await asyncio.sleep(0.2)
+            return 'page'
+
+        async def run():
+            leader = asyncio.ensure_future(single_flight.run_async('key', coroutine_function))
+            await asyncio.sleep(0.05)
+            follower = asyncio.ensure_future(single_flight.run_async('key', coroutine_function))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            return await follower
+        self.assertEqual('page', asyncio.run(run()), 'Coroutine was not run again')
+
+    def test_single_flight_pickling(self):
+        single_flight = SingleFlight()
+        single_flight.run('key', lambda: 'page')
+        restored_single_flight = pickle.loads(pickle.dumps(single_flight))
+        self.assertEqual(0, restored_single_flight.get_stats()['calls'], 'Statistics should be specific to each process')
+
+    def test_web_extractor_with_single_flight(self):
+        single_flight = SingleFlight()
+        with StandInServer(latency=0.3) as server:
+            bible = WebExtractor(output_as_list=True, base_url=server.base_url, single_flight=single_flight)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: bible.get_chapter('Ruth', 1), range(0, 8)))
+            self.assertEqual(1, server.get_stats()['requests'], 'Identical searches were not collapsed')
+            self.assertTrue(all(result == results[0] for result in results), 'Results are incorrect')
+            self.assertEqual(8, len({id(result) for result in results}), 'Each search should get its own result')
+            self.assertEqual(7, single_flight.get_stats()['collapsed_calls'], 'Collapsed call count is incorrect')
+
+    def test_async_web_extractor_with_single_flight(self):
+        single_flight = SingleFlight()
+
+        async def run(base_url):
+            async with AsyncWebExtractor(base_url=base_url, single_flight=single_flight) as bible:
+                return await asyncio.gather(*[bible.get_chapter('Ruth', 1) for _ in range(0, 8)])
+        with StandInServer(latency=0.3) as server:
+            results = asyncio.run(run(server.base_url))
+            self.assertEqual(1, server.get_stats()['requests'], 'Identical searches were not collapsed')
+            self.assertEqual([results[0]] * 8, results, 'Results are incorrect')
+
+
+if __name__ == '__main__':
+    unittest.main()
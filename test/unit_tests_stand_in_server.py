@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import shutil
+from time import time
+from urllib.error import HTTPError
+sys.path.append('../')
+from meaningless import WebExtractor, YAMLDownloader, yaml_file_interface
+from meaningless.utilities import common
+from meaningless.utilities.fixture_store import FixtureStore
+from meaningless.utilities.stand_in_server import StandInServer, generate_passage_page, get_passage_count
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_generated_pages_cover_all_chapters(self):
+        books = common.BIBLE_TRANSLATIONS['NIV']['Books']
+        chapter_count = 0
+        for book, book_chapters in books.items():
+            for chapter in range(1, book_chapters + 1):
+                self.assertIn('passage-content', generate_passage_page(f'{book} {chapter}'),
+                              f'{book} {chapter} was not generated')
+                chapter_count += 1
+        self.assertEqual(1189, chapter_count, 'Chapter count is incorrect')
+        self.assertNotIn('passage-content', generate_passage_page('Malachi 5'), 'Invalid chapter was generated')
+        self.assertNotIn('passage-content', generate_passage_page('Barnabas 1'), 'Invalid book was generated')
+
+    def test_generated_pages_are_reproducible(self):
+        self.assertEqual(generate_passage_page('Ruth 1:1 - 4:22'), generate_passage_page('Ruth 1:1 - 4:22'),
+                         'Generated pages are different')
+        self.assertNotEqual(generate_passage_page('Ruth 1'), generate_passage_page('Ruth 1', 'ESV'),
+                            'Generated pages should depend on the translation')
+
+    def test_web_extractor_with_server(self):
+        with StandInServer() as server:
+            bible = WebExtractor(output_as_list=True, base_url=server.base_url, max_chapters_per_request=3)
+            passages = bible.get_chapters('Ruth', 1, 4)
+            self.assertEqual(sum(get_passage_count('Ruth', chapter) for chapter in range(1, 5)), len(passages),
+                             'Passage count is incorrect')
+            # As on Bible Gateway, the first passage of each chapter starts with the chapter number instead
+            self.assertFalse(passages[0].startswith('¹ '), 'First passage is incorrect')
+            self.assertTrue(passages[1].startswith('² '), 'Second passage is incorrect')
+            # Chapters 1 to 3 are combined, and chapter 4 is retrieved separately since it ends the book
+            self.assertEqual(2, server.get_stats()['generated_pages'], 'Web request count is incorrect')
+            passage = WebExtractor(base_url=server.base_url, engine='stream').get_passage('Ruth', 2, 3)
+            self.assertTrue(passage.startswith('³ '), 'Passage is incorrect')
+
+    def test_server_latency(self):
+        with StandInServer(latency=0.2) as server:
+            start_time = time()
+            common.get_page(f'{server.base_url}/passage/?search=Ruth+1&version=NIV')
+            self.assertGreaterEqual(time() - start_time, 0.2, 'Latency was not added')
+
+    def test_server_errors(self):
+        with StandInServer(error_rate=1) as server:
+            with self.assertRaises(HTTPError) as context:
+                common.get_page(f'{server.base_url}/passage/?search=Ruth+1&version=NIV', retry_count=0)
+            self.assertEqual(500, context.exception.code, 'Status code is incorrect')
+            self.assertEqual(1, server.get_stats()['errors'], 'Error count is incorrect')
+
+    def test_server_throttling(self):
+        with StandInServer(max_requests_per_second=1, retry_after=7) as server:
+            url = f'{server.base_url}/passage/?search=Ruth+1&version=NIV'
+            common.get_page(url)
+            with self.assertRaises(HTTPError) as context:
+                common.get_page(url, retry_count=0)
+            self.assertEqual(429, context.exception.code, 'Status code is incorrect')
+            self.assertEqual('7', context.exception.headers['Retry-After'], 'Retry-After header is incorrect')
+            self.assertEqual(1, server.get_stats()['throttled'], 'Throttled request count is incorrect')
+
+    def test_server_recorded_pages(self):
+        directory = './tmp/stand_in_server/test_server_recorded_pages'
+        shutil.rmtree(directory, ignore_errors=True)
+        store = FixtureStore(f'{directory}/fixtures.sqlite3', 'record')
+        search_url = WebExtractor()._get_search_url('Psalm 3:1')
+        store.record(search_url, generate_passage_page('Psalm 3:1').replace('passage-display', 'recorded'))
+        with StandInServer(fixture_store=store) as server:
+            page = common.get_page(search_url, base_url=server.base_url)
+            self.assertIn('class="recorded"', page, 'Recorded page was not used')
+            self.assertEqual(1, server.get_stats()['recorded_pages'], 'Recorded page count is incorrect')
+
+    def test_downloader_with_server(self):
+        directory = './tmp/stand_in_server/test_downloader_with_server'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer() as server:
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url)
+            self.assertEqual(1, bible.download_book('Ruth'), 'Download was not successful')
+        contents = yaml_file_interface.read(os.path.join(directory, 'Ruth.yaml'))
+        self.assertEqual(4, len(contents['Ruth']), 'Chapter count is incorrect')
+        self.assertEqual(get_passage_count('Ruth', 4), len(contents['Ruth'][4]), 'Passage count is incorrect')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+import sys
+import os
+import gc
+import pickle
+import shutil
+import threading
+from urllib.error import URLError
+sys.path.append('../')
+from meaningless import YAMLDownloader, OperationCancelledError, yaml_file_interface
+from meaningless.utilities.cancellation import CancellationToken
+from meaningless.utilities.stand_in_server import StandInServer, get_passage_count
+from meaningless.utilities.worker_pool import WorkerPool
+
+
+def is_module_imported(module_name):
+    """
+    A helper function to check whether a module has been imported by the current process.
+    :param module_name: Name of the module
+    :type module_name: str
+    :return: True if the module has been imported
+    :rtype: bool
+    """
+    return module_name in sys.modules
+
+
+class UnitTests(unittest.TestCase):
+
+    # Note: Tests will only be run if they are prefixed with test_ in their method name.
+    #       All other methods will simply be interpreted as test helper functions.
+
+    def test_worker_pool_reused(self):
+        with WorkerPool(processes=2) as pool:
+            self.assertFalse(pool.is_running, 'Worker processes should not be started until they are needed')
+            first_pid = pool.apply_async(os.getpid).get()
+            pids = {pool.apply_async(os.getpid).get() for _ in range(0, 10)} | {first_pid}
+            self.assertTrue(pool.is_running, 'Worker processes were not started')
+            self.assertNotIn(os.getpid(), pids, 'Functions should run in the worker processes')
+            self.assertLessEqual(len(pids), 2, 'Worker processes should be reused')
+            self.assertEqual(1, pool.get_stats()['starts'], 'Worker processes should only be started once')
+            self.assertEqual(11, pool.get_stats()['tasks'], 'Task count is incorrect')
+        self.assertFalse(pool.is_running, 'Worker processes were not stopped')
+
+    def test_worker_pool_start_method(self):
+        with WorkerPool(processes=1, start_method='spawn', preload_modules=['fractions']) as pool:
+            # The preloaded module is already imported by the time any function runs
+            self.assertTrue(pool.apply_async(is_module_imported, ('fractions',)).get(), 'Module was not preloaded')
+            self.assertFalse(pool.apply_async(is_module_imported, ('wave',)).get(), 'Module should not be imported')
+        self.assertRaises(ValueError, WorkerPool, start_method='teleport')
+
+    def test_worker_pool_terminate(self):
+        with WorkerPool(processes=1) as pool:
+            first_pid = pool.apply_async(os.getpid).get()
+            pool.terminate()
+            self.assertFalse(pool.is_running, 'Worker processes were not stopped')
+            self.assertNotEqual(first_pid, pool.apply_async(os.getpid).get(), 'New worker processes were not started')
+            stats = pool.get_stats()
+            self.assertEqual((2, 1), (stats['starts'], stats['terminations']), 'Statistics are incorrect')
+
+    def test_worker_pool_pickling(self):
+        with WorkerPool(processes=3, start_method='spawn') as pool:
+            pool.apply_async(os.getpid).get()
+            restored_pool = pickle.loads(pickle.dumps(pool))
+            self.assertEqual((3, 'spawn'), (restored_pool.processes, restored_pool.start_method),
+                             'Configuration is incorrect')
+            self.assertFalse(restored_pool.is_running, 'Worker processes should not be sent to other processes')
+
+    def test_downloader_reuses_worker_pool(self):
+        directory = './tmp/worker_pool/test_downloader_reuses_worker_pool'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer() as server:
+            with YAMLDownloader(default_directory=directory, base_url=server.base_url) as bible:
+                self.assertEqual(1, bible.download_book('Ruth'), 'Download was not successful')
+                self.assertEqual(1, bible.download_book('Jonah'), 'Download was not successful')
+                self.assertEqual(1, bible.worker_pool.get_stats()['starts'], 'Worker processes should be reused')
+            self.assertFalse(bible.worker_pool.is_running, 'Worker processes were not stopped')
+        contents = yaml_file_interface.read(os.path.join(directory, 'Jonah.yaml'))
+        self.assertEqual(get_passage_count('Jonah', 4), len(contents['Jonah'][4]), 'Passage count is incorrect')
+
+    def test_downloader_closes_worker_pool_when_collected(self):
+        directory = './tmp/worker_pool/test_downloader_closes_worker_pool_when_collected'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer() as server:
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url)
+            bible.download_book('Ruth')
+            pool = bible.worker_pool
+            self.assertTrue(pool.is_running, 'Worker processes should keep running between downloads')
+            del bible
+            gc.collect()
+            self.assertFalse(pool.is_running, 'Worker processes were not stopped')
+
+    def test_downloader_with_shared_worker_pool(self):
+        directory = './tmp/worker_pool/test_downloader_with_shared_worker_pool'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer(latency=0.2) as server, WorkerPool(processes=2) as pool:
+            with YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool) as bible:
+                bible.download_book('Ruth')
+            self.assertTrue(pool.is_running, 'Shared worker processes should only be stopped by their owner')
+            cancellation_token = CancellationToken(0.1)
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool)
+            self.assertRaises(OperationCancelledError, bible.download_book, 'Psalm',
+                              cancellation_token=cancellation_token)
+            self.assertTrue(pool.is_running, 'Shared worker processes should not be stopped by a cancelled download')
+            self.assertEqual(0, pool.get_stats()['terminations'], 'Shared worker processes should not be stopped')
+            # The remaining chapters are still being retried, so the owner of the pool stops them instead
+            pool.terminate()
+            self.assertEqual(1, bible.download_book('Jonah'), 'Worker processes could not be reused')
+
+    def test_downloaders_sharing_worker_pool_concurrently(self):
+        directory = './tmp/worker_pool/test_downloaders_sharing_worker_pool_concurrently'
+        shutil.rmtree(directory, ignore_errors=True)
+        results = []
+        with StandInServer(latency=0.2) as server, WorkerPool(processes=2) as pool:
+            first_bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool)
+            second_bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool)
+            download_thread = threading.Thread(target=lambda: results.append(first_bible.download_book('Ruth')))
+            download_thread.start()
+            self.assertRaises(OperationCancelledError, second_bible.download_book, 'Psalm',
+                              cancellation_token=CancellationToken(0.3))
+            download_thread.join(timeout=30)
+            self.assertFalse(download_thread.is_alive(), 'Download using the shared worker processes did not finish')
+        self.assertEqual([1], results, 'Download was not successful')
+        contents = yaml_file_interface.read(os.path.join(directory, 'Ruth.yaml'))
+        self.assertEqual(4, len(contents['Ruth']), 'Chapter count is incorrect')
+
+    def test_downloader_failure_stops_worker_processes(self):
+        directory = './tmp/worker_pool/test_downloader_failure_stops_worker_processes'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer(error_rate=1) as server, WorkerPool(processes=1) as pool:
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, concurrency=1)
+            self.assertRaises(URLError, bible.download_book, 'Ruth')
+            # The remaining chapters are not left queued in the worker processes once the download has failed
+            self.assertFalse(bible.worker_pool.is_running, 'Worker processes should be stopped when a download fails')
+            self.assertEqual(1, bible.worker_pool.get_stats()['terminations'],
+                             'Worker processes were not stopped immediately')
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool)
+            self.assertRaises(URLError, bible.download_book, 'Ruth')
+            self.assertEqual(0, pool.get_stats()['terminations'], 'Shared worker processes should not be stopped')
+            # The remaining chapters are still being retried, so the owner of the pool stops them instead
+            pool.terminate()
+
+    def test_downloader_with_terminated_worker_pool(self):
+        directory = './tmp/worker_pool/test_downloader_with_terminated_worker_pool'
+        shutil.rmtree(directory, ignore_errors=True)
+        with StandInServer(latency=1) as server, WorkerPool(processes=1) as pool:
+            bible = YAMLDownloader(default_directory=directory, base_url=server.base_url, worker_pool=pool)
+            threading.Timer(0.5, pool.terminate).start()
+            # The groups that were in the worker processes never finish, so the download stops instead of waiting
+            self.assertRaises(OperationCancelledError, bible.download_book, 'Ruth')
+
+
+if __name__ == '__main__':
+    unittest.main()